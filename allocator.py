@@ -0,0 +1,155 @@
+# ABOUTME: In-memory online table allocator for live booking decisions, one integer bitset per time block
+# ABOUTME: Places each party on a concrete table part using the planner's full/split table setups
+
+import itertools
+import threading
+
+import planner
+
+TABLE_SEATS = {table_type: configs[0][0] for table_type, configs in planner.TABLE_CONFIGURATIONS.items()}
+
+def default_inventory():
+    """Table counts from the planner constants"""
+    return {
+        '4_top': planner.NUM_4_TOP,
+        '8_top': planner.NUM_8_TOP,
+        '6_top': planner.NUM_6_TOP,
+        '2_top': planner.NUM_2_TOP
+    }
+
+class Allocator:
+    """Assigns parties to table parts block by block.
+
+    Every part of every setup of every table gets one bit; a block's state
+    is a single int with the bits of the parts currently booked. A part is
+    free when neither it nor any part of the table's other setups is taken,
+    so booking half of a split 4-top rules out seating four at it. Each
+    candidate's masks are precomputed, so assign and release are a few
+    integer operations per candidate.
+    """
+
+    def __init__(self, tables=None, blocks=None):
+        inventory = tables or default_inventory()
+        self.tables = []        # (label, table_type) for each physical table
+        self.candidates = {}    # party size -> [(seats, table seats, table, part bit, conflict mask, sibling mask, setup)]
+        self.table_masks = []   # (table, [(setup, [part bits])]) used to count free seats
+
+        bit = 0
+        parts = []
+        for table_type, count in inventory.items():
+            for number in range(1, count + 1):
+                table = len(self.tables)
+                self.tables.append((f"{table_type}_{number}", table_type))
+                setups = []
+                for setup in planner.TABLE_CONFIGURATIONS[table_type]:
+                    setups.append((setup, [1 << (bit + i) for i in range(len(setup))]))
+                    bit += len(setup)
+                table_bits = sum(b for _, bits in setups for b in bits)
+                for setup, bits in setups:
+                    setup_bits = sum(bits)
+                    for seats, part_bit in zip(setup, bits):
+                        conflict = (table_bits & ~setup_bits) | part_bit
+                        parts.append((seats, TABLE_SEATS[table_type], table, part_bit, conflict,
+                                      setup_bits & ~part_bit, setup))
+                self.table_masks.append((table, setups))
+
+        # Smallest fitting part first, then the smaller table, so large tables stay whole
+        parts.sort(key=lambda p: (p[0], p[1], p[2]))
+        self.max_party_size = max(TABLE_SEATS[table_type] for table_type in inventory) if inventory else 0
+        for size in range(1, max(TABLE_SEATS.values()) + 1):
+            self.candidates[size] = [p for p in parts if p[0] >= size]
+
+        blocks = blocks or planner.TIME_BLOCKS_PER_MONTH
+        self.states = [0] * blocks
+        # Smallest party size known not to fit in each block. Booking only
+        # fills parts, so a size that failed keeps failing until a release.
+        self.no_fit = [self.max_party_size + 1] * blocks
+        self.bookings = {}  # booking id -> (block, table, part bit, seats, party size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def assign(self, block, party_size):
+        """Book the best free part for a party in a block; returns the booking or None if full.
+
+        Among the smallest parts that fit, a table whose setup is already in
+        use is preferred over committing a fresh table to a setup.
+        """
+        if not 0 <= block < len(self.states):
+            raise ValueError(f"block must be between 0 and {len(self.states) - 1}")
+        if party_size not in self.candidates:
+            raise ValueError(f"party_size must be between 1 and {max(self.candidates)}")
+
+        with self._lock:
+            if party_size >= self.no_fit[block]:
+                return None
+            state = self.states[block]
+            best = None
+            for candidate in self.candidates[party_size]:
+                seats, _, _, part_bit, conflict, siblings, _ = candidate
+                if best is not None and seats > best[0]:
+                    break  # Only parts of the best size compete
+                if state & conflict:
+                    continue
+                if state & siblings:
+                    best = candidate
+                    break  # Already-set-up table with the smallest fitting part
+                if best is None:
+                    best = candidate
+            if best is None:
+                self.no_fit[block] = party_size
+                return None
+
+            seats, _, table, part_bit, _, _, setup = best
+            self.states[block] = state | part_bit
+            booking_id = next(self._ids)
+            self.bookings[booking_id] = (block, table, part_bit, seats, party_size)
+
+        label, table_type = self.tables[table]
+        return {
+            'booking_id': booking_id,
+            'block': block,
+            'table': label,
+            'table_type': table_type,
+            'setup': list(setup),
+            'seats': seats,
+            'party_size': party_size
+        }
+
+    def release(self, booking_id):
+        """Free a booking's table part; returns False for an unknown booking"""
+        with self._lock:
+            booking = self.bookings.pop(booking_id, None)
+            if booking is None:
+                return False
+            block, _, part_bit, _, _ = booking
+            self.states[block] &= ~part_bit
+            self.no_fit[block] = self.max_party_size + 1
+        return True
+
+    def free_seats(self, block):
+        """Seats in a block not held by any booking (what walk-ins can use)"""
+        state = self.states[block]
+        free = 0
+        for table, setups in self.table_masks:
+            in_use = [(setup, bits) for setup, bits in setups if any(state & b for b in bits)]
+            if not in_use:
+                free += TABLE_SEATS[self.tables[table][1]]
+                continue
+            setup, bits = in_use[0]
+            free += sum(seats for seats, b in zip(setup, bits) if not state & b)
+        return free
+
+    def block_status(self, block):
+        """Each table's setup and which of its parts are booked in a block"""
+        state = self.states[block]
+        status = []
+        for table, setups in self.table_masks:
+            label, table_type = self.tables[table]
+            entry = {'table': label, 'table_type': table_type, 'setup': None, 'booked': []}
+            for setup, bits in setups:
+                booked = [seats for seats, b in zip(setup, bits) if state & b]
+                if booked:
+                    entry['setup'] = list(setup)
+                    entry['booked'] = booked
+            status.append(entry)
+        return status
@@ -1,59 +1,29 @@
 # ABOUTME: Utility script to analyze and normalize member visit frequency data
 # ABOUTME: Provides frequency mapping suggestions for converting text to numeric values
 
-import csv
-from collections import defaultdict
+from collections import Counter
+
+from roster_ingest import iter_csv_members
+
+def analyze_frequencies(path='OBG_Members_Processed.csv'):
+    # One pass over the roster: the reader already normalizes each answer
+    frequencies = Counter()
+    normalized = {}
+    for member in iter_csv_members(path):
+        freq = member['How often you want to play']
+        frequencies[freq] += 1
+        normalized[freq] = member['Visits per month']
 
-def analyze_frequencies():
-    frequencies = defaultdict(int)
-    raw_frequencies = []
-    
-    with open('OBG_Members_Processed.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            freq = row['How often you want to play']
-            raw_frequencies.append(freq)
-            
     print("\nAll unique raw frequencies:")
-    for freq in sorted(set(raw_frequencies)):
-        print(f"- {freq}")
-        
+    for freq in sorted(frequencies):
+        print(f"- {freq} ({frequencies[freq]})")
+
     print("\nSuggested normalized frequencies (times per month):")
-    for freq in sorted(set(raw_frequencies)):
-        normalized = normalize_frequency(freq)
-        print(f"'{freq}' -> {normalized}")
+    for freq in sorted(frequencies):
+        print(f"'{freq}' -> {normalized[freq]}")
 
-def normalize_frequency(freq):
-    if not freq:
-        return None
-    
-    freq = freq.lower()
-    
-    # Daily or more
-    if any(term in freq for term in ['daily', '25 hours', 'insatiable', 'all the time']):
-        return 30
-    
-    # Multiple times per week
-    if ('2-3' in freq and 'week' in freq) or ('twice' in freq and 'week' in freq):
-        return 10
-    
-    # Weekly
-    if any(term in freq for term in ['weekly', 'once a week', '1x week', 'per week']):
-        return 4
-    
-    # Bi-weekly
-    if any(term in freq for term in ['bi-weekly', 'every other week', 'biweekly']):
-        return 2
-    
-    # Monthly
-    if 'month' in freq:
-        if '1-2' in freq or 'once or twice' in freq:
-            return 1.5
-        if '2-3' in freq:
-            return 2.5
-        return 1
-    
-    return None
+    unmatched = sum(count for freq, count in frequencies.items() if freq and normalized[freq] is None)
+    print(f"\n{unmatched} answer(s) state no frequency")
 
 if __name__ == "__main__":
     analyze_frequencies()
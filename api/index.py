@@ -1,27 +1,77 @@
 # ABOUTME: Simplified Flask application for serverless deployment (e.g., Vercel)
 # ABOUTME: Provides core API endpoints with authentication for configuration management
 
+import time
+
+# Recorded first so /api/debug/startup can report the full module load time
+_STARTUP_BEGAN = time.perf_counter()
+
 from flask import Flask, render_template, jsonify, send_from_directory, request
 from flask_cors import CORS, cross_origin
 import os
 import sys
-import io
 import json
 import math
-from contextlib import redirect_stdout
+import importlib
+import subprocess
 from functools import wraps
 
 # Add the parent directory to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config_store import ConfigStore
+from compression import init_compression
+import request_profiler
+
+# Analysis modules are imported on first use rather than at module load.
+# On a serverless cold start this keeps PuLP and the optimizers out of the
+# import path for routes that don't need them (/, /api/constants).
+LAZY_MODULES = ['planner', 'plan_catalog', 'plan_optimizer', 'persona_optimization', 'revenue_planner', 'game_index',
+                'dashboard_reports']
+_loaded_modules = {}
+_import_timings = {}
+
+def lazy_module(name):
+    """Import a module on first use and record how long the import took"""
+    module = _loaded_modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        _import_timings[name] = (time.perf_counter() - start) * 1000
+        _loaded_modules[name] = module
+    return module
+
+def import_time_report(modules, limit=25):
+    """Run `python -X importtime` in a fresh interpreter and return the slowest imports.
+
+    A fresh process is used so the report reflects a true cold start rather
+    than whatever this worker has already imported.
+    """
+    statement = "; ".join(f"import {name}" for name in modules)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=60
+    )
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
 
-import planner
-import plan_optimizer
-import persona_optimization
-import revenue_planner
+    entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return entries[:limit]
 
 # Set up Flask app with correct template folder
 template_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
-app = Flask(__name__, template_folder=template_dir)
+app = Flask(__name__, template_folder=template_dir, static_folder=os.path.join(ROOT_DIR, 'static'))
 CORS(app, supports_credentials=True)
 
 # Define config file path
@@ -34,6 +84,7 @@ def load_config():
             return json.load(f)
     except FileNotFoundError:
         # Fallback to planner constants if file doesn't exist
+        planner = lazy_module('planner')
         return {
             'distribution': planner.PERSONA_DISTRIBUTION,
             'personas': planner.PERSONAS,
@@ -44,14 +95,19 @@ def load_config():
                 'family_plan_price': float(planner.FAMILY_PLAN_PRICE)
             },
             'plans': {
-                'basic': {'features': planner.get_plan_features('basic')},
-                'standard': {'features': planner.get_plan_features('standard')},
-                'family': {'features': planner.get_plan_features('family')}
+                name: {'features': dict(plan['features'])} for name, plan in planner.DEFAULT_PLANS.items()
             }
         }
 
-# Global variable to hold the current configuration
-current_config = load_config()
+# The current configuration. Background threads may be frozen between
+# serverless invocations, so every save is written through immediately.
+config_store = ConfigStore(CONFIG_FILE, initial=load_config(), delay=None)
+
+@app.before_request
+def follow_planning_month():
+    # Only once a route has loaded the planner; a warm instance may outlive the month or a calendar edit
+    if 'planner' in _loaded_modules:
+        _loaded_modules['planner'].refresh_planning_month()
 
 def check_auth(username, password):
     """Validate credentials"""
@@ -66,122 +122,65 @@ def requires_auth(f):
         return f(*args, **kwargs)
     return decorated
 
-def capture_output(func, *args, **kwargs):
-    """Capture stdout from a function call"""
-    output = io.StringIO()
-    with redirect_stdout(output):
-        func(*args, **kwargs)
-    return output.getvalue()
+def is_authorized(req):
+    auth = req.authorization
+    return bool(auth) and check_auth(auth.username, auth.password)
+
+# Profiling goes first so its timing also covers compressing the response
+request_profiler.init_profiling(app, is_authorized)
+init_compression(app)
+
+@app.route('/api/debug/profiles')
+@requires_auth
+def get_profiles():
+    """Recent request profiles, newest first (request with ?profile=1 or an X-Profile: 1 header to record one)"""
+    return jsonify({'profiles': request_profiler.profiles.summaries()})
+
+@app.route('/api/debug/profiles/<profile_id>')
+@requires_auth
+def get_profile(profile_id):
+    """One request's collapsed stacks as text for flame graph tools, or with ?format=json as counts"""
+    profile = request_profiler.profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": f"No profile '{profile_id}'"}), 404
+    if request.args.get('format') == 'json':
+        return jsonify(dict(profile.summary(), stacks=dict(profile.stacks.most_common())))
+    return app.response_class(profile.collapsed(), mimetype='text/plain')
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def dashboard_report(report_name, fields_name, default_name):
+    """A dashboard tab's structured report, with the fields named by ?fields= (400 on unknown fields)"""
+    reports = lazy_module('dashboard_reports')
+    try:
+        fields = reports.parse_fields(request.args.get('fields'), getattr(reports, fields_name),
+                                      getattr(reports, default_name))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(getattr(reports, report_name)(fields))
+
 @app.route('/api/planner')
 def get_planner_data():
-    # Create a planner instance and run analysis
-    test_members = [200, 250, 300, 350, 400]
-    results = []
-    for M in test_members:
-        if planner.can_accommodate(M)[0]:
-            results.append((M, True))
-        else:
-            results.append((M, False))
-    
-    # Get summary and convert newlines to HTML breaks
-    summary = planner.generate_summary(test_members, results)
-    summary = summary.replace('\n', '<br>')
-    
-    # Get detailed analysis
-    detailed_output = capture_output(planner.analyze_capacity)
-    
-    return jsonify({
-        "summary": summary,
-        "detailed_output": detailed_output
-    })
+    """Member counts that fit and the first bottleneck (fields: capacity, bottleneck, demand, tables,
+    summary, detailed_output or all)"""
+    return dashboard_report('planner_report', 'PLANNER_FIELDS', 'PLANNER_DEFAULT')
 
 @app.route('/api/optimizer')
 def get_optimizer_data():
-    # Create an optimizer instance and run optimization
-    optimizer = plan_optimizer.PlanOptimizer()
-    optimized_plans = optimizer.optimize_pricing()
-    
-    # Generate summary
-    summary = []
-    summary.append(" Plan Optimization Overview")
-    summary.append("")
-    
-    # Find best value plans for each persona
-    best_plans = {}
-    for plan in optimized_plans:
-        for persona, ratio in plan['value_ratios'].items():
-            if persona not in best_plans or ratio > best_plans[persona][1]:
-                best_plans[persona] = (plan['plan_type'], ratio)
-    
-    # Add key insights
-    total_features = sum(len(plan['features']) for plan in optimized_plans)
-    avg_features = total_features / len(optimized_plans)
-    summary.append(f"• Average Features per Plan: {avg_features:.1f}")
-    summary.append(f"• Total Unique Features: {total_features}")
-    summary.append("")
-    summary.append("Best Plan by Persona:")
-    for persona, (plan, ratio) in best_plans.items():
-        summary.append(f"• {persona.title()}: {plan.title()} Plan ({ratio:.1f}x value)")
-    
-    # Get detailed analysis
-    output = capture_output(optimizer.print_optimization_results)
-    
-    return jsonify({
-        "summary": "\n".join(summary),
-        "output": output
-    })
+    """Plan prices, features and value per persona (fields: plans, best_plans, summary, output or all)"""
+    return dashboard_report('optimizer_report', 'OPTIMIZER_FIELDS', 'OPTIMIZER_DEFAULT')
 
 @app.route('/api/personas')
 def get_personas_data():
-    # Create a persona optimizer instance and run optimization
-    optimizer = persona_optimization.PersonaOptimizer()
-    optimized_personas = optimizer.optimize_personas()
-    
-    # Generate summary
-    summary = []
-    summary.append(" Persona Value Analysis")
-    summary.append("")
-    
-    # Calculate average value ratios and find best plans
-    total_value = 0
-    count = 0
-    best_value_persona = None
-    best_value_ratio = 0
-    
-    for persona in optimized_personas:
-        avg_ratio = sum(persona['value_ratios'].values()) / len(persona['value_ratios'])
-        total_value += avg_ratio
-        count += 1
-        if avg_ratio > best_value_ratio:
-            best_value_ratio = avg_ratio
-            best_value_persona = persona['persona_type']
-    
-    avg_value = total_value / count
-    summary.append(f"• Average Value Ratio: {avg_value:.1f}x")
-    summary.append(f"• Best Value Persona: {best_value_persona.title()} ({best_value_ratio:.1f}x)")
-    summary.append("")
-    summary.append("Plan Matches:")
-    for persona in optimized_personas:
-        if persona['best_plans']:
-            summary.append(f"• {persona['persona_type'].title()}: {', '.join(p.title() for p in persona['best_plans'])}")
-    
-    # Get detailed analysis
-    output = capture_output(optimizer.print_optimization_results)
-    
-    return jsonify({
-        "summary": "\n".join(summary),
-        "output": output
-    })
+    """Persona traits and plan value (fields: personas, overview, summary, output or all)"""
+    return dashboard_report('personas_report', 'PERSONAS_FIELDS', 'PERSONAS_DEFAULT')
 
 @app.route('/api/revenue')
 def get_revenue_data():
     """Get revenue projections"""
-    rp = revenue_planner.RevenuePlanner()
+    rp = lazy_module('revenue_planner').RevenuePlanner()
     revenue_data = rp.calculate_monthly_revenue()
     return jsonify(revenue_data)
 
@@ -189,11 +188,10 @@ def get_revenue_data():
 @cross_origin(supports_credentials=True)
 @requires_auth
 def handle_config():
-    global current_config
     if request.method == 'POST':
         try:
             new_config_data = request.get_json()
-            if not new_config_data:
+            if not new_config_data or not isinstance(new_config_data, dict):
                 return jsonify({"error": "No JSON data received"}), 400
 
             # Basic validation: check if distribution sums near 1
@@ -202,26 +200,89 @@ def handle_config():
                 if not math.isclose(dist_sum, 1.0, abs_tol=0.01):
                     return jsonify({"error": "Distribution percentages must sum to 100%"}), 400
 
-            # Update the in-memory config
-            current_config.update(new_config_data)
+            # Plan definitions and prices must still build a valid catalog
+            if 'plans' in new_config_data or 'plan_prices' in new_config_data:
+                try:
+                    lazy_module('plan_catalog').PlanCatalog(config_store.preview(new_config_data))
+                except (ValueError, TypeError, AttributeError) as e:
+                    return jsonify({"error": f"Invalid plans: {e}"}), 400
 
-            # Write updated config back to file
+            # Deep-merge the update and write it through atomically
             try:
-                with open(CONFIG_FILE, 'w') as f:
-                    json.dump(current_config, f, indent=2)
-                return jsonify({"message": "Config updated successfully"})
-            except IOError as e:
+                version = config_store.update(new_config_data)
+                return jsonify({"message": "Config updated successfully", "version": version})
+            except OSError as e:
                 return jsonify({"error": "Failed to write config file"}), 500
 
         except Exception as e:
             return jsonify({"error": "Internal server error processing config update"}), 500
 
     elif request.method == 'GET':
-        # Return the current in-memory configuration
-        return jsonify(current_config)
+        # Return the current in-memory configuration, with each plan's
+        # price, numeric features and display labels from the catalog
+        current_config = config_store.get()
+        catalog = lazy_module('plan_catalog').PlanCatalog(current_config)
+        return jsonify(dict(current_config, plans=catalog.to_config()))
+
+@app.route('/api/config/history')
+@requires_auth
+def get_config_history():
+    """Recorded config changes, oldest first"""
+    return jsonify({"version": config_store.version, "history": config_store.history()})
+
+@app.route('/api/config/rollback', methods=['POST'])
+@requires_auth
+def rollback_config():
+    """Return the config to a recorded version: {"version": int}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        version = config_store.rollback(int(data['version']))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"version must be a recorded version number ({e})"}), 400
+    except OSError:
+        return jsonify({"error": "Failed to write config file"}), 500
+    return jsonify({"message": f"Config rolled back to version {data['version']}", "version": version})
+
+# Game-preference index, loaded on the first /api/games request
+ROSTER_FILE = os.path.join(ROOT_DIR, 'OBG_Members_Processed.csv')
+_game_index = []
+
+def game_index():
+    if not _game_index:
+        _game_index.append(lazy_module('game_index').GameIndex.load_or_build(ROSTER_FILE))
+    return _game_index[0]
+
+@app.route('/api/games')
+def get_games_data():
+    """Title demand from the roster's game preferences, served from the prebuilt index.
+
+    Optional query parameters: n (titles and pairs to return, default 10),
+    persona to rank titles among one persona's members, and title for one
+    title's demand and the titles most often named with it.
+    """
+    try:
+        n = int(request.args.get('n', 10))
+    except ValueError:
+        return jsonify({"error": "n must be an integer"}), 400
+    if n < 0:
+        return jsonify({"error": "n must not be negative"}), 400
+    games = game_index()
+    persona = request.args.get('persona')
+    title = request.args.get('title')
+    if title is not None:
+        result = games.describe(title, n)
+        if result is None:
+            return jsonify({"error": f"No member named a title matching '{title}'"}), 404
+        return jsonify(result)
+    if persona is not None:
+        if persona not in games.data['persona_demand']:
+            return jsonify({"error": f"Unknown persona '{persona}'"}), 400
+        return jsonify({'persona': persona, 'top_titles': games.top_titles(n, persona)})
+    return jsonify(games.summary(n))
 
 @app.route('/api/constants')
 def get_constants():
+    planner = lazy_module('planner')
     constants = {
         'GUEST_PRICE': float(planner.GUEST_PRICE),
         'BASE_VISIT_VALUE': float(planner.BASE_VISIT_VALUE),
@@ -234,5 +295,22 @@ def get_constants():
     }
     return jsonify(constants)
 
+@app.route('/api/debug/startup')
+@requires_auth
+def get_startup_report():
+    """Report cold-start cost: module load time, lazy imports so far and,
+    with ?importtime=1, a `python -X importtime` breakdown of the analysis modules"""
+    report = {
+        'startup_ms': STARTUP_MS,
+        'lazy_imports_ms': dict(_import_timings),
+        'pending_imports': [name for name in LAZY_MODULES if name not in sys.modules],
+        'solver_loaded': 'pulp' in sys.modules
+    }
+    if request.args.get('importtime') == '1':
+        report['importtime'] = import_time_report(LAZY_MODULES + ['pulp'])
+    return jsonify(report)
+
+STARTUP_MS = (time.perf_counter() - _STARTUP_BEGAN) * 1000
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=3001)
@@ -4,15 +4,22 @@
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS, cross_origin
 import planner
-import plan_optimizer
-import persona_optimization
 import revenue_planner
+import sensitivity
+import mix_optimizer
+import allocator
+import plan_catalog
+import dashboard_reports
+from compression import init_compression
+import request_profiler
+from config_store import ConfigStore
+from game_index import GameIndex
+from solver_pool import SOLVER_TIMEOUT, PoolBusy, SharedLock, SolverPool
+from singleflight import SingleFlight
 import os
-import io
 import sys
-import importlib
-from contextlib import redirect_stdout
 from functools import wraps
+import concurrent.futures
 import json
 import math
 
@@ -52,9 +59,7 @@ def load_config():
                     'family_plan_price': float(planner.FAMILY_PLAN_PRICE)
                 },
                 'plans': {
-                    'basic': {'features': planner.get_plan_features('basic')},
-                    'standard': {'features': planner.get_plan_features('standard')},
-                    'family': {'features': planner.get_plan_features('family')}
+                    name: {'features': dict(plan['features'])} for name, plan in planner.DEFAULT_PLANS.items()
                 }
             }
         except AttributeError as e:
@@ -64,8 +69,41 @@ def load_config():
         print(f"Error: Could not decode JSON from {CONFIG_FILE}. Check file format. Returning empty config.")
         return {} # Or raise an exception
 
-# Global variable to hold the current configuration
-current_config = load_config()
+# Title -> member index over the roster's game preferences, loaded (or built and saved) once at startup
+ROSTER_FILE = os.path.join(os.path.dirname(__file__), 'OBG_Members_Processed.csv')
+game_index = GameIndex.load_or_build(ROSTER_FILE)
+
+# The current configuration; saves are merged in memory and flushed to disk in the background
+config_store = ConfigStore(CONFIG_FILE, initial=load_config())
+
+# Views whose analyses read config.json themselves, so pending saves are written before they run
+CONFIG_READERS = set()
+
+def reads_config(f):
+    CONFIG_READERS.add(f.__name__)
+    return f
+
+@app.before_request
+def flush_pending_config():
+    # Everything else leaves the write to the debounce timer (and exit)
+    if request.endpoint in CONFIG_READERS:
+        try:
+            config_store.flush()
+        except OSError as e:
+            return jsonify({"error": f"Failed to write config file: {e}"}), 500
+
+# Held shared while analyses and bookings read the planner's month constants, exclusively to change them
+planning_lock = SharedLock()
+
+@app.before_request
+def follow_planning_month():
+    # Calendar edits and a new month reach the capacity constants without a restart
+    global reservation_allocator
+    if planner.planning_month_stale():
+        with planning_lock.exclusive():
+            if planner.refresh_planning_month():
+                # Block numbers belong to the old month or calendar, so bookings start afresh
+                reservation_allocator = allocator.Allocator()
 
 def check_auth(username, password):
     """Validate credentials"""
@@ -80,12 +118,75 @@ def requires_auth(f):
         return f(*args, **kwargs)
     return decorated
 
-def capture_output(func, *args, **kwargs):
-    """Capture stdout from a function call"""
-    output = io.StringIO()
-    with redirect_stdout(output):
-        func(*args, **kwargs)
-    return output.getvalue()
+def is_authorized(req):
+    auth = req.authorization
+    return bool(auth) and check_auth(auth.username, auth.password)
+
+# Profiling goes first so its timing also covers compressing the response
+request_profiler.init_profiling(app, is_authorized)
+init_compression(app)
+
+# LP-heavy endpoints run here, so a burst of them can't tie up every web thread
+solver_pool = SolverPool()
+# Identical analyses requested at the same time share one computation
+inflight = SingleFlight()
+
+def run_analysis(func, *args, **kwargs):
+    """Run an analysis on the solver pool, or join an identical one already running.
+
+    Requests are identical when they hit the same endpoint with the same
+    query parameters against the same version of config.json.
+    """
+    key = (request.endpoint, plan_catalog.config_version(CONFIG_FILE),
+           tuple(sorted(request.args.items(multi=True))))
+    profile = request_profiler.current_profile()
+    if profile:
+        key += (profile.id,)  # A profiled request runs its own analysis so its solver thread is sampled
+    func = request_profiler.track(holding_planning_month(func))
+    return inflight.submit(key, solver_pool.submit, func, *args, **kwargs).result(SOLVER_TIMEOUT)
+
+def holding_planning_month(func):
+    """func, run with the planning month held so a refresh can't change its constants mid-solve"""
+    @wraps(func)
+    def held(*args, **kwargs):
+        with planning_lock.shared():
+            return func(*args, **kwargs)
+    return held
+
+@app.errorhandler(PoolBusy)
+def solver_pool_busy(e):
+    response = jsonify({"error": "The planner is busy with other analyses; try again shortly"})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+# Futures raise their own TimeoutError on Python 3.10 (an alias of the builtin from 3.11)
+@app.errorhandler(concurrent.futures.TimeoutError)
+@app.errorhandler(TimeoutError)
+def solver_timeout(e):
+    return jsonify({"error": "The analysis took too long to finish"}), 504
+
+@app.route('/api/debug/solver')
+@requires_auth
+def get_solver_stats():
+    """Solver pool occupancy (running and waiting jobs, completions and rejections) and shared requests"""
+    return jsonify(dict(solver_pool.stats(), coalescing=inflight.stats()))
+
+@app.route('/api/debug/profiles')
+@requires_auth
+def get_profiles():
+    """Recent request profiles, newest first (request with ?profile=1 or an X-Profile: 1 header to record one)"""
+    return jsonify({'profiles': request_profiler.profiles.summaries()})
+
+@app.route('/api/debug/profiles/<profile_id>')
+@requires_auth
+def get_profile(profile_id):
+    """One request's collapsed stacks as text for flame graph tools, or with ?format=json as counts"""
+    profile = request_profiler.profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": f"No profile '{profile_id}'"}), 404
+    if request.args.get('format') == 'json':
+        return jsonify(dict(profile.summary(), stacks=dict(profile.stacks.most_common())))
+    return app.response_class(profile.collapsed(), mimetype='text/plain')
 
 @app.route('/')
 def index():
@@ -105,116 +206,48 @@ def get_constants():
     }
     return jsonify(constants)
 
+def dashboard_report(report, available, default):
+    """A dashboard tab's structured report, with the fields named by ?fields= (400 on unknown fields)"""
+    try:
+        fields = dashboard_reports.parse_fields(request.args.get('fields'), available, default)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(run_analysis(report, fields))
+
 @app.route('/api/planner')
+@reads_config
 def get_planner_data():
-    # Create a planner instance and run analysis
-    test_members = [200, 250, 300, 350, 400]
-    results = []
-    for M in test_members:
-        if planner.can_accommodate(M)[0]:
-            results.append((M, True))
-        else:
-            results.append((M, False))
-    
-    # Get summary and convert newlines to HTML breaks
-    summary = planner.generate_summary(test_members, results)
-    summary = summary.replace('\n', '<br>')
-    
-    # Get detailed analysis
-    detailed_output = capture_output(planner.analyze_capacity)
-    
-    return jsonify({
-        "summary": summary,
-        "detailed_output": detailed_output
-    })
+    """Member counts that fit and the first bottleneck.
+
+    Optional query parameter fields: comma-separated names from
+    capacity, bottleneck (the default), demand, tables, summary and
+    detailed_output (the old text reports), or all.
+    """
+    return dashboard_report(dashboard_reports.planner_report,
+                            dashboard_reports.PLANNER_FIELDS, dashboard_reports.PLANNER_DEFAULT)
 
 @app.route('/api/optimizer')
+@reads_config
 def get_optimizer_data():
-    # Create an optimizer instance and run optimization
-    optimizer = plan_optimizer.PlanOptimizer()
-    optimized_plans = optimizer.optimize_pricing()
-    
-    # Generate summary
-    summary = []
-    summary.append(" Plan Optimization Overview")
-    summary.append("")
-    
-    # Find best value plans for each persona
-    best_plans = {}
-    for plan in optimized_plans:
-        for persona, ratio in plan['value_ratios'].items():
-            if persona not in best_plans or ratio > best_plans[persona][1]:
-                best_plans[persona] = (plan['plan_type'], ratio)
-    
-    # Add key insights
-    total_features = sum(len(plan['features']) for plan in optimized_plans)
-    avg_features = total_features / len(optimized_plans)
-    summary.append(f"• Average Features per Plan: {avg_features:.1f}")
-    summary.append(f"• Total Unique Features: {total_features}")
-    summary.append("")
-    summary.append("Best Plan by Persona:")
-    for persona, (plan, ratio) in best_plans.items():
-        summary.append(f"• {persona.title()}: {plan.title()} Plan ({ratio:.1f}x value)")
-    
-    # Get detailed analysis
-    output = capture_output(optimizer.print_optimization_results)
-    
-    return jsonify({
-        "summary": "\n".join(summary),
-        "output": output
-    })
+    """Plan prices, features and value per persona (fields: plans, best_plans, summary, output or all)"""
+    return dashboard_report(dashboard_reports.optimizer_report,
+                            dashboard_reports.OPTIMIZER_FIELDS, dashboard_reports.OPTIMIZER_DEFAULT)
 
 @app.route('/api/personas')
+@reads_config
 def get_personas_data():
-    # Create a persona optimizer instance and run optimization
-    optimizer = persona_optimization.PersonaOptimizer()
-    optimized_personas = optimizer.optimize_personas()
-    
-    # Generate summary
-    summary = []
-    summary.append(" Persona Value Analysis")
-    summary.append("")
-    
-    # Calculate average value ratios and find best plans
-    total_value = 0
-    count = 0
-    best_value_persona = None
-    best_value_ratio = 0
-    
-    for persona in optimized_personas:
-        avg_ratio = sum(persona['value_ratios'].values()) / len(persona['value_ratios'])
-        total_value += avg_ratio
-        count += 1
-        if avg_ratio > best_value_ratio:
-            best_value_ratio = avg_ratio
-            best_value_persona = persona['persona_type']
-    
-    avg_value = total_value / count
-    summary.append(f"• Average Value Ratio: {avg_value:.1f}x")
-    summary.append(f"• Best Value Persona: {best_value_persona.title()} ({best_value_ratio:.1f}x)")
-    summary.append("")
-    summary.append("Plan Matches:")
-    for persona in optimized_personas:
-        if persona['best_plans']:
-            summary.append(f"• {persona['persona_type'].title()}: {', '.join(p.title() for p in persona['best_plans'])}")
-    
-    # Get detailed analysis
-    output = capture_output(optimizer.print_optimization_results)
-    
-    return jsonify({
-        "summary": "\n".join(summary),
-        "output": output
-    })
+    """Persona traits and plan value (fields: personas, overview, summary, output or all)"""
+    return dashboard_report(dashboard_reports.personas_report,
+                            dashboard_reports.PERSONAS_FIELDS, dashboard_reports.PERSONAS_DEFAULT)
 
 @app.route('/api/config', methods=['GET', 'POST']) # Allow GET and POST
 @cross_origin(supports_credentials=True) # Apply CORS handling first
 @requires_auth                       # Then apply authentication
 def handle_config():
-    global current_config
     if request.method == 'POST':
         try:
             new_config_data = request.get_json()
-            if not new_config_data:
+            if not new_config_data or not isinstance(new_config_data, dict):
                 return jsonify({"error": "No JSON data received"}), 400
 
             print("Received config update request (subset):", {k: new_config_data.get(k) for k in list(new_config_data)[:5]}) # Log subset
@@ -227,20 +260,17 @@ def handle_config():
                      # Decide whether to reject or just warn
                      # return jsonify({"error": "Distribution percentages must sum to 100%"}), 400
 
-            # Update the in-memory config (simple dictionary update)
-            # Note: This replaces keys entirely. If partial updates are needed,
-            # a recursive merge function would be required.
-            current_config.update(new_config_data)
-
-            # Write updated config back to file
-            try:
-                with open(CONFIG_FILE, 'w') as f:
-                    json.dump(current_config, f, indent=2) # Use indent for readability
-                print(f"Configuration successfully written to {CONFIG_FILE}")
-                return jsonify({"message": "Config updated successfully"})
-            except IOError as e:
-                print(f"Error writing config file: {e}")
-                return jsonify({"error": "Failed to write config file"}), 500
+            # Plan definitions and prices must still build a valid catalog
+            if 'plans' in new_config_data or 'plan_prices' in new_config_data:
+                try:
+                    plan_catalog.PlanCatalog(config_store.preview(new_config_data))
+                except (ValueError, TypeError, AttributeError) as e:
+                    return jsonify({"error": f"Invalid plans: {e}"}), 400
+
+            # Nested sections are merged, so a save can send only the fields it changed.
+            # The file is written in the background once the saves stop coming.
+            version = config_store.update(new_config_data)
+            return jsonify({"message": "Config updated successfully", "version": version})
 
         except Exception as e:
             print(f"Error processing config update: {e}")
@@ -251,114 +281,146 @@ def handle_config():
     elif request.method == 'GET':
         # Return the current in-memory configuration
         print("GET request for config, returning current in-memory config.")
-        return jsonify(current_config)
+        # Plans are returned with their price, numeric features and display labels
+        current_config = config_store.get()
+        catalog = plan_catalog.PlanCatalog(current_config)
+        return jsonify(dict(current_config, plans=catalog.to_config()))
+
+@app.route('/api/config/history')
+@requires_auth
+def get_config_history():
+    """Recorded config changes, oldest first"""
+    return jsonify({"version": config_store.version, "history": config_store.history(), "flush_error": config_store.flush_error})
+
+@app.route('/api/config/rollback', methods=['POST'])
+@requires_auth
+def rollback_config():
+    """Return the config to a recorded version: {"version": int}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        version = config_store.rollback(int(data['version']))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"version must be a recorded version number ({e})"}), 400
+    except OSError as e:
+        return jsonify({"error": f"Failed to write config file: {e}"}), 500
+    return jsonify({"message": f"Config rolled back to version {data['version']}", "version": version})
 
 @app.route('/api/revenue')
+@reads_config
 def get_revenue_data():
     """Get revenue projections"""
     rp = revenue_planner.RevenuePlanner()
-    revenue_data = rp.calculate_monthly_revenue()
+    revenue_data = run_analysis(rp.calculate_monthly_revenue)
     return jsonify(revenue_data)
 
-def update_planner_file(updates):
-    """Update the planner.py file with new values"""
-    planner_path = os.path.join(os.path.dirname(__file__), 'planner.py')
-    with open(planner_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Update distribution
-    if 'distribution' in updates:
-        for i, line in enumerate(lines):
-            if 'PERSONA_DISTRIBUTION = {' in line:
-                # Find the end of the dictionary
-                end_idx = i + 1
-                while end_idx < len(lines) and '}' not in lines[end_idx]:
-                    end_idx += 1
-                
-                # Create new distribution lines
-                new_lines = ['PERSONA_DISTRIBUTION = {\n']
-                for persona, value in updates['distribution'].items():
-                    new_lines.append(f"    '{persona}': {value},\n")
-                new_lines.append('}\n')
-                
-                # Replace old lines with new ones
-                lines[i:end_idx+1] = new_lines
-    
-    # Update personas
-    if 'personas' in updates:
-        for i, line in enumerate(lines):
-            if 'PERSONAS = {' in line:
-                # Find the end of the dictionary
-                end_idx = i + 1
-                while end_idx < len(lines) and '}' not in lines[end_idx]:
-                    end_idx += 1
-                
-                # Create new persona lines
-                new_lines = ['PERSONAS = {\n']
-                for persona, data in updates['personas'].items():
-                    new_lines.append(f"    '{persona}': {{\n")
-                    for key, value in data.items():
-                        new_lines.append(f"        '{key}': {value},\n")
-                    new_lines.append('    },\n')
-                new_lines.append('}\n')
-                
-                # Replace old lines with new ones
-                lines[i:end_idx+1] = new_lines
-    
-    # Write changes back to file
-    with open(planner_path, 'w') as f:
-        f.writelines(lines)
-
-@app.route('/api/config', methods=['POST'])
+@app.route('/api/mix')
+@reads_config
+def get_mix_data():
+    """Revenue-maximizing member count per persona within seating capacity.
+
+    Optional query parameters: min_<persona> and max_<persona> member
+    bounds (e.g. max_students=40) and max_members for the total.
+    """
+    bounds = {}
+    try:
+        for persona_type in planner.PERSONAS:
+            low = request.args.get(f'min_{persona_type}')
+            high = request.args.get(f'max_{persona_type}')
+            if low is not None or high is not None:
+                bounds[persona_type] = (float(low) if low is not None else None,
+                                        float(high) if high is not None else None)
+        max_members = float(request.args['max_members']) if 'max_members' in request.args else None
+    except ValueError:
+        return jsonify({"error": "Member bounds must be numbers"}), 400
+
+    result = run_analysis(mix_optimizer.optimize_mix, bounds=bounds, max_members=max_members)
+    if result['status'] != 'Optimal':
+        return jsonify({"error": f"No member mix satisfies these bounds ({result['status']})"}), 422
+    return jsonify(result)
+
+@app.route('/api/sensitivity')
+@reads_config
+def get_sensitivity_data():
+    """Rank model assumptions by their effect on capacity and revenue (tornado chart data)"""
+    try:
+        step = float(request.args.get('step', 0.05))
+        top = int(request.args['top']) if 'top' in request.args else None
+    except ValueError:
+        return jsonify({"error": "step must be a number and top an integer"}), 400
+    metric = request.args.get('metric', 'revenue')
+    if metric not in ('revenue', 'capacity'):
+        return jsonify({"error": "metric must be 'revenue' or 'capacity'"}), 400
+    if not 0 < step < 1:
+        return jsonify({"error": "step must be between 0 and 1"}), 400
+
+    return jsonify(run_analysis(sensitivity.analyze_sensitivity, step=step, metric=metric, top=top))
+
+@app.route('/api/games')
+def get_games_data():
+    """Title demand from the roster's game preferences, served from the prebuilt index.
+
+    Optional query parameters: n (titles and pairs to return, default 10),
+    persona to rank titles among one persona's members, and title for one
+    title's demand and the titles most often named with it.
+    """
+    try:
+        n = int(request.args.get('n', 10))
+    except ValueError:
+        return jsonify({"error": "n must be an integer"}), 400
+    if n < 0:
+        return jsonify({"error": "n must not be negative"}), 400
+    persona = request.args.get('persona')
+    title = request.args.get('title')
+    if title is not None:
+        result = game_index.describe(title, n)
+        if result is None:
+            return jsonify({"error": f"No member named a title matching '{title}'"}), 404
+        return jsonify(result)
+    if persona is not None:
+        if persona not in game_index.data['persona_demand']:
+            return jsonify({"error": f"Unknown persona '{persona}'"}), 400
+        return jsonify({'persona': persona, 'top_titles': game_index.top_titles(n, persona)})
+    return jsonify(game_index.summary(n))
+
+# Live table state for booking decisions, kept in memory for the planning month
+reservation_allocator = allocator.Allocator()
+
+@app.route('/api/allocate', methods=['POST'])
 @requires_auth
-def update_config():
-    """Update configurable constants"""
-    updates = request.get_json()
-    
-    # Basic validation
-    if not isinstance(updates, dict):
-        return jsonify({"error": "Invalid request format"}), 400
-    
-    # Validate distribution
-    if 'distribution' in updates:
-        if not isinstance(updates['distribution'], dict):
-            return jsonify({"error": "Invalid distribution format"}), 400
-        if not all(isinstance(v, (int, float)) for v in updates['distribution'].values()):
-            return jsonify({"error": "Distribution values must be numbers"}), 400
-        if abs(sum(updates['distribution'].values()) - 1.0) > 0.01:
-            return jsonify({"error": "Distribution must sum to 1"}), 400
-    
-    # Validate personas
-    if 'personas' in updates:
-        if not isinstance(updates['personas'], dict):
-            return jsonify({"error": "Invalid personas format"}), 400
-        for persona_data in updates['personas'].values():
-            if not isinstance(persona_data, dict):
-                return jsonify({"error": "Invalid persona data format"}), 400
-            if not all(isinstance(v, (int, float)) for v in persona_data.values()):
-                return jsonify({"error": "Persona values must be numbers"}), 400
-    
-    # Debug logging before update
-    print("Current distribution before update:", planner.PERSONA_DISTRIBUTION)
-    print("Config update requested with:", updates)
-    
-    # Update the planner file
-    update_planner_file(updates)
-    
-    # Debug logging after file update
-    with open(os.path.join(os.path.dirname(__file__), 'planner.py'), 'r') as f:
-        print("Current PERSONA_DISTRIBUTION in file:", [line.strip() for line in f if 'PERSONA_DISTRIBUTION' in line])
-    
-    # Reload the planner module to pick up new changes
-    importlib.reload(planner)
-    print("planner.py reloaded, new distribution:", planner.PERSONA_DISTRIBUTION)
-    
-    print("Config update successful, distribution is now:", planner.PERSONA_DISTRIBUTION)
-    return jsonify({"message": "Config updated successfully"})
+def allocate_table():
+    """Assign a table (and setup) to a booking request: {"block": int, "party_size": int}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        block = int(data['block'])
+        party_size = int(data['party_size'])
+        with planning_lock.shared():
+            booking = reservation_allocator.assign(block, party_size)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"block and party_size must be valid integers ({e})"}), 400
+
+    if booking is None:
+        return jsonify({"error": "No table available for this party in this block"}), 409
+    return jsonify(booking)
+
+@app.route('/api/release', methods=['POST'])
+@requires_auth
+def release_table():
+    """Free the table part held by a booking: {"booking_id": int}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        booking_id = int(data['booking_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "booking_id must be an integer"}), 400
+
+    with planning_lock.shared():
+        released = reservation_allocator.release(booking_id)
+    if not released:
+        return jsonify({"error": "Unknown booking"}), 404
+    return jsonify({"released": booking_id})
 
 if __name__ == '__main__':
     # Ensure config is loaded before running
-    if not current_config:
+    if not config_store.get():
          print("Critical Error: Configuration could not be loaded. Exiting.")
          exit(1)
     app.run(debug=True, host='0.0.0.0', port=3001)
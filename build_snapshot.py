@@ -0,0 +1,183 @@
+# ABOUTME: Build command that precomputes every dashboard analysis into versioned static JSON files
+# ABOUTME: Rebuilds an artifact only when the config or model source files it depends on have changed
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(ROOT_DIR, 'static', 'snapshot')
+MANIFEST_NAME = 'manifest.json'
+
+# Each artifact is the JSON body of one API route. Its inputs are the
+# source of the module that computes it plus every local module that one
+# imports (found by reading the imports, so they can't drift from the
+# code), and config.json for analyses that read their assumptions from it.
+# Artifacts built on the monthly table capacity also depend on the
+# planning month.
+ARTIFACTS = {
+    'constants': {
+        'endpoint': '/api/constants',
+        'module': 'planner'
+    },
+    'planner': {
+        'endpoint': '/api/planner',
+        'module': 'dashboard_reports',
+        'config': True,
+        'monthly': True
+    },
+    'optimizer': {
+        'endpoint': '/api/optimizer',
+        'module': 'dashboard_reports',
+        'config': True
+    },
+    'personas': {
+        'endpoint': '/api/personas',
+        'module': 'dashboard_reports',
+        'config': True
+    },
+    'revenue': {
+        'endpoint': '/api/revenue',
+        'module': 'revenue_planner',
+        'config': True,
+        'monthly': True
+    }
+}
+
+def local_imports(module):
+    """Modules of this project that a module imports, at the top level or inside functions"""
+    with open(os.path.join(ROOT_DIR, module + '.py'), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return {name for name in names if os.path.exists(os.path.join(ROOT_DIR, name + '.py'))}
+
+def artifact_inputs(spec):
+    """Files an artifact depends on: its module's source, everything that imports, and config.json if it reads it"""
+    modules = set()
+    pending = [spec['module']]
+    while pending:
+        module = pending.pop()
+        if module not in modules:
+            modules.add(module)
+            pending.extend(local_imports(module))
+    inputs = [module + '.py' for module in sorted(modules)]
+    return ['config.json'] + inputs if spec.get('config') else inputs
+
+def snapshot_url(output_dir):
+    """URL path the app serves an output directory under the project root from, e.g. /static/snapshot"""
+    relative = os.path.relpath(os.path.abspath(output_dir), ROOT_DIR)
+    if relative.startswith(os.pardir):
+        raise ValueError(f"{output_dir} is outside {ROOT_DIR}, so the app can't serve it")
+    return '/' + relative.replace(os.sep, '/')
+
+def planning_month():
+    """'YYYY-MM' the planner's block counts are for (config.json's calendar, else the current month)"""
+    # planner only loads the solver when it solves, so this stays cheap
+    import planner
+    return '%04d-%02d' % planner.PLANNING_MONTH
+
+def fingerprint(inputs, month=None):
+    """Hash the contents of the given input files, and the planning month if given, into a short version string"""
+    digest = hashlib.sha256()
+    for name in sorted(inputs):
+        digest.update(name.encode('utf-8'))
+        path = os.path.join(ROOT_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    if month:
+        digest.update(month.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+def load_manifest(output_dir):
+    """Load the manifest from a previous build, or an empty one"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'artifacts': {}}
+
+def write_json_atomic(path, data):
+    """Write JSON through a temp file so readers never see a partial artifact"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def build_snapshot(output_dir=SNAPSHOT_DIR, force=False):
+    """Build stale snapshot artifacts and return the names of the ones rebuilt"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    previous = manifest.get('artifacts', {})
+
+    url = snapshot_url(output_dir)
+    stale = {}
+    month = planning_month()
+    for name, spec in ARTIFACTS.items():
+        version = fingerprint(artifact_inputs(spec), month if spec.get('monthly') else None)
+        entry = previous.get(name)
+        filename = f"{name}.{version}.json"
+        if (not force and entry and entry.get('version') == version
+                and os.path.exists(os.path.join(output_dir, filename))):
+            continue
+        stale[name] = (version, filename)
+
+    if stale:
+        # Imported here so an up-to-date snapshot doesn't load Flask or the solver
+        from app import app
+        client = app.test_client()
+
+        for name, (version, filename) in stale.items():
+            spec = ARTIFACTS[name]
+            response = client.get(spec['endpoint'])
+            if response.status_code != 200:
+                raise RuntimeError(f"{spec['endpoint']} returned {response.status_code}")
+
+            write_json_atomic(os.path.join(output_dir, filename), response.get_json())
+
+            # Remove the artifact this version supersedes
+            old_entry = previous.get(name)
+            if old_entry and old_entry.get('file') != filename:
+                old_path = os.path.join(output_dir, old_entry['file'])
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+            previous[name] = {
+                'version': version,
+                'file': filename,
+                'path': f"{url}/{filename}",
+                'endpoint': spec['endpoint'],
+                'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }
+
+        manifest['artifacts'] = previous
+        write_json_atomic(os.path.join(output_dir, MANIFEST_NAME), manifest)
+
+    return sorted(stale)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute dashboard data into static JSON files")
+    parser.add_argument('--force', action='store_true', help="Rebuild every artifact even if its inputs are unchanged")
+    parser.add_argument('--output', default=SNAPSHOT_DIR,
+                        help="Directory under the project to write the snapshot to (manifest paths follow it)")
+    args = parser.parse_args()
+
+    try:
+        rebuilt = build_snapshot(args.output, force=args.force)
+    except ValueError as e:
+        parser.error(str(e))
+    if rebuilt:
+        print(f"Rebuilt {len(rebuilt)} artifact(s): {', '.join(rebuilt)}")
+    else:
+        print("Snapshot is up to date")
+
+if __name__ == "__main__":
+    main()
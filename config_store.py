@@ -0,0 +1,192 @@
+# ABOUTME: Thread-safe config.json store with deep-merge updates, atomic writes and debounced background flushes
+# ABOUTME: Keeps an append-only JSONL history of changes with undo values so any version can be rolled back to
+
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+FLUSH_DELAY = 0.5  # Seconds of quiet before a burst of saves is written out
+
+def deep_merge(target, changes, path=(), undo=None):
+    """Merge changes into target in place, recursing into nested dicts.
+
+    When undo is a list, each replaced leaf appends [path, previous value,
+    whether it existed] so the merge can be reversed.
+    """
+    for key, value in changes.items():
+        key_path = path + (key,)
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value, key_path, undo)
+            continue
+        if undo is not None:
+            existed = key in target
+            undo.append([list(key_path), copy.deepcopy(target[key]) if existed else None, existed])
+        target[key] = copy.deepcopy(value)
+    return target
+
+def _apply_undo(target, undo):
+    """Reverse a merge using its undo entries (latest first)"""
+    for key_path, previous, existed in reversed(undo):
+        node = target
+        for key in key_path[:-1]:
+            node = node.setdefault(key, {})
+        if existed:
+            node[key_path[-1]] = copy.deepcopy(previous)
+        else:
+            node.pop(key_path[-1], None)
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to a temp file in the same directory, then rename it over the target"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class ConfigStore:
+    """In-memory config with durable, coalesced persistence.
+
+    update() merges changes and returns at once; the file is rewritten
+    atomically after FLUSH_DELAY seconds without further updates, so a
+    burst of dashboard saves becomes one write. Pass delay=None to write
+    through on every update (for hosts that freeze background threads).
+    """
+
+    def __init__(self, path, initial=None, history_path=None, delay=FLUSH_DELAY):
+        self.path = path
+        self.history_path = history_path or os.path.splitext(path)[0] + '.history.jsonl'
+        self.delay = delay
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self._pending_history = []
+        self.flush_error = None  # Last background write failure, cleared by the next successful flush
+
+        if initial is not None:
+            self._config = copy.deepcopy(initial)
+        else:
+            with open(path, 'r') as f:
+                self._config = json.load(f)
+        self.version = self._last_history_version()
+        atexit.register(self._flush_and_record)
+
+    def _last_history_version(self):
+        version = 0
+        if os.path.exists(self.history_path):
+            with open(self.history_path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        version = json.loads(line)['version']
+        return version
+
+    def get(self):
+        """A copy of the current config"""
+        with self._lock:
+            return copy.deepcopy(self._config)
+
+    def preview(self, changes):
+        """The config as it would be after merging changes, without applying them"""
+        with self._lock:
+            return deep_merge(copy.deepcopy(self._config), changes)
+
+    def update(self, changes, action='update'):
+        """Deep-merge changes, record them in the history and schedule a flush; returns the new version"""
+        with self._lock:
+            undo = []
+            deep_merge(self._config, changes, undo=undo)
+            return self._record(action, changes, undo)
+
+    def _record(self, action, changes, undo):
+        self.version += 1
+        self._pending_history.append({
+            'version': self.version,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'action': action,
+            'changes': copy.deepcopy(changes),
+            'undo': undo
+        })
+        self._dirty = True
+        self._schedule_flush()
+        return self.version
+
+    def _schedule_flush(self):
+        if self.delay is None:
+            self.flush()
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self._flush_and_record)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_and_record(self):
+        """Flush from the timer or at exit: a failed write is recorded in flush_error and left pending"""
+        try:
+            self.flush()
+        except OSError as e:
+            with self._lock:
+                self.flush_error = f"Could not write {self.path}: {e}"
+            print(f"Error: {self.flush_error}")
+
+    def flush(self):
+        """Write pending changes: the config atomically, then the history lines.
+
+        Raises OSError if the files can't be written; the changes stay
+        pending, so the next flush tries again.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            write_json_atomic(self.path, self._config)
+            with open(self.history_path, 'a') as f:
+                for entry in self._pending_history:
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._pending_history = []
+            self._dirty = False
+            self.flush_error = None
+            return True
+
+    def history(self):
+        """Every recorded change, oldest first"""
+        with self._lock:
+            entries = []
+            if os.path.exists(self.history_path):
+                with open(self.history_path, 'r') as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+            return entries + copy.deepcopy(self._pending_history)
+
+    def rollback(self, version):
+        """Return the config to how it was right after `version` (0 = before any recorded change).
+
+        The rollback is itself recorded as a new version, so it can be undone.
+        """
+        with self._lock:
+            if not 0 <= version <= self.version:
+                raise ValueError(f"version must be between 0 and {self.version}")
+            target = copy.deepcopy(self._config)
+            for entry in reversed(self.history()):
+                if entry['version'] <= version:
+                    break
+                _apply_undo(target, entry['undo'])
+
+            # Recorded as whole top-level replacements and removals of the keys that differ
+            changes = {key: value for key, value in target.items() if self._config.get(key) != value}
+            undo = [[[key], copy.deepcopy(value), True]
+                    for key, value in self._config.items() if key not in target]
+            undo += [[[key], copy.deepcopy(self._config.get(key)), key in self._config] for key in changes]
+            self._config = target
+            return self._record(f'rollback to {version}', changes, undo)
@@ -0,0 +1,183 @@
+# ABOUTME: Structured JSON reports for the dashboard's planner, optimizer and persona tabs
+# ABOUTME: Numbers rounded and only the requested fields computed; the old printed reports stay available as opt-in fields
+
+import planner
+import plan_optimizer
+import persona_optimization
+from solver_pool import capture_output
+
+TEST_MEMBERS = [200, 250, 300, 350, 400]
+DECIMALS = 2
+
+PLANNER_FIELDS = ['capacity', 'bottleneck', 'demand', 'tables', 'summary', 'detailed_output']
+PLANNER_DEFAULT = ['capacity', 'bottleneck']
+OPTIMIZER_FIELDS = ['plans', 'best_plans', 'summary', 'output']
+OPTIMIZER_DEFAULT = ['plans', 'best_plans']
+PERSONAS_FIELDS = ['personas', 'overview', 'summary', 'output']
+PERSONAS_DEFAULT = ['personas', 'overview']
+
+def parse_fields(value, available, default):
+    """Fields asked for by a comma-separated ?fields= value ('all' for every field), or the default ones.
+
+    Raises ValueError naming any field the report doesn't have.
+    """
+    if not value:
+        return list(default)
+    requested = [name.strip() for name in value.split(',') if name.strip()]
+    if 'all' in requested:
+        return list(available)
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (choose from {', '.join(available)} or all)")
+    return requested
+
+def rounded(values, decimals=DECIMALS):
+    """{name: number} rounded for the wire, dropping zero entries"""
+    return {name: round(value, decimals) for name, value in values.items() if round(value, decimals)}
+
+def planner_report(fields=PLANNER_DEFAULT, test_members=TEST_MEMBERS):
+    """Which member counts fit, and why the first that doesn't fails.
+
+    Solves each member count once; 'summary' and 'detailed_output' add
+    the old preformatted text, which re-runs the printed analysis.
+    """
+    fields = set(fields)
+    report = {
+        'planning_month': '%04d-%02d' % planner.PLANNING_MONTH,
+        'blocks_per_month': planner.TIME_BLOCKS_PER_MONTH
+    }
+    results = []
+    first_fail = None
+    capacity = []
+    for M in test_members:
+        fits, solution = planner.can_accommodate(M, verbose=False)
+        results.append((M, fits))
+        if not fits and first_fail is None:
+            first_fail = M
+        row = {'members': M, 'fits': fits}
+        if fits and solution:
+            row['utilization'] = rounded(solution['utilization'], 1)
+            if 'tables' in fields:
+                row['tables'] = rounded(solution['tables'], 1)
+        if 'demand' in fields:
+            demands = solution['demands'] if fits and solution else planner.compute_demands(M, verbose=False)
+            row['demand'] = {
+                'total': rounded({key: value for key, value in demands.items() if key != 'type_demands'}),
+                'by_persona': {p: rounded(d) for p, d in demands['type_demands'].items()}
+            }
+        capacity.append(row)
+
+    max_feasible = max((M for M, fits in results if fits), default=0)
+    report['max_feasible'] = max_feasible
+    report['guests_at_capacity'] = int(planner.calculate_total_guests(max_feasible))
+    if 'capacity' in fields or 'tables' in fields or 'demand' in fields:
+        report['capacity'] = capacity
+
+    if 'bottleneck' in fields:
+        report['bottleneck'] = None
+        if first_fail is not None:
+            bottleneck = planner.analyze_bottleneck(first_fail)
+            report['bottleneck'] = {
+                'members': first_fail,
+                'table_type': bottleneck['table_type'],
+                'binding_tables': bottleneck['binding_tables'],
+                'utilization': round(bottleneck['total_utilization'], 1),
+                'shortfall_seats': round(bottleneck['shortfall_seats'], 1),
+                'persona': bottleneck['persona'],
+                'pressure_share': round(bottleneck['pressure_share'], 1),
+                'persona_ranking': bottleneck['persona_ranking']
+            }
+
+    if 'summary' in fields:
+        report['summary'] = planner.generate_summary(test_members, results).replace('\n', '<br>')
+    if 'detailed_output' in fields:
+        report['detailed_output'] = capture_output(planner.analyze_capacity, test_members)
+    return report
+
+def optimizer_report(fields=OPTIMIZER_DEFAULT):
+    """Each plan's price, features and value per persona, and the best plan for each persona"""
+    fields = set(fields)
+    optimizer = plan_optimizer.PlanOptimizer()
+    optimized_plans = optimizer.optimize_pricing()
+
+    best_plans = {}
+    for plan in optimized_plans:
+        for persona, ratio in plan['value_ratios'].items():
+            if persona not in best_plans or ratio > best_plans[persona][1]:
+                best_plans[persona] = (plan['plan_type'], ratio)
+
+    report = {}
+    if 'plans' in fields:
+        report['plans'] = [
+            {
+                'plan_type': plan['plan_type'],
+                'price': round(plan['price'], DECIMALS),
+                'features': plan['features'],
+                'value_ratios': {p: round(r, DECIMALS) for p, r in plan['value_ratios'].items()},
+                'best_for': plan['best_for']
+            }
+            for plan in optimized_plans
+        ]
+    if 'best_plans' in fields:
+        report['best_plans'] = [
+            {'persona': persona, 'plan_type': plan, 'value_ratio': round(ratio, DECIMALS)}
+            for persona, (plan, ratio) in best_plans.items()
+        ]
+    if 'summary' in fields:
+        total_features = sum(len(plan['features']) for plan in optimized_plans)
+        summary = [" Plan Optimization Overview", ""]
+        summary.append(f"• Average Features per Plan: {total_features / len(optimized_plans):.1f}")
+        summary.append(f"• Total Unique Features: {total_features}")
+        summary.append("")
+        summary.append("Best Plan by Persona:")
+        for persona, (plan, ratio) in best_plans.items():
+            summary.append(f"• {persona.title()}: {plan.title()} Plan ({ratio:.1f}x value)")
+        report['summary'] = "\n".join(summary)
+    if 'output' in fields:
+        report['output'] = capture_output(optimizer.print_optimization_results)
+    return report
+
+def personas_report(fields=PERSONAS_DEFAULT):
+    """Each persona's traits and value from every plan, plus the average and best value ratio"""
+    fields = set(fields)
+    optimizer = persona_optimization.PersonaOptimizer()
+    optimized_personas = optimizer.optimize_personas()
+
+    averages = {
+        persona['persona_type']: sum(persona['value_ratios'].values()) / len(persona['value_ratios'])
+        for persona in optimized_personas
+    }
+    best_persona = max(averages, key=averages.get)
+
+    report = {}
+    if 'personas' in fields:
+        report['personas'] = [
+            {
+                'persona_type': persona['persona_type'],
+                'price_per_visit': round(persona['price_per_visit'], DECIMALS),
+                'traits': persona['traits'],
+                'value_ratios': {p: round(r, DECIMALS) for p, r in persona['value_ratios'].items()},
+                'average_ratio': round(averages[persona['persona_type']], DECIMALS),
+                'best_plans': persona['best_plans']
+            }
+            for persona in optimized_personas
+        ]
+    if 'overview' in fields:
+        report['overview'] = {
+            'average_ratio': round(sum(averages.values()) / len(averages), DECIMALS),
+            'best_persona': best_persona,
+            'best_ratio': round(averages[best_persona], DECIMALS)
+        }
+    if 'summary' in fields:
+        summary = [" Persona Value Analysis", ""]
+        summary.append(f"• Average Value Ratio: {sum(averages.values()) / len(averages):.1f}x")
+        summary.append(f"• Best Value Persona: {best_persona.title()} ({averages[best_persona]:.1f}x)")
+        summary.append("")
+        summary.append("Plan Matches:")
+        for persona in optimized_personas:
+            if persona['best_plans']:
+                summary.append(f"• {persona['persona_type'].title()}: {', '.join(p.title() for p in persona['best_plans'])}")
+        report['summary'] = "\n".join(summary)
+    if 'output' in fields:
+        report['output'] = capture_output(optimizer.print_optimization_results)
+    return report
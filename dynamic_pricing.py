@@ -0,0 +1,169 @@
+# ABOUTME: Block-aware pricing of guest passes and mixed-event drop-in seats from forecast seat load
+# ABOUTME: Grid-searches every block's price pair at once with NumPy, using each persona's willingness to pay as demand response
+
+import sys
+import time
+
+import numpy as np
+
+import planner
+from allocator import TABLE_SEATS, default_inventory
+from mix_optimizer import persona_revenues
+from simulator import WEEKEND_DEMAND_WEIGHT
+
+PRICE_GRID = np.arange(4.0, 24.5, 0.5)  # Candidate prices for guests and drop-in seats
+PRICE_ELASTICITY = 4.0  # Steepness of the drop-off as a price passes a persona's willingness to pay
+# Share of a block's seats that can actually be filled; parties rarely match table sizes exactly
+USABLE_SEAT_SHARE = 0.85
+# Cost of crowding per seat-visit in a block filled to its usable seats, scaled by the block's load
+CROWDING_COST = 2.0
+
+def usable_seats(tables=None):
+    """Seats per block that parties can realistically fill"""
+    inventory = tables or default_inventory()
+    return USABLE_SEAT_SHARE * sum(TABLE_SEATS[table_type] * count for table_type, count in inventory.items())
+
+def block_weights(schedule=None):
+    """Each block's share of the month's visits, with weekend blocks weighted more heavily"""
+    schedule = schedule or planner.monthly_block_schedule()
+    weights = np.array([WEEKEND_DEMAND_WEIGHT if block['weekend'] else 1.0 for block in schedule])
+    return weights / weights.sum()
+
+def acceptance(prices, willingness, elasticity=PRICE_ELASTICITY):
+    """Share of would-be visits that still happen at each price (prices x personas).
+
+    A logistic curve centred on the persona's willingness to pay, scaled
+    so demand at the flat GUEST_PRICE is the planner's assumed demand.
+    """
+    prices = np.asarray(prices, dtype=float)[:, None]
+    willingness = np.asarray(willingness, dtype=float)[None, :]
+
+    def curve(price):
+        return 1 / (1 + np.exp(elasticity * (price - willingness) / willingness))
+
+    return curve(prices) / curve(planner.GUEST_PRICE)
+
+def forecast_block_load(M, schedule=None):
+    """Monthly seat demand of M members spread over the blocks (blocks x personas).
+
+    Returns the members' own reserved seats, their guest visits (priced
+    per guest, as RevenuePlanner counts them) and their mixed-event visits,
+    plus which personas' best plan includes mixed access. Members without
+    it pay the drop-in price for mixed events.
+    """
+    weights = block_weights(schedule)
+    persona_types = list(planner.PERSONAS)
+    counts = np.array([M * planner.PERSONA_DISTRIBUTION.get(p, 0) for p in persona_types])
+    personas = [planner.PERSONAS[p] for p in persona_types]
+    revenues = persona_revenues()
+
+    def spread(per_member):
+        return weights[:, None] * (counts * np.array(per_member))[None, :]
+
+    return {
+        'persona_types': persona_types,
+        'member_seats': spread([p['reserved_visits'] for p in personas]),
+        'guests': spread([p['guests_per_month'] for p in personas]),
+        'mixed': spread([p['event_visits'] for p in personas]),
+        'mixed_access': np.array([planner.calculate_plan_value(revenues[p]['plan_type'])['features']['mixed_access']
+                                  for p in persona_types]),
+        'willingness': np.array([p['price'] for p in personas], dtype=float)
+    }
+
+def optimize_block_prices(M=300, tables=None, price_grid=PRICE_GRID, elasticity=PRICE_ELASTICITY):
+    """Guest and drop-in seat prices for every block that maximize the month's guest and drop-in revenue.
+
+    For each block and each (guest price, drop-in price) pair on the grid,
+    guest and drop-in demand responds per persona; members' own
+    reservations and the mixed-event visits included in their plans are
+    seated first, and guests and drop-ins share the remaining seats.
+
+    To shed peak load, each pair is scored by its revenue less a crowding
+    cost of CROWDING_COST per seat-visit times the block's utilization, so
+    the busier a block is forecast to be the more its prices rise. All
+    blocks and price pairs are evaluated as one array.
+    """
+    start = time.perf_counter()
+    seats = usable_seats(tables)
+    load = forecast_block_load(M)
+    grid = np.asarray(price_grid, dtype=float)
+    response = acceptance(grid, load['willingness'], elasticity)   # prices x personas
+    access = load['mixed_access']
+
+    # Members' reservations and included mixed-event visits are a fixed load
+    fixed_seats = load['member_seats'].sum(axis=1) + (load['mixed'] * access).sum(axis=1)   # blocks
+    guests = load['guests'] @ response.T                                 # blocks x guest prices
+    drop_ins = (load['mixed'] * ~access) @ response.T                    # blocks x drop-in prices
+
+    # Blocks x guest prices x drop-in prices
+    extras = guests[:, :, None] + drop_ins[:, None, :]
+    room = np.maximum(seats - fixed_seats, 0)[:, None, None]
+    served = np.minimum(1.0, room / np.maximum(extras, 1e-12))
+    revenue = (grid[None, :, None] * guests[:, :, None] * planner.GUEST_SPENDING_MULTIPLIER +
+               grid[None, None, :] * drop_ins[:, None, :]) * served
+    demand = fixed_seats[:, None, None] + extras
+
+    utilization = demand / seats
+    best = (revenue - CROWDING_COST * demand * utilization).reshape(len(fixed_seats), -1).argmax(axis=1)
+    guest_index, mixed_index = np.unravel_index(best, (len(grid), len(grid)))
+    blocks = np.arange(len(fixed_seats))
+
+    base = int(np.argmin(np.abs(grid - planner.GUEST_PRICE)))
+    base_revenue = revenue[:, base, base]
+    best_revenue = revenue[blocks, guest_index, mixed_index]
+    base_load = demand[:, base, base]
+    best_load = demand[blocks, guest_index, mixed_index]
+
+    schedule = planner.monthly_block_schedule()
+    return {
+        'members': M,
+        'usable_seats_per_block': seats,
+        'blocks': [
+            {
+                'index': block['index'],
+                'weekday': block['weekday'],
+                'start_hour': block['start_hour'],
+                'guest_price': float(grid[guest_index[i]]),
+                'drop_in_price': float(grid[mixed_index[i]]),
+                'forecast_utilization': float(base_load[i] / seats * 100),
+                'priced_utilization': float(best_load[i] / seats * 100)
+            }
+            for i, block in enumerate(schedule)
+        ],
+        'flat_revenue': float(base_revenue.sum()),
+        'dynamic_revenue': float(best_revenue.sum()),
+        'revenue_gain': float(best_revenue.sum() - base_revenue.sum()),
+        'peak_utilization': {
+            'flat': float(base_load.max() / seats * 100),
+            'dynamic': float(best_load.max() / seats * 100)
+        },
+        'overflow_seats': {  # Demand beyond the block's seats, summed over the month
+            'flat': float(np.maximum(base_load - seats, 0).sum()),
+            'dynamic': float(np.maximum(best_load - seats, 0).sum())
+        },
+        'guest_visits_by_persona': {
+            p: {
+                'flat': float(load['guests'][:, i].sum()),
+                'dynamic': float((load['guests'][:, i] * response[guest_index, i]).sum())
+            }
+            for i, p in enumerate(load['persona_types'])
+        },
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_pricing(M=300):
+    """Print the price schedule's revenue gain and load shedding"""
+    result = optimize_block_prices(M)
+    print(f"\nBlock Pricing for {M} Members ({result['elapsed_ms']:.1f} ms)")
+    print("=" * 50)
+    prices = sorted({(b['guest_price'], b['drop_in_price']) for b in result['blocks']})
+    for guest_price, drop_in_price in prices:
+        count = sum(1 for b in result['blocks'] if (b['guest_price'], b['drop_in_price']) == (guest_price, drop_in_price))
+        print(f"{count:>3} blocks: guests ${guest_price:.2f}, drop-in seats ${drop_in_price:.2f}")
+    print(f"\nGuest + drop-in revenue: ${result['flat_revenue']:,.2f} flat -> ${result['dynamic_revenue']:,.2f} "
+          f"(+${result['revenue_gain']:,.2f})")
+    print(f"Peak utilization: {result['peak_utilization']['flat']:.0f}% -> {result['peak_utilization']['dynamic']:.0f}%")
+    print(f"Seat demand over capacity: {result['overflow_seats']['flat']:.0f} -> {result['overflow_seats']['dynamic']:.0f} seat-blocks")
+
+if __name__ == "__main__":
+    print_pricing(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
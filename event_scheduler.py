@@ -0,0 +1,281 @@
+# ABOUTME: Schedules mixed-seating events onto concrete blocks and table setups for the month
+# ABOUTME: Bounded-time MILP that meets persona event visits while displacing as few reservations as possible, with a greedy fallback
+
+import sys
+import time
+
+import numpy as np
+
+import planner
+from allocator import TABLE_SEATS, default_inventory
+from dynamic_pricing import block_weights
+
+MIN_EVENT_SEATS = 12     # An event below this size isn't worth running
+EVENT_COST = 0.5         # Cost of hosting one more event, in displaced reservation seats
+MILP_TIME_LIMIT = 10     # Seconds CBC may spend before the best schedule found so far is used
+MILP_MAX_BLOCKS = 400    # Longer calendars go straight to the greedy heuristic
+
+PARTY_SIZES = {'reserved_8_blocks': 8, 'reserved_6_blocks': 6, 'reserved_4_blocks': 4, 'reserved_2_blocks': 2}
+
+def event_setups():
+    """Each mixed setup's table type, event seats and the party size its leftover part can still seat"""
+    setups = {}
+    for name, seats in planner.MIXED_SEATS.items():
+        table_type = planner.SEATING_VARIABLES[name]
+        leftover = TABLE_SEATS[table_type] - seats
+        setups[name] = (table_type, seats, leftover if leftover >= min(PARTY_SIZES.values()) else 0)
+    return setups
+
+def parties_per_table(table_type, party_size):
+    """Most parties of a size one table can seat at once, over its setups"""
+    return max(sum(1 for part in setup if part >= party_size)
+               for setup in planner.TABLE_CONFIGURATIONS[table_type])
+
+def forecast_reservations(M, schedule=None):
+    """Expected reservation parties per block and party size (blocks x sizes) for M members"""
+    weights = block_weights(schedule)
+    per_member = planner.demand_per_member()
+    monthly = np.array([per_member[key] * M for key in PARTY_SIZES])
+    return weights[:, None] * monthly[None, :]
+
+def event_seat_demand(M):
+    """Mixed-event seats needed in the month, by persona"""
+    return {
+        persona_type: M * pct * planner.PERSONAS[persona_type]['event_visits']
+        for persona_type, pct in planner.PERSONA_DISTRIBUTION.items()
+    }
+
+def identical_blocks(reservations):
+    """Groups of block indices with the same reservation forecast, in block order"""
+    groups = {}
+    for b, parties in enumerate(reservations):
+        groups.setdefault(tuple(round(n, 9) for n in parties), []).append(b)
+    return list(groups.values())
+
+def spread_events(events, reservations):
+    """Move events evenly across the month within each group of interchangeable blocks"""
+    spread = {}
+    for same in identical_blocks(reservations):
+        hosted = [events[b] for b in same if b in events]
+        for i, used in enumerate(hosted):
+            spread[same[(2 * i + 1) * len(same) // (2 * len(hosted))]] = used
+    return spread
+
+def solve_schedule_milp(reservations, event_seats, tables, time_limit=MILP_TIME_LIMIT):
+    """MILP over blocks: which host an event, with how many tables in each mixed setup.
+
+    Reservations are seated at any table with a big enough part (several
+    small parties may share a split table) or in the leftover part of a
+    split event table; whatever doesn't fit is displaced. Minimizes
+    displaced reservation seats plus EVENT_COST per event.
+    """
+    import pulp
+
+    setups = event_setups()
+    sizes = list(PARTY_SIZES.values())
+    blocks = range(len(reservations))
+    model = pulp.LpProblem("Event_Schedule", pulp.LpMinimize)
+
+    host = {b: pulp.LpVariable(f"host_{b}", cat='Binary') for b in blocks}
+    use = {
+        (b, name): pulp.LpVariable(f"use_{b}_{name}", 0, tables.get(table_type, 0), cat='Integer')
+        for b in blocks for name, (table_type, _, _) in setups.items()
+    }
+    seated = {
+        (b, k, t): pulp.LpVariable(f"seat_{b}_{k}_{t}", 0)
+        for b in blocks for k in sizes for t in tables if TABLE_SEATS[t] >= k
+    }
+    leftover = {
+        (b, k, name): pulp.LpVariable(f"left_{b}_{k}_{name}", 0)
+        for b in blocks for k in sizes for name, (_, _, left) in setups.items() if left >= k
+    }
+    displaced = {(b, i): pulp.LpVariable(f"displaced_{b}_{i}", 0) for b in blocks for i in range(len(sizes))}
+
+    model += (pulp.lpSum(sizes[i] * displaced[b, i] for b in blocks for i in range(len(sizes))) +
+              EVENT_COST * pulp.lpSum(host.values()))
+
+    for b in blocks:
+        event = pulp.lpSum(seats * use[b, name] for name, (_, seats, _) in setups.items())
+        model += event >= MIN_EVENT_SEATS * host[b], f"min_event_{b}"
+        for name, (table_type, _, _) in setups.items():
+            model += use[b, name] <= tables.get(table_type, 0) * host[b], f"host_{b}_{name}"
+            if setups[name][2]:
+                model += pulp.lpSum(leftover[b, k, name] for k in sizes if (b, k, name) in leftover) <= use[b, name], \
+                    f"leftover_{b}_{name}"
+        for t, count in tables.items():
+            model += (pulp.lpSum((1 / parties_per_table(t, k)) * seated[b, k, t] for k in sizes if (b, k, t) in seated) +
+                      pulp.lpSum(use[b, name] for name, (table_type, _, _) in setups.items() if table_type == t)
+                      <= count), f"tables_{b}_{t}"
+        for i, k in enumerate(sizes):
+            model += (displaced[b, i] >= reservations[b][i] -
+                      pulp.lpSum(seated[b, k, t] for t in tables if (b, k, t) in seated) -
+                      pulp.lpSum(leftover[b, k, name] for name in setups if (b, k, name) in leftover)), \
+                f"displaced_{b}_{k}"
+
+    model += pulp.lpSum(seats * use[b, name] for b in blocks for name, (_, seats, _) in setups.items()) \
+        >= event_seats, "event_demand"
+
+    # Blocks with the same forecast are interchangeable; ordering their event
+    # sizes removes the symmetric copies of every schedule from the search
+    for same in identical_blocks(reservations):
+        for b, later in zip(same, same[1:]):
+            model += host[b] >= host[later], f"order_host_{later}"
+            model += (pulp.lpSum(seats * use[b, name] for name, (_, seats, _) in setups.items()) >=
+                      pulp.lpSum(seats * use[later, name] for name, (_, seats, _) in setups.items())), \
+                f"order_seats_{later}"
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    if model.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        return None
+
+    events = {}
+    for b in blocks:
+        used = {name: int(round(use[b, name].value() or 0)) for name in setups}
+        used = {name: count for name, count in used.items() if count}
+        if used:
+            events[b] = used
+    return {
+        'method': 'milp' if model.sol_status == pulp.LpSolutionOptimal else 'milp (time limit)',
+        'events': events,
+        # Only what the events push out; overflow that no table could seat anyway isn't counted
+        'displaced_seats': max(0.0, sum(sizes[i] * (displaced[b, i].value() or 0)
+                                        for b in blocks for i in range(len(sizes))) -
+                               sum(_overflow_seats(parties, tables) for parties in reservations))
+    }
+
+def _seat_reservations(parties, tables):
+    """Greedily seat one block's parties (largest first, smallest fitting table type).
+
+    Returns the table fraction of each type still free and the
+    reservation seats sitting at each type.
+    """
+    free = {t: float(count) for t, count in tables.items()}
+    seats_at = {t: 0.0 for t in tables}
+    for k, count in sorted(zip(PARTY_SIZES.values(), parties), reverse=True):
+        for t in sorted(tables, key=lambda t: TABLE_SEATS[t]):
+            if TABLE_SEATS[t] < k or count <= 0:
+                continue
+            share = 1 / parties_per_table(t, k)
+            placed = min(count, free[t] / share)
+            free[t] -= placed * share
+            seats_at[t] += placed * k
+            count -= placed
+    return free, seats_at
+
+def _overflow_seats(parties, tables):
+    """Reservation seats in a block that no table can take, events or not"""
+    _, seats_at = _seat_reservations(parties, tables)
+    return sum(k * n for k, n in zip(PARTY_SIZES.values(), parties)) - sum(seats_at.values())
+
+def greedy_schedule(reservations, event_seats, tables):
+    """Heuristic schedule: fill events into the least-booked blocks' free tables first.
+
+    Full-table setups only. A first pass uses tables no reservation needs;
+    if that isn't enough, a second pass takes booked tables in the
+    least-booked blocks, displacing the reservation seats on them.
+    """
+    setups = event_setups()
+    full_setups = {t: name for name, (t, seats, _) in setups.items() if seats == TABLE_SEATS[t]}
+    order = np.argsort([sum(k * n for k, n in zip(PARTY_SIZES.values(), parties)) for parties in reservations],
+                       kind='stable')
+    seated = {b: _seat_reservations(reservations[b], tables) for b in order}
+    events = {}
+    displaced = 0.0
+    remaining = event_seats
+
+    for displace in (False, True):
+        for b in order:
+            if remaining <= 0:
+                break
+            free, seats_at = seated[b]
+            used = events.get(b, {})
+            offered = 0
+            for t in sorted(tables, key=lambda t: -TABLE_SEATS[t]):
+                already = used.get(full_setups[t], 0)
+                available = tables[t] - already if displace else int(free[t] + 1e-9) - already
+                take = min(available, int(np.ceil(remaining / TABLE_SEATS[t])))
+                if take <= 0:
+                    continue
+                if displace:
+                    booked = tables[t] - free[t]
+                    taken_booked = max(0.0, take - max(free[t] - already, 0))
+                    displaced += seats_at[t] / booked * taken_booked if booked > 0 else 0
+                used[full_setups[t]] = already + take
+                offered += take * TABLE_SEATS[t]
+                remaining -= take * TABLE_SEATS[t]
+                if remaining <= 0:
+                    break
+            event_total = sum(TABLE_SEATS[setups[name][0]] * count for name, count in used.items())
+            if used and (event_total >= MIN_EVENT_SEATS or displace):
+                events[b] = used
+            elif offered:
+                remaining += offered  # Too small to run; leave this block alone
+    return {'method': 'greedy', 'events': events, 'displaced_seats': displaced}
+
+def schedule_events(M=300, tables=None, time_limit=MILP_TIME_LIMIT, method=None):
+    """Pick the month's event blocks and table setups for M members.
+
+    method is 'milp', 'greedy' or None (MILP for calendars up to
+    MILP_MAX_BLOCKS, once the greedy schedule has to displace
+    reservations). The greedy schedule is kept if the MILP finds nothing
+    better within the time limit.
+    """
+    start = time.perf_counter()
+    tables = tables or default_inventory()
+    schedule = planner.monthly_block_schedule()
+    reservations = forecast_reservations(M, schedule).tolist()
+    demand = event_seat_demand(M)
+    event_seats = sum(demand.values())
+
+    result = greedy_schedule(reservations, event_seats, tables)
+    # When the greedy schedule displaces nothing there is nothing left to minimize
+    if method == 'milp' or (method is None and len(schedule) <= MILP_MAX_BLOCKS and result['displaced_seats'] > 0):
+        milp = solve_schedule_milp(reservations, event_seats, tables, time_limit)
+        if milp is not None and milp['displaced_seats'] <= result['displaced_seats'] + 1e-6:
+            result = milp
+    hosted = spread_events(result['events'], reservations)
+
+    setups = event_setups()
+    events = []
+    for b, used in sorted(hosted.items()):
+        block = schedule[b]
+        events.append({
+            'block': b,
+            'day': block['day'],
+            'weekday': block['weekday'],
+            'start_hour': block['start_hour'],
+            'setups': used,
+            'seats': sum(setups[name][1] * count for name, count in used.items())
+        })
+    offered = sum(event['seats'] for event in events)
+    reserved_seats = sum(k * n for parties in reservations for k, n in zip(PARTY_SIZES.values(), parties))
+    return {
+        'members': M,
+        'method': result['method'],
+        'event_seat_demand': event_seats,
+        'event_seats_offered': offered,
+        'event_seats_by_persona': {p: seats / event_seats * offered if event_seats else 0 for p, seats in demand.items()},
+        'events': events,
+        'displaced_reservation_seats': result['displaced_seats'],
+        'unseatable_reservation_seats': sum(_overflow_seats(parties, tables) for parties in reservations),
+        'displaced_share': result['displaced_seats'] / reserved_seats * 100 if reserved_seats else 0,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_event_schedule(M=300, method=None):
+    """Print the month's events and the reservations they displace"""
+    result = schedule_events(M, method=method)
+    print(f"\nEvent Schedule for {M} Members ({result['method']}, {result['elapsed_ms']:.0f} ms)")
+    print("=" * 50)
+    for event in result['events']:
+        setups = ", ".join(f"{count}x {name}" for name, count in event['setups'].items())
+        print(f"Day {event['day'] + 1:>2} {event['weekday']:<9} {event['start_hour']:>2}:00  "
+              f"{event['seats']:>3} seats ({setups})")
+    print("-" * 50)
+    print(f"Event seats: {result['event_seats_offered']:.0f} offered for {result['event_seat_demand']:.0f} wanted")
+    print(f"Displaced reservations: {result['displaced_reservation_seats']:.1f} seats "
+          f"({result['displaced_share']:.1f}% of reservation seats)")
+
+if __name__ == "__main__":
+    print_event_schedule(int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+                         sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,110 @@
+# ABOUTME: Converts free-text "how often do you want to play" answers into visits per month
+# ABOUTME: One precompiled pattern with range extraction, memoized per answer, with a batch API for whole columns
+
+import functools
+import re
+
+WEEKS_PER_MONTH = 4
+DAYS_PER_MONTH = 30
+
+# Visits per month for one occurrence per unit
+UNIT_VISITS = {'day': DAYS_PER_MONTH, 'week': WEEKS_PER_MONTH, 'month': 1}
+
+# Number words that can stand in for a count ("once or twice a month", "a few times a week")
+COUNT_WORDS = {
+    'once': 1, 'one': 1, 'twice': 2, 'two': 2, 'thrice': 3, 'three': 3,
+    'couple': 2, 'couple of': 2, 'few': 3, 'several': 3, 'multiple': 3, 'many': 3,
+    'other': 2
+}
+
+_NUMBER = r'\d+(?:\.\d+)?'
+_WORD = r'\b(?:once|one|twice|two|thrice|three|(?:a\s+)?couple(?:\s+of)?|(?:a\s+)?few|several|multiple|many)'
+_UNIT = r'(?P<{name}>day|week|wk|month|mo\b)'
+_DAYS = r'(?:week|saturday|sunday|monday|tuesday|wednesday|thursday|friday)'
+
+# Alternatives are tried left to right at each position, and the leftmost
+# match in the answer wins, so an answer is read by the first frequency it states.
+FREQUENCY_PATTERN = re.compile(
+    # Daily or more
+    r'(?P<daily>daily|every\s*day|all\s+the\s+time|insatiable|25\s+hours)'
+    # "every other week", "every 1-2 months", "every couple of months"
+    r'|every\s+(?:(?P<every_low>' + _NUMBER + r')\s*-\s*(?P<every_high>' + _NUMBER + r')'
+    r'|(?P<every_n>' + _NUMBER + r'|other|' + _WORD + r'))\s+' + _UNIT.format(name='every_unit') +
+    # "every week", "every Saturday"
+    r'|(?P<every_week>every\s+' + _DAYS + r')'
+    # "1-2x a week", "2-4x/mo", "once or twice a month", "3 times per week", "a few times a month",
+    # "3 days a week" (days or nights in a week or month count visits, like "times")
+    r'|(?:(?P<low>' + _NUMBER + r'|' + _WORD + r')\s*x?\s*(?:-|to|or)\s*(?P<high>' + _NUMBER + r'|' + _WORD + r')'
+    r'|(?P<count>' + _NUMBER + r'|' + _WORD + r'))'
+    r'\s*(?:x|times?|days?|nights?)?\s*(?:a|an|per|/|each|every)?\s*' + _UNIT.format(name='unit') +
+    # Bare cadence words
+    r'|(?P<biweekly>bi-?weekly)'
+    r'|(?P<weekly>weekly)'
+    r'|(?P<monthly>monthly)'
+)
+
+def _count(token):
+    """Numeric value of a count token ("2", "twice", "a couple of")"""
+    token = re.sub(r'^a\s+', '', re.sub(r'\s+', ' ', token))
+    if token in COUNT_WORDS:
+        return COUNT_WORDS[token]
+    return float(token)
+
+def _unit_visits(unit):
+    if unit in ('wk', 'week'):
+        return UNIT_VISITS['week']
+    if unit in ('mo', 'month'):
+        return UNIT_VISITS['month']
+    return UNIT_VISITS['day']
+
+def _tidy(value):
+    """Round to hundredths and drop the decimal point for whole numbers"""
+    value = round(value, 2)
+    return int(value) if value == int(value) else value
+
+@functools.lru_cache(maxsize=4096)
+def _parse(canonical):
+    match = FREQUENCY_PATTERN.search(canonical)
+    if not match:
+        return None
+    groups = match.groupdict()
+
+    if groups['daily']:
+        return DAYS_PER_MONTH
+    if groups['every_unit']:
+        if groups['every_low']:
+            interval = (float(groups['every_low']) + float(groups['every_high'])) / 2
+        else:
+            interval = _count(groups['every_n'])
+        return _tidy(_unit_visits(groups['every_unit']) / interval)
+    if groups['every_week']:
+        return WEEKS_PER_MONTH
+    if groups['unit']:
+        if groups['low']:
+            count = (_count(groups['low']) + _count(groups['high'])) / 2
+        else:
+            count = _count(groups['count'])
+        return _tidy(count * _unit_visits(groups['unit']))
+    if groups['biweekly']:
+        return WEEKS_PER_MONTH // 2
+    if groups['weekly']:
+        return WEEKS_PER_MONTH
+    return 1  # monthly
+
+def normalize_frequency(freq, default=None):
+    """Visits per month stated by a free-text answer, or default if it states none"""
+    if not freq:
+        return default
+    # Memoize on the canonical form so case and spacing variants share one entry
+    visits = _parse(' '.join(freq.lower().split()))
+    return default if visits is None else visits
+
+def normalize_frequencies(column, default=None):
+    """Normalize a column of answers, parsing each distinct answer once"""
+    seen = {}
+    result = []
+    for freq in column:
+        if freq not in seen:
+            seen[freq] = normalize_frequency(freq, default)
+        result.append(seen[freq])
+    return result
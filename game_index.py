@@ -0,0 +1,251 @@
+# ABOUTME: Inverted index from game titles to the roster members who named them, with precomputed demand answers
+# ABOUTME: Built once from the roster, persisted as JSON beside it, and queried by /api/games for top titles, pairs and persona demand
+
+import difflib
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import planner
+from config_store import write_json_atomic
+from game_library import TITLE_COLUMNS, split_titles
+from persona_clustering import assign_personas, member_arrays
+from roster_ingest import iter_members
+
+INDEX_VERSION = 3      # Bump when the index layout or title rules change, so persisted indexes are rebuilt
+FUZZY_CUTOFF = 0.9     # Similarity at which two spellings are taken to be the same title
+MAX_PAIRS = 200        # Co-preference pairs kept, most shared first
+MAX_PARTNERS = 20      # Titles kept per title as most often named alongside it
+UNCLASSIFIED = 'unclassified'
+# Activity levels for the roster overview, most active first
+ACTIVITY_LEVELS = ['Very Active (>8x/month)', 'Active (4-8x/month)', 'Regular (2-4x/month)', 'Occasional (<2x/month)']
+NOT_STATED = 'Not stated'
+
+def compact_key(key):
+    """Spacing-insensitive form of a normalized title ("space base" and "spacebase" agree)"""
+    return key.replace(' ', '')
+
+def merge_spellings(keys, cutoff=FUZZY_CUTOFF):
+    """Canonical key for every key, folding spacing variants and near-identical spellings together.
+
+    Keys are visited most-mentioned first (the order given), so each
+    spelling folds into the most common close match seen before it.
+    """
+    canonical = {}
+    by_compact = {}
+    for key in keys:
+        compact = compact_key(key)
+        if compact not in by_compact:
+            close = difflib.get_close_matches(compact, list(by_compact), n=1, cutoff=cutoff)
+            by_compact[compact] = by_compact[close[0]] if close else key
+        canonical[key] = by_compact[compact]
+    return canonical
+
+def activity_level(visits):
+    """ACTIVITY_LEVELS label for a member's visits per month (NOT_STATED when unknown)"""
+    if not visits:
+        return NOT_STATED
+    visits = float(visits)
+    if visits > 8:
+        return ACTIVITY_LEVELS[0]
+    if visits >= 4:
+        return ACTIVITY_LEVELS[1]
+    if visits >= 2:
+        return ACTIVITY_LEVELS[2]
+    return ACTIVITY_LEVELS[3]
+
+def home_city(city):
+    """A member's city without asides or alternatives ("Oakland (sometimes SF)" -> "Oakland")"""
+    return (city or '').split('(')[0].split('/')[0].strip()
+
+class GameIndex:
+    """Title -> member rows, plus the top-title, pair and persona tables the API serves.
+
+    Everything a query needs is computed when the index is built, so
+    queries only slice lists.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.titles = {entry['key']: entry for entry in data['titles']}
+        self.names = {entry['name'].lower(): entry['key'] for entry in data['titles']}
+        self.aliases = data['aliases']
+        self.compact = {compact_key(key): key for key in self.titles}
+
+    @classmethod
+    def build(cls, members, personas=None):
+        """Index a list of roster members"""
+        personas = list(personas or planner.PERSONA_DISTRIBUTION)
+        visits, text = member_arrays(members)
+        assigned = assign_personas(visits, text, personas)
+        member_personas = [personas[i] if i >= 0 else UNCLASSIFIED for i in assigned]
+
+        member_keys = []
+        mentions = Counter()
+        names = {}
+        for member in members:
+            keys = []
+            for column in TITLE_COLUMNS:
+                for name, key in split_titles(member.get(column)):
+                    names.setdefault(key, name)
+                    keys.append(key)
+            mentions.update(set(keys))
+            member_keys.append(keys)
+
+        canonical = merge_spellings(key for key, _ in mentions.most_common())
+        postings = {}
+        for row, keys in enumerate(member_keys):
+            for key in {canonical[key] for key in keys}:
+                postings.setdefault(key, []).append(row)
+
+        pair_counts = Counter()
+        partners = {}
+        for keys in member_keys:
+            pair_counts.update(itertools.combinations(sorted({canonical[key] for key in keys}), 2))
+        ranked_pairs = sorted(pair_counts.items(), key=lambda item: (-item[1], item[0]))
+        for (a, b), count in ranked_pairs:
+            for key, partner in ((a, b), (b, a)):
+                if len(partners.setdefault(key, [])) < MAX_PARTNERS:
+                    partners[key].append([partner, count])
+
+        persona_types = personas + [UNCLASSIFIED]
+        titles = []
+        for key, rows in sorted(postings.items(), key=lambda item: (-len(item[1]), item[0])):
+            counts = Counter(member_personas[row] for row in rows)
+            titles.append({
+                'key': key,
+                'name': names[key],
+                'members': len(rows),
+                'rows': rows,
+                'by_persona': {p: counts[p] for p in persona_types if counts[p]},
+                'partners': partners.get(key, [])
+            })
+        pairs = [{'titles': [names[a], names[b]], 'members': count} for (a, b), count in ranked_pairs[:MAX_PAIRS]]
+
+        persona_demand = {
+            p: [entry['key'] for entry in sorted(titles, key=lambda entry: -entry['by_persona'].get(p, 0))
+                if entry['by_persona'].get(p)]
+            for p in persona_types
+        }
+
+        activity = Counter(activity_level(member.get('Visits per month')) for member in members)
+        cities = Counter(home_city(member.get('City')) for member in members)
+        cities.pop('', None)
+
+        return cls({
+            'version': INDEX_VERSION,
+            'member_count': len(members),
+            'persona_counts': dict(Counter(member_personas)),
+            'activity': {label: activity[label] for label in ACTIVITY_LEVELS + [NOT_STATED]},
+            'cities': sorted(cities.items(), key=lambda item: (-item[1], item[0])),
+            'titles': titles,
+            'aliases': {key: target for key, target in canonical.items() if key != target},
+            'pairs': pairs,
+            'persona_demand': persona_demand
+        })
+
+    @classmethod
+    def load_or_build(cls, roster_path, index_path=None):
+        """The persisted index for a roster, rebuilt (and saved, where writable) if the roster changed"""
+        index_path = index_path or os.path.splitext(roster_path)[0] + '.games.json'
+        stat = os.stat(roster_path)
+        signature = [INDEX_VERSION, stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == signature:
+                return cls(data)
+        except (OSError, ValueError):
+            pass
+
+        index = cls.build(list(iter_members(roster_path)))
+        index.data['signature'] = signature
+        try:
+            write_json_atomic(index_path, index.data, indent=None)
+        except OSError:
+            pass  # Read-only deployments keep the index in memory only
+        return index
+
+    def find(self, title):
+        """Index entry for a title by display name, any normalized spelling, or a merged alias"""
+        if title.lower() in self.names:
+            return self.titles[self.names[title.lower()]]
+        for _, key in split_titles(title) or [(title, title)]:
+            key = self.aliases.get(key, key)
+            if key in self.titles:
+                return self.titles[key]
+            if compact_key(key) in self.compact:
+                return self.titles[self.compact[compact_key(key)]]
+        return None
+
+    @staticmethod
+    def _summary(entry):
+        return {'title': entry['name'], 'members': entry['members'], 'by_persona': entry['by_persona']}
+
+    def top_titles(self, n=10, persona=None):
+        """Most-named titles, overall or among one persona's members"""
+        if persona is None:
+            return [self._summary(entry) for entry in self.data['titles'][:n]]
+        return [
+            dict(self._summary(self.titles[key]), members=self.titles[key]['by_persona'][persona])
+            for key in self.data['persona_demand'].get(persona, [])[:n]
+        ]
+
+    def pairs(self, n=10, title=None):
+        """Titles most often named by the same member, optionally only pairs including one title"""
+        if title is None:
+            return self.data['pairs'][:n]
+        entry = self.find(title)
+        if entry is None:
+            return []
+        return [
+            {'titles': [entry['name'], self.titles[partner]['name']], 'members': count}
+            for partner, count in entry['partners'][:n]
+        ]
+
+    def describe(self, title, n=10):
+        """One title's demand and the titles most often named with it, or None if nobody named it"""
+        entry = self.find(title)
+        if entry is None:
+            return None
+        return dict(self._summary(entry), pairs=self.pairs(n, entry['name']))
+
+    def persona_demand(self, n=5):
+        """Each persona's most-named titles"""
+        return {persona: self.top_titles(n, persona) for persona in self.data['persona_demand']}
+
+    def summary(self, n=10):
+        """Top titles, co-preference pairs and per-persona demand in one response, with member counts
+        by activity level and city (aggregates only, never individual members)"""
+        return {
+            'member_count': self.data['member_count'],
+            'title_count': len(self.titles),
+            'persona_counts': self.data['persona_counts'],
+            'activity': self.data['activity'],
+            'top_cities': [{'city': city, 'members': count} for city, count in self.data['cities'][:n]],
+            'top_titles': self.top_titles(n),
+            'pairs': self.pairs(n),
+            'persona_demand': self.persona_demand(min(n, 5))
+        }
+
+def print_game_index(roster_path='OBG_Members_Processed.csv', n=10):
+    """Print the most-named titles, pairs and per-persona favorites"""
+    start = time.perf_counter()
+    index = GameIndex.load_or_build(roster_path)
+    print(f"\nGame Preferences ({index.data['member_count']} members, {len(index.titles)} titles, "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms)")
+    print("=" * 50)
+    for entry in index.top_titles(n):
+        print(f"{entry['title']}: {entry['members']} members")
+    print("\nOften named together:")
+    for pair in index.pairs(5):
+        print(f"  {pair['titles'][0]} + {pair['titles'][1]}: {pair['members']} members")
+    print("\nBy persona:")
+    for persona, entries in index.persona_demand(3).items():
+        print(f"  {persona.title()}: " + ", ".join(f"{e['title']} ({e['members']})" for e in entries))
+
+if __name__ == "__main__":
+    print_game_index(sys.argv[1] if len(sys.argv) > 1 else 'OBG_Members_Processed.csv')
@@ -0,0 +1,251 @@
+# ABOUTME: Game-library checkout model: title popularity from the roster, loan queues and wait times per title
+# ABOUTME: Sizes copies per title for a target availability with vectorized Erlang queue math over an indexed catalog
+
+import bisect
+import csv
+import functools
+import re
+import sys
+import time
+
+import numpy as np
+
+import planner
+from frequency import DAYS_PER_MONTH
+from roster_ingest import iter_members
+
+LOAN_DAYS = 7              # How long a checked-out game stays out
+TARGET_AVAILABILITY = 0.9  # Share of checkout requests that should find a copy on the shelf
+DEFAULT_COPIES = 1         # Copies assumed for titles without a catalog count
+BASE_MENTIONS = 0.5        # Popularity floor for catalog titles nobody on the roster mentioned
+
+# Roster columns naming games, and how much one mention counts toward a title's popularity
+TITLE_COLUMNS = {'Fav game today': 1.0, 'Looking to play': 1.0}
+
+TITLE_SEPARATORS = re.compile(r'\s*(?:[,;/\n]|\s&\s|\band\b|\bor\b|\b[Ee]tc\b)\s*')
+# Words that only describe tastes ("heavy euros", "medium to heavy", "social deduction")
+_TASTE = (r'(?:a|an|of|to|for|with|in|be|can|ish|fun|games?|genres?|weight|heavy|heavier|light|lighter|'
+          r'medium|mid|hard|euros?|style|strategy|strategic|abstract|grand|thematic|narrative|campaigns?|'
+          r'engine|builders?|building|economic|social|deduction|deception|complexity|interactive|tense|'
+          r'exciting|opaque|resources|stuff|things?|similar|variety|love|them|all|lots|more|new|ones|open)')
+# A fragment that describes tastes rather than names a title: it opens like a remark
+# or turns on a "but" ("anything but co op", "strategy but open"), names a genre in the plural
+# ("train games"), or has only taste words. Titles such as "Game of Thrones",
+# "Love Letter", "New York Zoo" or "Dune: The Card Game" don't fit any of these.
+GENERIC_PATTERN = re.compile(
+    r'^(?:any|anything|everything|something|nothing|whatever|what we|almost|always|most|some|pretty|'
+    r'literally|ideally|however|not|am|im|ill|ive|i|it|yes|trying|tend|with|like|open to|prefer|'
+    r'particular|preference)\b'
+    r'|\bbut\b|\bgames\b'
+    r'|^' + _TASTE + r'(?:\s+' + _TASTE + r')*$'
+)
+# Hedges in front of a title ("probably Agricola", "in addition to Lacerdas", "but I love Dominion")
+FILLER_PATTERN = re.compile(r'^(?:(?:probably|maybe|also|especially|currently|lately|really|mostly|generally|'
+                            r'but|i like|i love|'
+                            r'in addition to|at the moment|i.m really digging|i.ve always wanted to play)\s+)+',
+                            re.IGNORECASE)
+MAX_TITLE_WORDS = 6
+
+@functools.lru_cache(maxsize=16384)
+def normalize_title(title):
+    """Lookup key for a title: lower case, no asides, punctuation or leading article"""
+    key = re.sub(r'\([^)]*\)', ' ', title.lower().replace('’', "'"))
+    key = re.sub(r"[^a-z0-9' ]+", ' ', key).replace("'", '')
+    key = ' '.join(key.split())
+    return key[4:] if key.startswith('the ') else key
+
+def split_titles(text):
+    """Title-like fragments of a free-text answer, as (display name, key) pairs"""
+    titles = []
+    for fragment in TITLE_SEPARATORS.split(re.sub(r'\([^)]*\)', ' ', text or '')):
+        fragment = FILLER_PATTERN.sub('', fragment.strip(' .!~-:'), 1)
+        key = normalize_title(fragment)
+        if key and len(key.split()) <= MAX_TITLE_WORDS and not GENERIC_PATTERN.search(key):
+            titles.append((fragment, key))
+    return titles
+
+def title_mentions(members):
+    """Weighted mentions of each title across the roster's game columns.
+
+    Returns {key: (display name, mentions)}, keeping the first spelling seen.
+    """
+    mentions = {}
+    for member in members:
+        for column, weight in TITLE_COLUMNS.items():
+            for name, key in split_titles(member.get(column)):
+                first, count = mentions.get(key, (name, 0.0))
+                mentions[key] = (first, count + weight)
+    return mentions
+
+def monthly_checkouts(M, distribution=None, personas=None):
+    """Checkouts per month for M members, from each persona's game_checkouts"""
+    distribution = distribution or planner.PERSONA_DISTRIBUTION
+    personas = personas or planner.PERSONAS
+    return sum(M * share * personas[p]['game_checkouts'] for p, share in distribution.items())
+
+def erlang_c(load, copies):
+    """Probability a checkout request finds every copy out, for arrays of offered load and copies.
+
+    Offered load is the mean number of copies a title would have out with
+    unlimited copies. Uses the Erlang B recursion over all titles at once;
+    titles whose load reaches their copies always wait.
+    """
+    load = np.asarray(load, dtype=float)
+    copies = np.asarray(copies, dtype=int)
+    blocking = np.ones_like(load)
+    result = np.ones_like(load)
+    for k in range(1, int(copies.max(initial=0)) + 1):
+        blocking = load * blocking / (k + load * blocking)
+        at = copies == k
+        result[at] = k * blocking[at] / (k - load[at] * (1 - blocking[at]))
+    result[(load >= copies) | (copies <= 0)] = 1.0
+    return np.minimum(result, 1.0)
+
+def queue_metrics(load, copies, loan_days=LOAN_DAYS):
+    """Availability, mean wait (days) and mean queue length per title (M/M/c loan queue)"""
+    load = np.asarray(load, dtype=float)
+    copies = np.asarray(copies, dtype=int)
+    wait_probability = erlang_c(load, copies)
+    stable = load < copies
+    spare = np.where(stable, copies - load, 1.0)
+    wait_days = np.where(stable, wait_probability * loan_days / spare, np.inf)
+    queue = np.where(stable, wait_probability * load / spare, np.inf)
+    return {'availability': 1 - wait_probability, 'wait_days': wait_days, 'queue_length': queue}
+
+def copies_needed(load, target=TARGET_AVAILABILITY):
+    """Fewest copies of each title that meet the target availability, found for all titles together"""
+    load = np.asarray(load, dtype=float)
+    needed = np.zeros(len(load), dtype=int)
+    pending = load > 0
+    blocking = np.ones_like(load)
+    k = 0
+    while pending.any():
+        k += 1
+        blocking = load * blocking / (k + load * blocking)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            waits = np.where(load < k, k * blocking / (k - load * (1 - blocking)), 1.0)
+        met = pending & (1 - waits >= target)
+        needed[met] = k
+        pending &= ~met
+    return needed
+
+class GameLibrary:
+    """Catalog of titles with copies and popularity, indexed by normalized title.
+
+    Lookups are a dict hit; prefix search bisects the sorted keys; queue
+    and sizing calculations run over the copy and popularity arrays.
+    """
+
+    def __init__(self, titles, copies=None, popularity=None):
+        self.names = list(titles)
+        self.keys = [normalize_title(name) for name in self.names]
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        self.copies = np.array(copies if copies is not None else [DEFAULT_COPIES] * len(self.names), dtype=int)
+        self.popularity = np.array(popularity if popularity is not None else [BASE_MENTIONS] * len(self.names), dtype=float)
+        self.sorted_keys = sorted(self.index)
+
+    @classmethod
+    def from_roster(cls, members, catalog=None):
+        """Library of the roster's mentioned titles plus any catalog titles ({title: copies}).
+
+        Without a catalog every title is assumed to have DEFAULT_COPIES;
+        with one, mentioned titles missing from it have none.
+        """
+        mentions = title_mentions(members)
+        for title in catalog or {}:
+            key = normalize_title(title)
+            _, count = mentions.get(key, (title, 0.0))
+            mentions[key] = (title, max(count, BASE_MENTIONS))
+        copies = {normalize_title(title): count for title, count in (catalog or {}).items()}
+        missing = 0 if catalog else DEFAULT_COPIES
+        return cls(
+            [name for name, _ in mentions.values()],
+            [copies.get(key, missing) for key in mentions],
+            [count for _, count in mentions.values()]
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, title):
+        """Row for a title by any spelling that normalizes the same, or None"""
+        return self.index.get(normalize_title(title))
+
+    def search(self, prefix, limit=10):
+        """Titles whose normalized name starts with prefix, alphabetically"""
+        key = normalize_title(prefix)
+        start = bisect.bisect_left(self.sorted_keys, key)
+        matches = []
+        for candidate in self.sorted_keys[start:]:
+            if not candidate.startswith(key) or len(matches) >= limit:
+                break
+            matches.append(self.names[self.index[candidate]])
+        return matches
+
+    def offered_load(self, M, loan_days=LOAN_DAYS):
+        """Mean copies of each title out on loan if copies were unlimited"""
+        share = self.popularity / self.popularity.sum() if self.popularity.sum() else self.popularity
+        return monthly_checkouts(M) * share * loan_days / DAYS_PER_MONTH
+
+    def report(self, M=300, target=TARGET_AVAILABILITY, loan_days=LOAN_DAYS, top=10):
+        """Checkout queues for M members at current copies, and the copies that would meet the target"""
+        start = time.perf_counter()
+        load = self.offered_load(M, loan_days)
+        current = queue_metrics(load, self.copies, loan_days)
+        needed = copies_needed(load, target)
+        short = np.flatnonzero(needed > self.copies)
+        worst = short[np.lexsort((-load[short], -current['wait_days'][short]))][:top]
+        checkouts = monthly_checkouts(M)
+        return {
+            'members': M,
+            'titles': len(self),
+            'checkouts_per_month': checkouts,
+            'copies_owned': int(self.copies.sum()),
+            'copies_needed': int(np.maximum(needed, self.copies).sum()),
+            'copies_to_add': int(np.maximum(needed - self.copies, 0).sum()),
+            'target_availability': target,
+            # Share of all checkout requests that find a copy, at current copies
+            'availability': float((current['availability'] * load).sum() / load.sum()) if load.sum() else 1.0,
+            'titles_below_target': len(short),
+            'shortfalls': [
+                {
+                    'title': self.names[row],
+                    'copies': int(self.copies[row]),
+                    'copies_needed': int(needed[row]),
+                    'checkouts_per_month': float(load[row] * DAYS_PER_MONTH / loan_days),
+                    'availability': float(current['availability'][row]),
+                    'wait_days': float(current['wait_days'][row]),
+                    'queue_length': float(current['queue_length'][row])
+                }
+                for row in worst
+            ],
+            'elapsed_ms': (time.perf_counter() - start) * 1000
+        }
+
+def load_catalog(path):
+    """{title: copies} from a CSV with 'Title' and 'Copies' columns"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return {row['Title']: int(row.get('Copies') or DEFAULT_COPIES) for row in csv.DictReader(f)}
+
+def print_library(roster_path='OBG_Members_Processed.csv', M=300, catalog_path=None):
+    """Print checkout availability and the titles that need more copies"""
+    catalog = load_catalog(catalog_path) if catalog_path else None
+    library = GameLibrary.from_roster(iter_members(roster_path), catalog)
+    result = library.report(M)
+    print(f"\nGame Library for {M} Members ({result['titles']} titles, {result['elapsed_ms']:.1f} ms)")
+    print("=" * 50)
+    print(f"Checkouts per month: {result['checkouts_per_month']:.0f}")
+    print(f"Availability at current copies: {result['availability'] * 100:.1f}% "
+          f"(target {result['target_availability'] * 100:.0f}%)")
+    print(f"Copies: {result['copies_owned']} owned, {result['copies_needed']} needed "
+          f"({result['copies_to_add']} to add for {result['titles_below_target']} titles)")
+    for shortfall in result['shortfalls']:
+        print(f"  {shortfall['title']}: {shortfall['copies']} -> {shortfall['copies_needed']} copies, "
+              f"{shortfall['availability'] * 100:.0f}% available, {shortfall['wait_days']:.1f} day wait")
+
+if __name__ == "__main__":
+    print_library(
+        sys.argv[1] if len(sys.argv) > 1 else 'OBG_Members_Processed.csv',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+        sys.argv[3] if len(sys.argv) > 3 else None
+    )
@@ -0,0 +1,223 @@
+# ABOUTME: Multi-month membership projection with signup ramp, per-persona churn and a shifting signup mix
+# ABOUTME: Simulates many scenarios as NumPy arrays, checks seating capacity each month and reports revenue and first capacity breaks
+
+import sys
+import time
+
+import numpy as np
+
+import planner
+from mix_optimizer import persona_demands, persona_revenues
+
+# Monthly share of each persona's members who cancel
+DEFAULT_CHURN = {
+    'casual': 0.08,
+    'students': 0.10,   # Leave at graduation and over the summer
+    'families': 0.04,
+    'hobbyists': 0.03,
+    'everyday': 0.02
+}
+DEFAULT_SIGNUPS = 40    # New members per month once the ramp is over
+DEFAULT_RAMP_MONTHS = 6 # Signups grow linearly to DEFAULT_SIGNUPS over the opening months
+
+FEASIBILITY_TOLERANCE = 1e-6  # Unmet seat-blocks treated as zero
+
+class FeasibilityCache:
+    """Decides whether monthly demand vectors fit the tables, solving as few LPs as possible.
+
+    The demands that fit form a convex set that is closed downwards, so
+    two kinds of remembered answers settle most queries with array math:
+
+    * every feasible demand found is stored scaled up to the edge of the
+      capacity, and anything at or below one of those points fits;
+    * every infeasible LP contributes its dual solution (y, z), a cut with
+      unmet seat-blocks >= y.d + z.capacity for every demand d, so anything
+      with a positive bound does not fit.
+
+    Only demands neither rule settles are solved, and each solve adds a
+    point or a cut, so a run with thousands of distinct member counts
+    needs a handful of LPs. The cache is kept per capacity and reused.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity or planner.monthly_capacity()
+        self.keys = list(planner.DEMAND_CONSTRAINTS)
+        self.points = np.empty((0, len(self.keys)))
+        self.cut_weights = np.empty((0, len(self.keys)))
+        self.cut_offsets = np.empty(0)
+        self.solves = 0
+
+    def _solve(self, demand):
+        self.solves += 1
+        demand_dict = dict(zip(self.keys, demand.tolist()))
+        scale = planner.max_member_capacity(demand_dict, self.capacity)
+        if scale is None or scale >= 1:
+            edge = demand if scale is None else demand * scale
+            self.points = np.vstack([self.points, edge])
+            return
+        duals = planner.solve_capacity_duals(demand_dict, self.capacity)
+        weights = [duals['demand'][key]['shadow_price'] for key in self.keys]
+        offset = sum(duals['capacity'][table_type]['shadow_price'] * blocks
+                     for table_type, blocks in self.capacity.items())
+        self.cut_weights = np.vstack([self.cut_weights, weights])
+        self.cut_offsets = np.append(self.cut_offsets, offset)
+
+    def _decide(self, demands):
+        """1 = fits, 0 = does not fit, -1 = unknown, for each row of demands"""
+        decided = np.full(len(demands), -1)
+        if len(self.cut_offsets):
+            bounds = demands @ self.cut_weights.T + self.cut_offsets
+            decided[(bounds > FEASIBILITY_TOLERANCE).any(axis=1)] = 0
+        if len(self.points):
+            undecided = decided == -1
+            covered = (demands[undecided, None, :] <= self.points[None, :, :] + FEASIBILITY_TOLERANCE).all(axis=2).any(axis=1)
+            decided[np.flatnonzero(undecided)[covered]] = 1
+        return decided
+
+    def fits(self, demands):
+        """Boolean array: whether each row of demands (one column per demand key) fits the capacity"""
+        demands = np.asarray(demands, dtype=float)
+        unique, inverse = np.unique(np.round(demands, 6), axis=0, return_inverse=True)
+        decided = self._decide(unique)
+        while (decided == -1).any():
+            undecided = np.flatnonzero(decided == -1)
+            # The largest undecided demand settles the most others either way
+            self._solve(unique[undecided[np.argmax(unique[undecided].sum(axis=1))]])
+            decided[undecided] = self._decide(unique[undecided])
+        return (decided == 1)[inverse.reshape(-1)]
+
+_caches = {}
+
+def feasibility_cache(capacity=None):
+    """The shared FeasibilityCache for a capacity"""
+    capacity = capacity or planner.monthly_capacity()
+    key = tuple(sorted(capacity.items()))
+    if key not in _caches:
+        _caches[key] = FeasibilityCache(capacity)
+    return _caches[key]
+
+def signup_schedule(months, signups=DEFAULT_SIGNUPS, ramp_months=DEFAULT_RAMP_MONTHS):
+    """Expected new members in each month: a linear ramp up to the steady signup rate"""
+    ramp = np.minimum(1.0, np.arange(1, months + 1) / max(ramp_months, 1))
+    return signups * ramp
+
+def month_capacities(months, start_month=None):
+    """Table capacity of each of the months from start_month (default the planning month) on.
+
+    Block counts come from the planner's operating calendar, so short
+    months and closures give smaller capacities.
+    """
+    year, month = start_month or planner.PLANNING_MONTH
+    tables = {'4_top': planner.NUM_4_TOP, '8_top': planner.NUM_8_TOP,
+              '6_top': planner.NUM_6_TOP, '2_top': planner.NUM_2_TOP}
+    capacities = []
+    for offset in range(months):
+        blocks = planner.PLANNING_CALENDAR.block_count(year + (month - 1 + offset) // 12, (month - 1 + offset) % 12 + 1)
+        capacities.append({table_type: count * blocks for table_type, count in tables.items()})
+    return capacities
+
+def project_growth(months=36, scenarios=1000, initial_members=0, signups=DEFAULT_SIGNUPS,
+                   ramp_months=DEFAULT_RAMP_MONTHS, churn=None, start_mix=None, end_mix=None,
+                   capacity=None, start_month=None, seed=0):
+    """Project membership, capacity and revenue month by month over many random scenarios.
+
+    Each month every persona loses a binomial share of its members to
+    churn and gains a Poisson number of signups split multinomially by the
+    signup mix, which moves linearly from start_mix to end_mix. Demand
+    and revenue are the member counts times per-member persona vectors,
+    computed for all months and scenarios at once; capacity uses the
+    planner's seating LP relaxation through a shared FeasibilityCache.
+    Month 1 is start_month (default the planning month) and each month is
+    checked against its own calendar's blocks, unless a fixed capacity is
+    given for every month.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    churn = churn or DEFAULT_CHURN
+    start_mix = start_mix or planner.PERSONA_DISTRIBUTION
+    end_mix = end_mix or start_mix
+    persona_types = list(planner.PERSONAS)
+
+    churn_rates = np.array([churn.get(p, 0.0) for p in persona_types])
+    mix_start = np.array([start_mix.get(p, 0.0) for p in persona_types])
+    mix_end = np.array([end_mix.get(p, 0.0) for p in persona_types])
+    expected_signups = signup_schedule(months, signups, ramp_months)
+
+    # Member counts for every month, scenario and persona
+    counts = np.empty((months, scenarios, len(persona_types)), dtype=np.int64)
+    members = np.tile(np.round(mix_start / mix_start.sum() * initial_members).astype(np.int64), (scenarios, 1))
+    for month in range(months):
+        share = month / (months - 1) if months > 1 else 0
+        mix = mix_start + (mix_end - mix_start) * share
+        new = rng.multinomial(rng.poisson(expected_signups[month], size=scenarios), mix / mix.sum())
+        members = members - rng.binomial(members, churn_rates) + new
+        counts[month] = members
+
+    demands = persona_demands()
+    keys = list(planner.DEMAND_CONSTRAINTS)
+    demand_matrix = np.array([[demands[p][key] for key in keys] for p in persona_types])
+    revenues = persona_revenues()
+    revenue_vector = np.array([revenues[p]['total'] for p in persona_types])
+
+    monthly_demand = counts @ demand_matrix          # months x scenarios x demand keys
+    revenue = counts @ revenue_vector                # months x scenarios
+    totals = counts.sum(axis=2)                      # months x scenarios
+
+    # Months with the same block count share a capacity and its cache
+    capacities = [capacity] * months if capacity else month_capacities(months, start_month)
+    groups = {}
+    for month, month_capacity in enumerate(capacities):
+        groups.setdefault(tuple(sorted(month_capacity.items())), []).append(month)
+    fits = np.empty((months, scenarios), dtype=bool)
+    lp_solves = 0
+    for key, group in groups.items():
+        cache = feasibility_cache(dict(key))
+        solves_before = cache.solves
+        fits[group] = cache.fits(monthly_demand[group].reshape(-1, len(keys))).reshape(len(group), scenarios)
+        lp_solves += cache.solves - solves_before
+
+    broken = ~fits
+    first_break = np.where(broken.any(axis=0), broken.argmax(axis=0) + 1, 0)  # 1-based month, 0 = never
+
+    def percentiles(values):
+        p10, p50, p90 = np.percentile(values, [10, 50, 90], axis=1)
+        return {'p10': p10.tolist(), 'p50': p50.tolist(), 'p90': p90.tolist()}
+
+    broke = first_break[first_break > 0]
+    return {
+        'months': months,
+        'scenarios': scenarios,
+        'members': percentiles(totals),
+        'revenue': percentiles(revenue),
+        'members_by_persona': {p: counts[:, :, i].mean(axis=1).tolist() for i, p in enumerate(persona_types)},
+        'over_capacity_share': broken.mean(axis=1).tolist(),
+        'capacity': capacities,
+        'first_capacity_break': {
+            'share_of_scenarios': len(broke) / scenarios if scenarios else 0,
+            'median_month': float(np.median(broke)) if len(broke) else None,
+            'earliest_month': int(broke.min()) if len(broke) else None
+        },
+        'lp_solves': lp_solves,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_projection(months=36, scenarios=1000):
+    """Print the median membership and revenue path and when capacity first breaks"""
+    result = project_growth(months, scenarios)
+    print(f"\nGrowth Projection: {months} months x {scenarios} scenarios "
+          f"({result['lp_solves']} LP solves, {result['elapsed_ms']:.0f} ms)")
+    print("=" * 50)
+    for month in range(0, months, 3):
+        print(f"Month {month + 1:>2}: {result['members']['p50'][month]:>5.0f} members "
+              f"(p10 {result['members']['p10'][month]:.0f}, p90 {result['members']['p90'][month]:.0f}), "
+              f"${result['revenue']['p50'][month]:>9,.0f}/mo, "
+              f"{result['over_capacity_share'][month] * 100:.0f}% over capacity")
+    first_break = result['first_capacity_break']
+    if first_break['median_month'] is None:
+        print("\nCapacity holds in every scenario")
+    else:
+        print(f"\nCapacity breaks in {first_break['share_of_scenarios'] * 100:.0f}% of scenarios, "
+              f"first in month {first_break['earliest_month']} (median month {first_break['median_month']:.0f})")
+
+if __name__ == "__main__":
+    print_projection(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,112 @@
+# ABOUTME: Revenue-maximizing member mix: chooses how many members of each persona to sign up within seating capacity
+# ABOUTME: One small MILP with per-persona member counts as variables and the planner's seating constraints
+
+import sys
+import time
+
+import planner
+from revenue_planner import REVENUE_COMPONENTS, RevenuePlanner
+
+def persona_demands(personas=None):
+    """Monthly demand of one member of each persona, by demand key"""
+    personas = personas or planner.PERSONAS
+    return {
+        persona_type: planner.demand_per_member({persona_type: 1.0}, personas)
+        for persona_type in personas
+    }
+
+def persona_revenues(revenue_planner=None):
+    """Monthly revenue components of one member of each persona on their best plan"""
+    revenue_planner = revenue_planner or RevenuePlanner()
+    return {persona_type: revenue_planner.persona_revenue(persona_type) for persona_type in planner.PERSONAS}
+
+def optimize_mix(bounds=None, max_members=None, integer=True, capacity=None, revenues=None):
+    """Member count per persona that maximizes monthly revenue within the tables.
+
+    bounds maps a persona to (min, max) member counts, either of which may
+    be None, for marketing limits such as "at most 40 students". max_members
+    caps the total. Table usage is the planner's seating model relaxed to
+    fractional blocks (as in planner.max_member_capacity), with whole
+    members unless integer=False.
+    """
+    import pulp
+
+    start = time.perf_counter()
+    bounds = bounds or {}
+    capacity = capacity or planner.monthly_capacity()
+    revenues = revenues or persona_revenues()
+    demands = persona_demands()
+    persona_types = list(demands)
+
+    model = pulp.LpProblem("Member_Mix", pulp.LpMaximize)
+    members = {}
+    for i, persona_type in enumerate(persona_types):
+        low, high = bounds.get(persona_type, (None, None))
+        members[persona_type] = pulp.LpVariable(f"members_{i}", low or 0, high,
+                                                cat='Integer' if integer else 'Continuous')
+    tables = planner.create_seating_variables(capacity, cat='Continuous', bounded=False)
+
+    model += pulp.lpSum(revenues[p]['total'] * members[p] for p in persona_types)
+
+    planner.add_capacity_constraints(model, tables, capacity)
+    supply = planner.demand_supply(tables)
+    for demand_key, constraint_name in planner.DEMAND_CONSTRAINTS.items():
+        model += supply[demand_key] >= pulp.lpSum(
+            demands[p][demand_key] * members[p] for p in persona_types
+        ), constraint_name
+    if max_members is not None:
+        model += pulp.lpSum(members.values()) <= max_members, "max_members"
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False))
+    status = pulp.LpStatus[model.status]
+    if status != 'Optimal':
+        return {'status': status, 'elapsed_ms': (time.perf_counter() - start) * 1000}
+
+    counts = {p: round(members[p].value() or 0, 6) for p in persona_types}
+    total_members = sum(counts.values())
+    breakdown = {
+        component: sum(revenues[p][component] * counts[p] for p in persona_types)
+        for component in REVENUE_COMPONENTS
+    }
+    total_revenue = sum(breakdown.values())
+
+    constraints = model.constraints
+    return {
+        'status': status,
+        'total_members': total_members,
+        'total_revenue': total_revenue,
+        'members': counts,
+        'distribution': {p: counts[p] / total_members if total_members else 0 for p in persona_types},
+        'persona_revenues': {
+            p: {
+                'plan_type': revenues[p]['plan_type'],
+                'per_member': revenues[p]['total'],
+                'member_count': counts[p],
+                'total': revenues[p]['total'] * counts[p]
+            }
+            for p in persona_types
+        },
+        'revenue_breakdown': breakdown,
+        'table_utilization': {
+            table_type: (blocks - constraints[f"{table_type}_capacity"].slack) / blocks * 100 if blocks else 0
+            for table_type, blocks in capacity.items()
+        },
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_mix(max_members=None):
+    """Print the revenue-maximizing member mix"""
+    result = optimize_mix(max_members=max_members)
+    if result['status'] != 'Optimal':
+        print(f"No feasible member mix ({result['status']})")
+        return
+    print(f"\nRevenue-Maximizing Member Mix ({result['elapsed_ms']:.0f} ms)")
+    print("=" * 50)
+    for persona_type, data in result['persona_revenues'].items():
+        print(f"{persona_type.title()}: {data['member_count']:.0f} members on {data['plan_type'].title()} "
+              f"(${data['per_member']:.2f}/mo each)")
+    print("-" * 50)
+    print(f"Total: {result['total_members']:.0f} members, ${result['total_revenue']:,.2f}/month")
+
+if __name__ == "__main__":
+    print_mix(float(sys.argv[1]) if len(sys.argv) > 1 else None)
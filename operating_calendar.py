@@ -0,0 +1,160 @@
+# ABOUTME: Operating-hours calendar that lists the exact 3-hour blocks of any real month
+# ABOUTME: Weekly opening hours plus dated closures and special hours, read from config.json's 'calendar' section and cached per month
+
+import calendar
+import datetime
+import json
+import os
+import sys
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+BLOCK_HOURS = 3
+WEEKDAYS = list(calendar.day_name)   # Monday first, matching date.weekday()
+WEEKEND = ('Saturday', 'Sunday')
+
+# Regular opening hours as (open, close) on a 24-hour clock; a day without hours is closed.
+# Weekdays 5PM-11PM and weekends 9AM-11PM: two blocks a weekday and four a weekend day.
+DEFAULT_HOURS = {
+    'Monday': (17, 23),
+    'Tuesday': (17, 23),
+    'Wednesday': (17, 23),
+    'Thursday': (17, 23),
+    'Friday': (17, 23),
+    'Saturday': (9, 23),
+    'Sunday': (9, 23)
+}
+
+def format_hours(hours):
+    """'5PM-11PM' for (17, 23), or 'closed'"""
+    if not hours:
+        return 'closed'
+    return '-'.join(f"{(hour - 1) % 12 + 1}{'AM' if hour % 24 < 12 else 'PM'}" for hour in hours)
+
+def block_starts(hours):
+    """Start hours of the whole 3-hour blocks that fit in (open, close), or none when closed"""
+    if not hours:
+        return []
+    opening, closing = hours
+    return list(range(int(opening), int(closing) - BLOCK_HOURS + 1, BLOCK_HOURS))
+
+class OperatingCalendar:
+    """Opening-hours rules and their exceptions, expanded into concrete blocks month by month.
+
+    exceptions maps a date to its hours for that day, or None when closed.
+    Dates are 'YYYY-MM-DD' for one day or 'MM-DD' for the same day every
+    year (e.g. '12-25'); a full date wins over a yearly one. Generated
+    months are cached on the calendar.
+    """
+
+    def __init__(self, hours=None, exceptions=None):
+        self.hours = {day: tuple(h) if h else None for day, h in (hours or DEFAULT_HOURS).items()}
+        self.exceptions = {key: tuple(h) if h else None for key, h in (exceptions or {}).items()}
+        self._months = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Calendar from a config's 'calendar' section ('hours' and 'exceptions'), defaulting to DEFAULT_HOURS"""
+        section = (config or {}).get('calendar') or {}
+        hours = dict(DEFAULT_HOURS, **section.get('hours', {}))
+        return cls(hours, section.get('exceptions'))
+
+    def day_hours(self, date):
+        """(open, close) for a date after exceptions, or None when closed"""
+        for key in (date.isoformat(), date.strftime('%m-%d')):
+            if key in self.exceptions:
+                return self.exceptions[key]
+        return self.hours.get(WEEKDAYS[date.weekday()])
+
+    def month_blocks(self, year, month):
+        """Every block of a month in time order.
+
+        Each block has its index, day of the month (0-based), date, weekday
+        name, start hour and whether it falls on a weekend. The list is
+        cached; callers that modify blocks should copy them first.
+        """
+        key = (year, month)
+        if key not in self._months:
+            blocks = []
+            for day in range(calendar.monthrange(year, month)[1]):
+                date = datetime.date(year, month, day + 1)
+                weekday = WEEKDAYS[date.weekday()]
+                for start_hour in block_starts(self.day_hours(date)):
+                    blocks.append({
+                        'index': len(blocks),
+                        'day': day,
+                        'date': date.isoformat(),
+                        'weekday': weekday,
+                        'start_hour': start_hour,
+                        'weekend': weekday in WEEKEND
+                    })
+            self._months[key] = blocks
+        return self._months[key]
+
+    def block_count(self, year, month):
+        """Number of blocks the venue is open in a month"""
+        return len(self.month_blocks(year, month))
+
+    def block_counts(self, year, month):
+        """Weekday and weekend block counts in a month"""
+        blocks = self.month_blocks(year, month)
+        weekend = sum(1 for block in blocks if block['weekend'])
+        return {'weekday': len(blocks) - weekend, 'weekend': weekend, 'total': len(blocks)}
+
+def load_config(path=CONFIG_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def planning_month(config=None, today=None):
+    """(year, month) being planned: the config's calendar 'planning_month' ('YYYY-MM'), else the current month"""
+    configured = ((config or {}).get('calendar') or {}).get('planning_month')
+    if configured:
+        year, month = configured.split('-')
+        return int(year), int(month)
+    today = today or datetime.date.today()
+    return today.year, today.month
+
+_cache = {'version': None, 'config': None, 'calendar': None}
+
+def current_calendar(path=CONFIG_FILE, today=None):
+    """The calendar for the config file as it is now and the month to plan.
+
+    The file is re-read only when it changes; the month is worked out on
+    every call, so without a configured 'planning_month' it moves on when
+    the calendar month does.
+    """
+    try:
+        stat = os.stat(path)
+        version = (path, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        version = (path, None)
+    if _cache['calendar'] is None or _cache['version'] != version:
+        _cache['config'] = load_config(path)
+        _cache['calendar'] = OperatingCalendar.from_config(_cache['config'])
+        _cache['version'] = version
+    return _cache['calendar'], planning_month(_cache['config'], today)
+
+def print_calendar(year=None, month=None):
+    """Print a month's blocks per day and its block counts"""
+    operating, planned = current_calendar()
+    year, month = (year, month) if year else planned
+    blocks = operating.month_blocks(year, month)
+    print(f"\nOperating Calendar for {calendar.month_name[month]} {year}")
+    print("=" * 50)
+    by_date = {}
+    for block in blocks:
+        by_date.setdefault((block['date'], block['weekday']), []).append(block['start_hour'])
+    for (date, weekday), starts in by_date.items():
+        print(f"{date} {weekday:<9} " + ", ".join(f"{hour}:00" for hour in starts))
+    counts = operating.block_counts(year, month)
+    print(f"\nBlocks: {counts['total']} ({counts['weekday']} weekday, {counts['weekend']} weekend)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        year, month = sys.argv[1].split('-')
+        print_calendar(int(year), int(month))
+    else:
+        print_calendar()
@@ -0,0 +1,87 @@
+# ABOUTME: Rule-based clustering of roster members into the five personas over NumPy arrays
+# ABOUTME: Accumulates counts and visit sums batch by batch so PERSONA_DISTRIBUTION can be derived from real members
+
+import json
+import re
+import sys
+
+import numpy as np
+
+import planner
+from roster_ingest import PersonaAggregator, iter_members, persona_visit_totals
+
+# Free-text columns that carry persona signals
+TEXT_COLUMNS = ['Fav game today', 'Looking to play', 'How often you want to play']
+
+FAMILY_PATTERN = re.compile(r'\b(?:kids?|family|children|child|son|daughter|parent|wife|husband|spouse|partner)\b')
+STUDENT_PATTERN = re.compile(r'\b(?:student|college|university|campus|school|class(?:es)?|dorm)\b')
+HOBBYIST_PATTERN = re.compile(
+    r'\b(?:heavy|heavier|euros?|strategy|strategic|weight|engine|economic|crunchy|complex|campaign|'
+    r'legacy|war\s*games?|rpgs?|4x|deck.?build\w*|worker.?placement)\b'
+)
+
+EVERYDAY_MIN_VISITS = 12   # Visits per month (three or more a week) that make a member 'everyday' whatever they say
+# Personas a visit rate alone can point to; families and students need a text signal
+FREQUENCY_PERSONAS = ['casual', 'hobbyists', 'everyday']
+
+def member_arrays(members):
+    """Visits and lower-cased free text for a list of members, as NumPy arrays"""
+    visits = np.array([float(m.get('Visits per month') or 'nan') for m in members])
+    text = np.array([' '.join(m.get(column) or '' for column in TEXT_COLUMNS).lower() for m in members])
+    return visits, text
+
+def signal(pattern, text):
+    """Boolean array marking the rows whose text matches a pattern"""
+    return np.fromiter((pattern.search(t) is not None for t in text), dtype=bool, count=len(text))
+
+def nearest_by_visits(visits, personas, candidates=FREQUENCY_PERSONAS):
+    """Index (into personas) of the candidate persona whose monthly visits are closest to each member's"""
+    totals = persona_visit_totals()
+    candidates = [persona_type for persona_type in candidates if persona_type in personas]
+    distance = np.abs(visits[:, None] - np.array([totals[persona_type] for persona_type in candidates]))
+    return np.array([personas.index(persona_type) for persona_type in candidates])[distance.argmin(axis=1)]
+
+def assign_personas(visits, text, personas=None):
+    """Persona index (into personas) for each member, or -1 when visits are unknown.
+
+    Rules are applied in order: very frequent players are 'everyday',
+    then family, student and heavy-game mentions pick families, students
+    and hobbyists. Everyone else gets the casual, hobbyist or everyday
+    persona whose visit rate in PERSONAS is nearest their own. These are
+    the only persona rules; roster_ingest and /api/games both use them.
+    """
+    personas = list(personas or planner.PERSONA_DISTRIBUTION)
+    index = {persona_type: i for i, persona_type in enumerate(personas)}
+
+    frequent = np.nan_to_num(visits)
+    known = frequent > 0
+    assigned = np.select(
+        [
+            ~known,
+            frequent >= EVERYDAY_MIN_VISITS,
+            signal(FAMILY_PATTERN, text),
+            signal(STUDENT_PATTERN, text),
+            signal(HOBBYIST_PATTERN, text)
+        ],
+        [-1, index['everyday'], index['families'], index['students'], index['hobbyists']],
+        default=nearest_by_visits(frequent, personas)
+    )
+    return assigned
+
+class PersonaClusterer(PersonaAggregator):
+    """Persona counts and visit sums updated a batch of members at a time.
+
+    New members can be added at any point; profile() reflects everyone seen so far.
+    """
+
+    def add_batch(self, members):
+        """Assign a batch of members and fold them into the running totals"""
+        return self.add_chunk(members)
+
+def cluster_roster(path):
+    """Stream a roster file into a persona profile using the clustering rules"""
+    return PersonaClusterer().add_all(iter_members(path)).profile()
+
+if __name__ == "__main__":
+    roster_path = sys.argv[1] if len(sys.argv) > 1 else 'OBG_Members_Processed.csv'
+    print(json.dumps(cluster_roster(roster_path), indent=2))
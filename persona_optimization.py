@@ -11,12 +11,12 @@ class PersonaOptimizer:
     def optimize_personas(self):
         """Analyze personas and return optimization results."""
         optimized_personas = []
+        table = self.calculator.value_table()
         
         for persona_type, persona_data in planner.PERSONAS.items():
-            # Calculate value ratios for different plans
-            value_ratios = {}
-            for plan_type in ['basic', 'standard', 'family']:
-                value_ratios[plan_type] = self.calculator.calculate_value_ratio(persona_type, plan_type)
+            # Value ratios for every plan, from the batched value table
+            j = table['personas'].index(persona_type)
+            value_ratios = {plan_type: float(ratio) for plan_type, ratio in zip(table['plans'], table['ratios'][:, j])}
             
             # Find best fit plans
             best_plans = [
@@ -0,0 +1,152 @@
+# ABOUTME: Data-driven membership plan catalog loaded from config.json with numeric feature definitions
+# ABOUTME: Precomputes every plan's value, features and labels once per config version
+
+import json
+import os
+
+import planner
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+# Numeric plan features and their values when a plan leaves them out
+FEATURE_DEFAULTS = {
+    'guest_passes': 0,
+    'retail_discount': 0.0,
+    'snack_discount': 0.0,
+    'mixed_access': False,
+    'additional_members': 0,
+    'game_checkouts': 0
+}
+
+def _plural(count, singular, plural=None):
+    label = singular if count == 1 else (plural or singular + 's')
+    return f"{count:g} {label}"
+
+def feature_labels(features):
+    """Display labels for a plan's numeric features"""
+    labels = []
+    if features['guest_passes']:
+        labels.append(_plural(features['guest_passes'], 'Guest Pass', 'Guest Passes'))
+    if features['retail_discount']:
+        labels.append(f"{features['retail_discount'] * 100:g}% Retail Discount")
+    if features['mixed_access']:
+        labels.append('Mixed Event Access')
+    if features['additional_members']:
+        labels.append(_plural(features['additional_members'], 'Additional Member'))
+    if features['game_checkouts']:
+        labels.append(_plural(features['game_checkouts'], 'Game Checkout'))
+    return labels
+
+def plan_value(features):
+    """Headline monthly value of a plan's features (before persona-specific value)"""
+    value = planner.BASE_VISIT_VALUE
+    value += features['guest_passes'] * planner.GUEST_PRICE
+    if features['mixed_access']:
+        value += planner.MIXED_VALUE
+    value += features['game_checkouts'] * planner.GAME_CHECKOUT_VALUE
+    return min(value, planner.BASE_VALUE_CAP)
+
+def _numeric_features(plan_type, features):
+    result = dict(FEATURE_DEFAULTS)
+    for key, value in features.items():
+        if key not in FEATURE_DEFAULTS:
+            raise ValueError(f"Unknown feature '{key}' in plan '{plan_type}'")
+        if isinstance(value, bool) != isinstance(FEATURE_DEFAULTS[key], bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Feature '{key}' in plan '{plan_type}' must be "
+                             f"{'true/false' if isinstance(FEATURE_DEFAULTS[key], bool) else 'a number'}")
+        result[key] = value
+    return result
+
+class PlanCatalog:
+    """Every plan's price, features, labels and value, computed once.
+
+    Plans come from the config's 'plans' section (numeric 'features', an
+    optional 'price' and optional 'labels') on top of planner.DEFAULT_PLANS.
+    Prices in 'plan_prices' ("<plan>_plan_price") take precedence, since
+    that is what the dashboard edits. A plan whose 'features' is a list of
+    strings is treated as labels for a default plan. The returned dicts are
+    shared, so callers should not modify them.
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        definitions = {name: dict(plan) for name, plan in planner.DEFAULT_PLANS.items()}
+        for name, plan in (config.get('plans') or {}).items():
+            name = name.lower()
+            base = definitions.get(name, {})
+            features = plan.get('features', base.get('features', {}))
+            labels = plan.get('labels')
+            if isinstance(features, list):
+                if name not in planner.DEFAULT_PLANS:
+                    raise ValueError(f"Plan '{name}' needs numeric features")
+                labels = labels or features
+                features = base['features']
+            definitions[name] = {
+                'price': plan.get('price', base.get('price')),
+                'features': features,
+                'labels': labels
+            }
+
+        plan_prices = config.get('plan_prices') or {}
+        self.plans = {}
+        for name, definition in definitions.items():
+            price = plan_prices.get(f"{name}_plan_price", definition['price'])
+            if price is None:
+                raise ValueError(f"Plan '{name}' needs a price")
+            price = float(price)
+            if price <= 0:
+                raise ValueError(f"Plan '{name}' must have a positive price")
+            features = _numeric_features(name, definition['features'])
+            value = float(plan_value(features))
+            self.plans[name] = {
+                'plan_type': name,
+                'price': price,
+                'monthly_value': value,
+                'value_ratio': value / price,
+                'features': features,
+                'labels': list(definition.get('labels') or feature_labels(features))
+            }
+
+    def plan_types(self):
+        return list(self.plans)
+
+    def value(self, plan_type):
+        """Price, value and numeric features of a plan"""
+        try:
+            return self.plans[plan_type.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid plan type: {plan_type}")
+
+    def labels(self, plan_type):
+        """Display labels of a plan's features ([] for an unknown plan)"""
+        plan = self.plans.get(plan_type.lower())
+        return plan['labels'] if plan else []
+
+    def to_config(self):
+        """The catalog as a config 'plans' section"""
+        return {
+            name: {'price': plan['price'], 'features': dict(plan['features']), 'labels': list(plan['labels'])}
+            for name, plan in self.plans.items()
+        }
+
+_cache = {'version': None, 'catalog': None}
+
+def config_version(path=CONFIG_FILE):
+    """Cheap version stamp of the config file (modification time and size)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def current_catalog(path=CONFIG_FILE):
+    """The plan catalog for the config file as it is now, rebuilt only when the file changes"""
+    version = config_version(path)
+    if _cache['catalog'] is None or _cache['version'] != (path, version):
+        config = {}
+        if version is not None:
+            with open(path, 'r') as f:
+                config = json.load(f)
+        _cache['catalog'] = PlanCatalog(config)
+        _cache['version'] = (path, version)
+    return _cache['catalog']
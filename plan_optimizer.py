@@ -2,6 +2,7 @@
 # ABOUTME: Analyzes which plans provide best value for each customer persona type
 
 import planner
+import value_kernel
 from value_calculator import ValueCalculator
 
 class PlanOptimizer:
@@ -11,15 +12,14 @@ class PlanOptimizer:
     def optimize_pricing(self):
         """Analyze plans and return optimization results."""
         optimized_plans = []
+        table = self.value_calculator.value_table()
         
-        for plan_type in ['basic', 'standard', 'family']:
+        for i, plan_type in enumerate(table['plans']):
             # Get fresh plan data
             plan_data = planner.calculate_plan_value(plan_type)
             
-            # Calculate value ratios for different personas
-            value_ratios = {}
-            for persona_type in planner.PERSONAS.keys():
-                value_ratios[persona_type] = self.value_calculator.calculate_value_ratio(persona_type, plan_type)
+            # Value ratios for every persona, from the batched value table
+            value_ratios = {persona_type: float(ratio) for persona_type, ratio in zip(table['personas'], table['ratios'][i])}
             
             # Find best fit personas
             best_for = [
@@ -49,15 +49,17 @@ class PlanOptimizer:
 
     def print_optimization_results(self):
         """Print optimization results in a clear format."""
-        # Calculate all value ratios and collect debug info
-        value_ratios = {}
+        # Calculate all value ratios, with the families' value breakdown for the debug section
+        table = self.value_calculator.value_table()
+        plan_types = table['plans']
+        value_ratios = {
+            persona: {plan_type: float(table['ratios'][i, j]) for i, plan_type in enumerate(plan_types)}
+            for j, persona in enumerate(table['personas'])
+        }
         debug_info = []
-        for persona in planner.PERSONAS.keys():
-            value_ratios[persona] = {}
-            for plan_type in ["basic", "standard", "family"]:
-                plan_data = planner.calculate_plan_value(plan_type)
-                value = self.value_calculator.calculate_persona_value(plan_data["features"], persona, debug_info if persona == "families" else None)
-                value_ratios[persona][plan_type] = value / plan_data["price"]
+        if 'families' in table['personas']:
+            families = table['personas'].index('families')
+            debug_info = [value_kernel.breakdown(components) for components in table['components'][:, :, families].T]
 
         # Now start printing results
         print("Plan Optimization Summary")
@@ -66,11 +68,11 @@ class PlanOptimizer:
         # Print summary of which personas have each plan in their top 2 choices
         print("Most Likely Plan Selections:")
         print("------------------------------")
-        for plan_type in ["basic", "standard", "family"]:
+        for plan_type in plan_types:
             top_picks = []
             for persona in planner.PERSONAS.keys():
                 # Get this plan's rank for this persona
-                persona_ratios = [(p, value_ratios[persona][p]) for p in ["basic", "standard", "family"]]
+                persona_ratios = [(p, value_ratios[persona][p]) for p in plan_types]
                 persona_ratios.sort(key=lambda x: x[1], reverse=True)
                 if plan_type in [p for p, _ in persona_ratios[:2]]:
                     top_picks.append(f"{persona.capitalize()} ({value_ratios[persona][plan_type]:.2f}x)")
@@ -85,7 +87,7 @@ class PlanOptimizer:
         print("==================================================\n")
 
         # For each plan type
-        for plan_type in ["basic", "standard", "family"]:
+        for plan_type in plan_types:
             print(f"{plan_type.capitalize()} Plan")
             print("-" * 20)
             
@@ -103,7 +105,7 @@ class PlanOptimizer:
             print("\nBest For:")
             for persona in planner.PERSONAS.keys():
                 # Get this plan's rank for this persona
-                persona_ratios = [(p, value_ratios[persona][p]) for p in ["basic", "standard", "family"]]
+                persona_ratios = [(p, value_ratios[persona][p]) for p in plan_types]
                 persona_ratios.sort(key=lambda x: x[1], reverse=True)
                 if plan_type in [p for p, _ in persona_ratios[:2]]:
                     print(f"  - {persona.capitalize()}")
@@ -122,7 +124,7 @@ class PlanOptimizer:
         
         # Print collected debug info
         for i, debug_data in enumerate(debug_info):
-            plan_type = ["Basic", "Standard", "Family"][i]
+            plan_type = plan_types[i].capitalize()
             print(f"\n{plan_type} Plan Value Calculation:")
             print("-" * 40)
             print(f"Visit value: {debug_data['visit_value']}")
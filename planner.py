@@ -1,35 +1,85 @@
 # ABOUTME: Core capacity planning and optimization logic for tabletop library operations
 # ABOUTME: Handles table allocation, persona modeling, demand calculation, and linear programming optimization
 
-import pulp
 import math
 
+import operating_calendar
+
 # Table capacity constants
 NUM_4_TOP = 8  # Number of 4-top tables (can split into 2x2)
 NUM_8_TOP = 3  # Number of 8-top tables (can split into 4+2)
 NUM_6_TOP = 2  # Number of 6-top tables (can split into 3x2 or 4+2)
 NUM_2_TOP = 2  # Number of 2-top tables (fixed)
 
-# Time block constants (3-hour blocks)
-# Weekday blocks (M-F):
-# - Operating hours 5PM-11PM: 6hrs/day ÷ 3hr blocks = 2 blocks/day × 5 days = 10 blocks/week
-WEEKDAY_BLOCKS = 10  # 2 blocks/day * 5 days
-
-# Weekend blocks (S-S):
-# - Operating hours 9AM-11PM: 14hrs/day ÷ 3hr blocks ≈ 4.67 blocks/day × 2 days ≈ 9 blocks/week
-WEEKEND_BLOCKS = 9  # ~4.67 blocks/day * 2 days
-
-# Calculate total 3-hour blocks per month (assuming 4.33 weeks/month)
-# Weekdays: 5PM-11PM (2 blocks/day * 5 days = 10 blocks/week)
-# Weekends: 9AM-11PM (4 blocks/day * 2 days = 8 blocks/week)
-# Total: ~82 blocks/month
-TIME_BLOCKS_PER_MONTH = int((WEEKDAY_BLOCKS + WEEKEND_BLOCKS) * 4.33)  # ~82 blocks/month
+# Time blocks are 3 hours long and come from the operating calendar
+# (operating_calendar.py): weekly opening hours (weekdays 5PM-11PM, weekends
+# 9AM-11PM) plus holidays, closures and special hours from config.json's
+# 'calendar' section, expanded for a real month. Depending on how its days
+# fall, a month has 72-82 blocks, so the capacity constants
+# below use the exact count for the planning month.
+PLANNING_CALENDAR = None   # OperatingCalendar the block constants come from
+PLANNING_MONTH = None      # (year, month) the block constants describe
+TIME_BLOCKS_PER_MONTH = 0  # Blocks open in the planning month
+
+# Ways each table type can be set up for one block, as the seats of each part
+TABLE_CONFIGURATIONS = {
+    '4_top': [(4,), (2, 2)],          # Full, or split into 2x2
+    '8_top': [(8,), (4, 2)],          # Full, or split into 4+2
+    '6_top': [(6,), (2, 2, 2), (4, 2)],  # Full, split into 3x2, or split into 4+2
+    '2_top': [(2,)]                   # Fixed
+}
 
-# Total monthly table capacity
-MONTHLY_4_TOP_BLOCKS = NUM_4_TOP * TIME_BLOCKS_PER_MONTH  # 8 * 82 = 656 blocks
-MONTHLY_8_TOP_BLOCKS = NUM_8_TOP * TIME_BLOCKS_PER_MONTH  # 3 * 82 = 246 blocks
-MONTHLY_6_TOP_BLOCKS = NUM_6_TOP * TIME_BLOCKS_PER_MONTH  # 2 * 82 = 164 blocks
-MONTHLY_2_TOP_BLOCKS = NUM_2_TOP * TIME_BLOCKS_PER_MONTH  # 2 * 82 = 164 blocks
+# Total monthly table capacity, set with the planning month (tables * TIME_BLOCKS_PER_MONTH)
+MONTHLY_4_TOP_BLOCKS = 0
+MONTHLY_8_TOP_BLOCKS = 0
+MONTHLY_6_TOP_BLOCKS = 0
+MONTHLY_2_TOP_BLOCKS = 0
+
+_month_pinned = False  # Whether use_planning_month was given a month or calendar to keep
+
+def use_planning_month(year=None, month=None, operating=None):
+    """Point the block and capacity constants at a month's exact calendar.
+
+    Defaults come from config.json's 'calendar' section: its hours and
+    exceptions, and its 'planning_month' or else the current month. A
+    month or calendar passed in is kept until use_planning_month() is
+    called without them; otherwise refresh_planning_month() follows config
+    and date changes. Returns the month's block count.
+    """
+    global PLANNING_CALENDAR, PLANNING_MONTH, TIME_BLOCKS_PER_MONTH, _month_pinned
+    global MONTHLY_4_TOP_BLOCKS, MONTHLY_8_TOP_BLOCKS, MONTHLY_6_TOP_BLOCKS, MONTHLY_2_TOP_BLOCKS
+    configured, configured_month = operating_calendar.current_calendar()
+    _month_pinned = bool(year and month) or operating is not None
+    PLANNING_CALENDAR = operating or configured
+    PLANNING_MONTH = (year, month) if year and month else configured_month
+    TIME_BLOCKS_PER_MONTH = PLANNING_CALENDAR.block_count(*PLANNING_MONTH)
+    MONTHLY_4_TOP_BLOCKS = NUM_4_TOP * TIME_BLOCKS_PER_MONTH
+    MONTHLY_8_TOP_BLOCKS = NUM_8_TOP * TIME_BLOCKS_PER_MONTH
+    MONTHLY_6_TOP_BLOCKS = NUM_6_TOP * TIME_BLOCKS_PER_MONTH
+    MONTHLY_2_TOP_BLOCKS = NUM_2_TOP * TIME_BLOCKS_PER_MONTH
+    return TIME_BLOCKS_PER_MONTH
+
+def planning_month_stale():
+    """Whether config.json's calendar or the month to plan changed since the constants were set (never while pinned)"""
+    if _month_pinned:
+        return False
+    operating, month = operating_calendar.current_calendar()
+    return operating is not PLANNING_CALENDAR or month != PLANNING_MONTH
+
+def refresh_planning_month():
+    """Re-point the constants if config.json's calendar or the month to plan changed since they were set.
+
+    Long-running processes call this per request. Does nothing while a
+    month is pinned with use_planning_month(year, month). Returns whether
+    the constants changed. Callers running analyses on other threads must
+    keep them from reading the constants while this swaps them.
+    """
+    if not planning_month_stale():
+        return False
+    use_planning_month()
+    return True
+
+use_planning_month()
 
 # Revenue constants
 GUEST_PRICE = 8  # Price per guest
@@ -44,19 +94,53 @@ BASIC_PLAN_PRICE = 35
 STANDARD_PLAN_PRICE = 75
 FAMILY_PLAN_PRICE = 125
 
-# Value of additional member is tied to standard plan price
-ADDITIONAL_MEMBER_VALUE = STANDARD_PLAN_PRICE
+# Built-in plans; config.json's 'plans' section can change these or add more
+DEFAULT_PLANS = {
+    'basic': {
+        'price': BASIC_PLAN_PRICE,
+        'features': {
+            'guest_passes': 1,
+            'retail_discount': 0.1,   # 10%
+            'snack_discount': 0.1,    # 10%
+            'mixed_access': False,
+            'additional_members': 0,  # No additional members
+            'game_checkouts': 1
+        }
+    },
+    'standard': {
+        'price': STANDARD_PLAN_PRICE,
+        'features': {
+            'guest_passes': 2,
+            'retail_discount': 0.15,  # 15%
+            'snack_discount': 0.15,   # 15%
+            'mixed_access': True,
+            'additional_members': 1,  # One additional member
+            'game_checkouts': 2
+        }
+    },
+    'family': {
+        'price': FAMILY_PLAN_PRICE,
+        'features': {
+            'guest_passes': 4,
+            'retail_discount': 0.2,   # 20%
+            'snack_discount': 0.2,    # 20%
+            'mixed_access': True,
+            'additional_members': 3,  # Three additional family members
+            'game_checkouts': 4
+        }
+    }
+}
 
 # Guest spending multiplier (guests spend X times what members spend)
 GUEST_SPENDING_MULTIPLIER = 1  # Guests tend to spend a bit more
 
-# Distribution percentages
+# Distribution percentages (persona_clustering.py derives these from a member roster)
 PERSONA_DISTRIBUTION = {
-    'casual': 0.25,    # 45% casual gamers
-    'students': 0.05,  # 15% students
-    'families': 0.40,  # 15% families
-    'hobbyists': 0.25, # 15% hobbyists
-    'everyday': 0.05   # 10% everyday players
+    'casual': 0.25,    # 25% casual gamers
+    'students': 0.05,  # 5% students
+    'families': 0.40,  # 40% families
+    'hobbyists': 0.25, # 25% hobbyists
+    'everyday': 0.05   # 5% everyday players
 }
 
 # Persona prices, guests, and visit mixes
@@ -140,8 +224,9 @@ def get_spending_assumptions():
 def get_guest_spending_multiplier():
     return GUEST_SPENDING_MULTIPLIER
 
-def compute_demands(M):
-    """Compute demands for each persona type based on member count M"""
+def compute_demands(M, verbose=True):
+    """Compute demands for each persona type based on member count M, printing the breakdown when verbose"""
+    log = print if verbose else (lambda *args: None)
     distribution = PERSONA_DISTRIBUTION
     personas = PERSONAS
     
@@ -155,8 +240,8 @@ def compute_demands(M):
         'type_demands': {}       # Per-persona type demands
     }
     
-    print(f"\nDetailed Demand Analysis for {M} members:")
-    print("=" * 50)
+    log(f"\nDetailed Demand Analysis for {M} members:")
+    log("=" * 50)
     
     # For each persona type
     for persona_type, pct in distribution.items():
@@ -171,31 +256,31 @@ def compute_demands(M):
         monthly_event_visits = member_count * persona['event_visits']
         monthly_event_blocks = monthly_event_visits  # Each event visit takes one block
 
-        print(f"\n{persona_type.title()}:")
-        print(f"  Members: {member_count}")
-        print(f"  Reserved visits per month: {monthly_reserved_visits}")
-        print(f"  Event visits per month: {monthly_event_visits}")
-        print(f"  Monthly blocks needed: {monthly_reserved_blocks + monthly_event_blocks}")
-        print(f"  Group size (member + {persona['guests_per_month']} guests): {1 + persona['guests_per_month']}")
+        log(f"\n{persona_type.title()}:")
+        log(f"  Members: {member_count}")
+        log(f"  Reserved visits per month: {monthly_reserved_visits}")
+        log(f"  Event visits per month: {monthly_event_visits}")
+        log(f"  Monthly blocks needed: {monthly_reserved_blocks + monthly_event_blocks}")
+        log(f"  Group size (member + {persona['guests_per_month']} guests): {1 + persona['guests_per_month']}")
 
         # Determine table blocks needed based on group size
         if 1 + persona['guests_per_month'] <= 2:
             monthly_demands['reserved_2_blocks'] += monthly_reserved_blocks
-            print(f"  → Needs {monthly_reserved_blocks} 2-top blocks")
+            log(f"  → Needs {monthly_reserved_blocks} 2-top blocks")
         elif 1 + persona['guests_per_month'] <= 4:
             monthly_demands['reserved_4_blocks'] += monthly_reserved_blocks
-            print(f"  → Needs {monthly_reserved_blocks} 4-top blocks")
+            log(f"  → Needs {monthly_reserved_blocks} 4-top blocks")
         elif 1 + persona['guests_per_month'] <= 6:
             monthly_demands['reserved_6_blocks'] += monthly_reserved_blocks
-            print(f"  → Needs {monthly_reserved_blocks} 6-top blocks")
+            log(f"  → Needs {monthly_reserved_blocks} 6-top blocks")
         else:  # group_size <= 8
             monthly_demands['reserved_8_blocks'] += monthly_reserved_blocks
-            print(f"  → Needs {monthly_reserved_blocks} 8-top blocks")
+            log(f"  → Needs {monthly_reserved_blocks} 8-top blocks")
         
         # Calculate mixed seating demand (1 seat per person, no guests)
         monthly_mixed_blocks = monthly_event_visits  # Each event visit takes one block
         monthly_demands['mixed_seat_blocks'] += monthly_mixed_blocks
-        print(f"  Mixed blocks needed: {monthly_mixed_blocks} (1 seat each)")
+        log(f"  Mixed blocks needed: {monthly_mixed_blocks} (1 seat each)")
         
         # Store per-persona demands
         monthly_demands['type_demands'][persona_type] = {
@@ -206,47 +291,173 @@ def compute_demands(M):
             'mixed_seat_blocks': monthly_mixed_blocks
         }
     
-    print("\nTotal Monthly Block Demands:")
-    print("-" * 30)
-    print(f"Reserved 8-tops: {monthly_demands['reserved_8_blocks']} blocks ({monthly_demands['reserved_8_blocks']/MONTHLY_8_TOP_BLOCKS*100:.1f}% of capacity)")
-    print(f"Reserved 6-tops: {monthly_demands['reserved_6_blocks']} blocks ({monthly_demands['reserved_6_blocks']/MONTHLY_6_TOP_BLOCKS*100:.1f}% of capacity)")
-    print(f"Reserved 4-tops: {monthly_demands['reserved_4_blocks']} blocks ({monthly_demands['reserved_4_blocks']/MONTHLY_4_TOP_BLOCKS*100:.1f}% of capacity)")
-    print(f"Reserved 2-tops: {monthly_demands['reserved_2_blocks']} blocks ({monthly_demands['reserved_2_blocks']/MONTHLY_2_TOP_BLOCKS*100:.1f}% of capacity)")
-    print(f"Mixed seats: {monthly_demands['mixed_seat_blocks']} seat blocks")
+    log("\nTotal Monthly Block Demands:")
+    log("-" * 30)
+    log(f"Reserved 8-tops: {monthly_demands['reserved_8_blocks']} blocks ({monthly_demands['reserved_8_blocks']/MONTHLY_8_TOP_BLOCKS*100:.1f}% of capacity)")
+    log(f"Reserved 6-tops: {monthly_demands['reserved_6_blocks']} blocks ({monthly_demands['reserved_6_blocks']/MONTHLY_6_TOP_BLOCKS*100:.1f}% of capacity)")
+    log(f"Reserved 4-tops: {monthly_demands['reserved_4_blocks']} blocks ({monthly_demands['reserved_4_blocks']/MONTHLY_4_TOP_BLOCKS*100:.1f}% of capacity)")
+    log(f"Reserved 2-tops: {monthly_demands['reserved_2_blocks']} blocks ({monthly_demands['reserved_2_blocks']/MONTHLY_2_TOP_BLOCKS*100:.1f}% of capacity)")
+    log(f"Mixed seats: {monthly_demands['mixed_seat_blocks']} seat blocks")
     
     return monthly_demands
 
-def can_accommodate(M):
-    """Check if we can accommodate M members with current monthly capacity"""
-    demands = compute_demands(M)
+# Seating decision variables for the monthly block allocation, in the order
+# they are reported, mapped to the table type whose capacity they draw from.
+# Each variable is bounded by that table type's monthly block capacity.
+SEATING_VARIABLES = {
+    # 4-top tables (MONTHLY_4_TOP_BLOCKS)
+    'reserved_4_full': '4_top',       # Used as full 4-tops
+    'reserved_4_split': '4_top',      # Split into 2x2
+    'mixed_4_full': '4_top',          # Used as full 4-tops for mixed
+    'mixed_4_split': '4_top',         # Split into 2x2 for mixed
+    # 8-top tables (MONTHLY_8_TOP_BLOCKS)
+    'reserved_8_full': '8_top',       # Used as full 8-tops
+    'reserved_8_split': '8_top',      # Split into 4+2
+    'mixed_8_full': '8_top',          # Used as full 8-tops for mixed
+    'mixed_8_split': '8_top',         # Split into 4+2 for mixed
+    # 6-top tables (MONTHLY_6_TOP_BLOCKS)
+    'reserved_6_full': '6_top',       # Used as full 6-tops
+    'reserved_6_split_3x2': '6_top',  # Split into 3x2
+    'reserved_6_split_4_2': '6_top',  # Split into 4+2
+    'mixed_6_full': '6_top',          # Used as full 6-tops for mixed
+    'mixed_6_split_3x2': '6_top',     # Split into 3x2 for mixed
+    'mixed_6_split_4_2': '6_top',     # Split into 4+2 for mixed
+    # 2-top tables (MONTHLY_2_TOP_BLOCKS)
+    'reserved_2': '2_top',            # Used for 2-person reservations
+    'mixed_2': '2_top'                # Used for mixed seating
+}
+
+# Mixed-seating seats each mixed table setup provides for one block
+MIXED_SEATS = {
+    'mixed_4_full': 4, 'mixed_4_split': 2,
+    'mixed_8_full': 8, 'mixed_8_split': 6,
+    'mixed_6_full': 6, 'mixed_6_split_3x2': 5, 'mixed_6_split_4_2': 6,
+    'mixed_2': 2
+}
+
+# Name of the model constraint that meets each monthly demand
+DEMAND_CONSTRAINTS = {
+    'reserved_8_blocks': '8_person_demand',
+    'reserved_6_blocks': '6_person_demand',
+    'reserved_4_blocks': '4_person_demand',
+    'reserved_2_blocks': '2_person_demand',
+    'mixed_seat_blocks': 'mixed_seating_demand'
+}
+
+# Seats represented by one unit of each demand, so unmet demand of different
+# kinds can be compared in a single unit (seat-blocks)
+DEMAND_SEATS = {
+    'reserved_8_blocks': 8,
+    'reserved_6_blocks': 6,
+    'reserved_4_blocks': 4,
+    'reserved_2_blocks': 2,
+    'mixed_seat_blocks': 1
+}
+
+def demand_per_member(distribution=None, personas=None):
+    """Monthly demand of one average member, by demand key (compute_demands / M without rounding)"""
+    distribution = distribution or PERSONA_DISTRIBUTION
+    personas = personas or PERSONAS
+
+    demand = {demand_key: 0.0 for demand_key in DEMAND_CONSTRAINTS}
+    for persona_type, pct in distribution.items():
+        persona = personas[persona_type]
+        group_size = 1 + persona['guests_per_month']
+        if group_size <= 2:
+            table_key = 'reserved_2_blocks'
+        elif group_size <= 4:
+            table_key = 'reserved_4_blocks'
+        elif group_size <= 6:
+            table_key = 'reserved_6_blocks'
+        else:
+            table_key = 'reserved_8_blocks'
+        demand[table_key] += pct * persona['reserved_visits']
+        demand['mixed_seat_blocks'] += pct * persona['event_visits']
+    return demand
+
+def monthly_block_schedule():
+    """The planning month's TIME_BLOCKS_PER_MONTH blocks in time order, from the operating calendar.
+
+    Each block has its index, day of the month (0-based), date, weekday
+    name, start hour and whether it falls on a weekend.
+    """
+    return [dict(block) for block in PLANNING_CALENDAR.month_blocks(*PLANNING_MONTH)]
+
+def monthly_capacity():
+    """Monthly block capacity for each table type"""
+    return {
+        '4_top': MONTHLY_4_TOP_BLOCKS,
+        '8_top': MONTHLY_8_TOP_BLOCKS,
+        '6_top': MONTHLY_6_TOP_BLOCKS,
+        '2_top': MONTHLY_2_TOP_BLOCKS
+    }
+
+def create_seating_variables(capacity, cat='Integer', bounded=True):
+    """Create the seating decision variables bounded by the given monthly capacity.
+
+    The per-variable bounds repeat the capacity constraints. Pass bounded=False
+    when the duals matter, so the capacity constraints carry the full shadow price.
+    """
+    import pulp
+
+    return {
+        name: pulp.LpVariable(name, 0, capacity[table_type] if bounded else None, cat=cat)
+        for name, table_type in SEATING_VARIABLES.items()
+    }
+
+def add_capacity_constraints(model, tables, capacity):
+    """Limit each table type's total monthly usage to its block capacity"""
+    import pulp
+
+    for table_type, blocks in capacity.items():
+        model += pulp.lpSum(
+            tables[name] for name, variable_table in SEATING_VARIABLES.items()
+            if variable_table == table_type
+        ) <= blocks, f"{table_type}_capacity"
+
+def demand_supply(tables):
+    """Expressions for how much of each monthly demand the table allocation supplies"""
+    return {
+        # Each group size can be accommodated by its size table or larger
+        # 8-person groups
+        'reserved_8_blocks': tables['reserved_8_full'],
+
+        # 6-person groups (can use 8-tops or 6-tops)
+        'reserved_6_blocks': (tables['reserved_6_full'] +
+                              tables['reserved_8_split']),
+
+        # 4-person groups (can use 4-tops, 6-tops, or 8-tops)
+        'reserved_4_blocks': (tables['reserved_4_full'] +
+                              tables['reserved_6_split_4_2'] +
+                              tables['reserved_8_split']),
+
+        # 2-person groups (can use 2-tops or split larger tables)
+        'reserved_2_blocks': (tables['reserved_2'] +
+                              tables['reserved_4_split'] * 2 +  # Each split 4-top gives two 2-person slots
+                              tables['reserved_6_split_3x2'] * 2 +  # Each split 6-top gives two 2-person slots
+                              tables['reserved_8_split']),
+
+        # Mixed seating demand: every mixed setup contributes its seats
+        'mixed_seat_blocks': sum(tables[name] * seats for name, seats in MIXED_SEATS.items())
+    }
+
+def can_accommodate(M, verbose=True):
+    """Check if we can accommodate M members with current monthly capacity.
+
+    verbose prints the demand breakdown and the solver log.
+    """
+    # PuLP is imported here rather than at module load so that callers which
+    # only need the constants (e.g. /api/constants) don't pay for the solver
+    import pulp
+
+    demands = compute_demands(M, verbose)
+    capacity = monthly_capacity()
     
     # Create optimization model
     model = pulp.LpProblem("Seating_Optimization", pulp.LpMinimize)
     
     # Decision variables for monthly block allocation
-    # 4-top tables (8 tables * 82 blocks = 656 blocks/month)
-    reserved_4_full = pulp.LpVariable("reserved_4_full", 0, MONTHLY_4_TOP_BLOCKS, cat='Integer')  # Used as full 4-tops
-    reserved_4_split = pulp.LpVariable("reserved_4_split", 0, MONTHLY_4_TOP_BLOCKS, cat='Integer')  # Split into 2x2
-    mixed_4_full = pulp.LpVariable("mixed_4_full", 0, MONTHLY_4_TOP_BLOCKS, cat='Integer')  # Used as full 4-tops for mixed
-    mixed_4_split = pulp.LpVariable("mixed_4_split", 0, MONTHLY_4_TOP_BLOCKS, cat='Integer')  # Split into 2x2 for mixed
-    
-    # 8-top tables (3 tables * 82 blocks = 246 blocks/month)
-    reserved_8_full = pulp.LpVariable("reserved_8_full", 0, MONTHLY_8_TOP_BLOCKS, cat='Integer')  # Used as full 8-tops
-    reserved_8_split = pulp.LpVariable("reserved_8_split", 0, MONTHLY_8_TOP_BLOCKS, cat='Integer')  # Split into 4+2
-    mixed_8_full = pulp.LpVariable("mixed_8_full", 0, MONTHLY_8_TOP_BLOCKS, cat='Integer')  # Used as full 8-tops for mixed
-    mixed_8_split = pulp.LpVariable("mixed_8_split", 0, MONTHLY_8_TOP_BLOCKS, cat='Integer')  # Split into 4+2 for mixed
-    
-    # 6-top tables (2 tables * 82 blocks = 164 blocks/month)
-    reserved_6_full = pulp.LpVariable("reserved_6_full", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Used as full 6-tops
-    reserved_6_split_3x2 = pulp.LpVariable("reserved_6_split_3x2", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Split into 3x2
-    reserved_6_split_4_2 = pulp.LpVariable("reserved_6_split_4_2", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Split into 4+2
-    mixed_6_full = pulp.LpVariable("mixed_6_full", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Used as full 6-tops for mixed
-    mixed_6_split_3x2 = pulp.LpVariable("mixed_6_split_3x2", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Split into 3x2 for mixed
-    mixed_6_split_4_2 = pulp.LpVariable("mixed_6_split_4_2", 0, MONTHLY_6_TOP_BLOCKS, cat='Integer')  # Split into 4+2 for mixed
-    
-    # 2-top tables (2 tables * 82 blocks = 164 blocks/month)
-    reserved_2 = pulp.LpVariable("reserved_2", 0, MONTHLY_2_TOP_BLOCKS, cat='Integer')  # Used for 2-person reservations
-    mixed_2 = pulp.LpVariable("mixed_2", 0, MONTHLY_2_TOP_BLOCKS, cat='Integer')  # Used for mixed seating
+    tables = create_seating_variables(capacity)
     
     # Objective: Balance table usage between reserved and mixed seating
     # 1. Reserved seating gets priority
@@ -260,109 +471,48 @@ def can_accommodate(M):
         # Reserved seating terms
         reserved_weight * (
             # 4-tops
-            reserved_4_full +
-            (1 + split_penalty) * reserved_4_split +
+            tables['reserved_4_full'] +
+            (1 + split_penalty) * tables['reserved_4_split'] +
             # 8-tops
-            1.2 * reserved_8_full +
-            (1.2 + split_penalty) * reserved_8_split +
+            1.2 * tables['reserved_8_full'] +
+            (1.2 + split_penalty) * tables['reserved_8_split'] +
             # 6-tops
-            1.1 * reserved_6_full +
-            (1.1 + split_penalty) * (reserved_6_split_3x2 + reserved_6_split_4_2) +
+            1.1 * tables['reserved_6_full'] +
+            (1.1 + split_penalty) * (tables['reserved_6_split_3x2'] + tables['reserved_6_split_4_2']) +
             # 2-tops
-            0.8 * reserved_2
+            0.8 * tables['reserved_2']
         ) +
         # Mixed seating terms (lower weights to encourage usage)
         mixed_weight * (
             # 4-tops
-            mixed_4_full +
-            (1 + split_penalty) * mixed_4_split +
+            tables['mixed_4_full'] +
+            (1 + split_penalty) * tables['mixed_4_split'] +
             # 8-tops
-            1.2 * mixed_8_full +
-            (1.2 + split_penalty) * mixed_8_split +
+            1.2 * tables['mixed_8_full'] +
+            (1.2 + split_penalty) * tables['mixed_8_split'] +
             # 6-tops
-            1.1 * mixed_6_full +
-            (1.1 + split_penalty) * (mixed_6_split_3x2 + mixed_6_split_4_2) +
+            1.1 * tables['mixed_6_full'] +
+            (1.1 + split_penalty) * (tables['mixed_6_split_3x2'] + tables['mixed_6_split_4_2']) +
             # 2-tops
-            0.8 * mixed_2
+            0.8 * tables['mixed_2']
         )
     )
     
     # Monthly capacity constraints
-    # 4-top tables
-    model += (reserved_4_full + reserved_4_split + 
-             mixed_4_full + mixed_4_split) <= MONTHLY_4_TOP_BLOCKS, "4_top_capacity"
-             
-    # 8-top tables
-    model += (reserved_8_full + reserved_8_split +
-             mixed_8_full + mixed_8_split) <= MONTHLY_8_TOP_BLOCKS, "8_top_capacity"
-             
-    # 6-top tables
-    model += (reserved_6_full + reserved_6_split_3x2 + reserved_6_split_4_2 +
-             mixed_6_full + mixed_6_split_3x2 + mixed_6_split_4_2) <= MONTHLY_6_TOP_BLOCKS, "6_top_capacity"
-             
-    # 2-top tables
-    model += (reserved_2 + mixed_2) <= MONTHLY_2_TOP_BLOCKS, "2_top_capacity"
-    
-    # Meet monthly reservation demands
-    # Each group size can be accommodated by its size table or larger
-    # 8-person groups
-    model += reserved_8_full >= demands['reserved_8_blocks'], "8_person_demand"
-    
-    # 6-person groups (can use 8-tops or 6-tops)
-    model += (reserved_6_full + 
-             reserved_8_split) >= demands['reserved_6_blocks'], "6_person_demand"
-    
-    # 4-person groups (can use 4-tops, 6-tops, or 8-tops)
-    model += (reserved_4_full + 
-             reserved_6_split_4_2 +
-             reserved_8_split) >= demands['reserved_4_blocks'], "4_person_demand"
-    
-    # 2-person groups (can use 2-tops or split larger tables)
-    model += (reserved_2 + 
-             reserved_4_split * 2 +  # Each split 4-top gives two 2-person slots
-             reserved_6_split_3x2 * 2 +  # Each split 6-top gives two 2-person slots
-             reserved_8_split) >= demands['reserved_2_blocks'], "2_person_demand"
+    add_capacity_constraints(model, tables, capacity)
     
-    # Meet mixed seating demand
-    model += (
-        # 4-tops contribution
-        mixed_4_full * 4 + mixed_4_split * 2 +
-        # 8-tops contribution
-        mixed_8_full * 8 + mixed_8_split * 6 +
-        # 6-tops contribution
-        mixed_6_full * 6 + mixed_6_split_3x2 * 5 + mixed_6_split_4_2 * 6 +
-        # 2-tops contribution
-        mixed_2 * 2
-    ) >= demands['mixed_seat_blocks'], "mixed_seating_demand"
+    # Meet monthly reservation and mixed seating demands
+    supply = demand_supply(tables)
+    for demand_key, constraint_name in DEMAND_CONSTRAINTS.items():
+        model += supply[demand_key] >= demands[demand_key], constraint_name
     
     # Solve the model
-    model.solve()
+    model.solve(pulp.PULP_CBC_CMD(msg=verbose))
 
     # Check if solution exists and is optimal
     if pulp.LpStatus[model.status] == 'Optimal':
         results = {
-            'tables': {
-                # 4-tops
-                'reserved_4_full': reserved_4_full.value(),
-                'reserved_4_split': reserved_4_split.value(),
-                'mixed_4_full': mixed_4_full.value(),
-                'mixed_4_split': mixed_4_split.value(),
-                # 8-tops
-                'reserved_8_full': reserved_8_full.value(),
-                'reserved_8_split': reserved_8_split.value(),
-                'mixed_8_full': mixed_8_full.value(),
-                'mixed_8_split': mixed_8_split.value(),
-                # 6-tops
-                'reserved_6_full': reserved_6_full.value(),
-                'reserved_6_split_3x2': reserved_6_split_3x2.value(),
-                'reserved_6_split_4_2': reserved_6_split_4_2.value(),
-                'mixed_6_full': mixed_6_full.value(),
-                'mixed_6_split_3x2': mixed_6_split_3x2.value(),
-                'mixed_6_split_4_2': mixed_6_split_4_2.value(),
-                # 2-tops
-                'reserved_2': reserved_2.value(),
-                'mixed_2': mixed_2.value()
-            },
+            'tables': {name: variable.value() for name, variable in tables.items()},
             'demands': demands
         }
         
@@ -390,32 +540,149 @@ def can_accommodate(M):
     else:
         return False, None
 
+def solve_capacity_duals(demands, capacity=None):
+    """Solve the LP relaxation of the seating model with elastic demands.
+
+    Every demand constraint gets a shortfall variable costed at the seats it
+    represents, so the relaxation stays feasible at member counts that
+    can_accommodate rejects and the objective is the unmet seat-blocks.
+    Returns the shortfall plus the shadow price and slack of each capacity
+    and demand constraint. A capacity shadow price is the change in unmet
+    seat-blocks per extra block of that table type (negative when binding);
+    a demand shadow price is the unmet seat-blocks added per extra unit of
+    that demand.
+    """
+    import pulp
+
+    capacity = capacity or monthly_capacity()
+
+    model = pulp.LpProblem("Seating_Shortfall", pulp.LpMinimize)
+    tables = create_seating_variables(capacity, cat='Continuous', bounded=False)
+    shortfall = {
+        demand_key: pulp.LpVariable(f"shortfall_{demand_key}", 0)
+        for demand_key in DEMAND_CONSTRAINTS
+    }
+
+    # Objective: minimize unmet demand, measured in seat-blocks
+    model += pulp.lpSum(DEMAND_SEATS[key] * variable for key, variable in shortfall.items())
+
+    add_capacity_constraints(model, tables, capacity)
+    supply = demand_supply(tables)
+    for demand_key, constraint_name in DEMAND_CONSTRAINTS.items():
+        model += supply[demand_key] + shortfall[demand_key] >= demands[demand_key], constraint_name
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False))
+
+    constraints = model.constraints
+    capacity_duals = {}
+    for table_type, blocks in capacity.items():
+        constraint = constraints[f"{table_type}_capacity"]
+        capacity_duals[table_type] = {
+            'shadow_price': constraint.pi,
+            'slack': constraint.slack,  # Unused blocks
+            'utilization': (blocks - constraint.slack) / blocks * 100 if blocks else 0
+        }
+
+    demand_duals = {}
+    for demand_key, constraint_name in DEMAND_CONSTRAINTS.items():
+        constraint = constraints[constraint_name]
+        demand_duals[demand_key] = {
+            'shadow_price': constraint.pi,
+            'slack': -constraint.slack,  # Supply beyond demand (PuLP reports rhs - lhs)
+            'shortfall': shortfall[demand_key].value()
+        }
+
+    return {
+        'status': pulp.LpStatus[model.status],
+        'shortfall_seats': pulp.value(model.objective) or 0,
+        'capacity': capacity_duals,
+        'demand': demand_duals
+    }
+
+def max_member_capacity(per_member_demand, capacity=None):
+    """Largest (fractional) member count whose demand fits the LP relaxation.
+
+    per_member_demand maps each demand key to the monthly demand of one
+    average member. Demand scales linearly with the member count, so this is
+    a single LP with the member count as a variable instead of a search over M.
+    Returns None when the demand is all zero, as tables then never run out.
+    """
+    import pulp
+
+    capacity = capacity or monthly_capacity()
+
+    model = pulp.LpProblem("Member_Capacity", pulp.LpMaximize)
+    tables = create_seating_variables(capacity, cat='Continuous', bounded=False)
+    members = pulp.LpVariable("members", 0)
+    model += members
+
+    add_capacity_constraints(model, tables, capacity)
+    supply = demand_supply(tables)
+    for demand_key, constraint_name in DEMAND_CONSTRAINTS.items():
+        model += supply[demand_key] >= per_member_demand.get(demand_key, 0) * members, constraint_name
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False))
+
+    if pulp.LpStatus[model.status] == 'Unbounded':
+        return None  # Members who generate no demand never run out of tables
+    return members.value()
+
 def analyze_bottleneck(M):
-    """Analyze what's causing the bottleneck at M members"""
-    demands = compute_demands(M)
-    
-    # Calculate total demand across all personas
-    total_4_top_demand = sum(
-        type_demands['reserved_4_blocks'] + 
-        type_demands['reserved_2_blocks']/2 + 
-        type_demands['mixed_seat_blocks']/4
-        for type_demands in demands['type_demands'].values()
+    """Analyze what's causing the bottleneck at M members using the LP duals.
+
+    The bottleneck table type is the one whose extra block would remove the
+    most unmet demand. Each persona's marginal contribution prices its own
+    demands at the demand shadow prices: the unmet seat-blocks that would be
+    added if its demand grew by one month's worth at the current margin.
+    """
+    demands = compute_demands(M, verbose=False)
+    duals = solve_capacity_duals(demands)
+
+    # Rank table types by how much an extra block would help, then by how full they are
+    table_type = min(
+        duals['capacity'],
+        key=lambda t: (duals['capacity'][t]['shadow_price'], -duals['capacity'][t]['utilization'])
     )
-    total_utilization = (total_4_top_demand / MONTHLY_4_TOP_BLOCKS) * 100
-    
-    # Find which persona has highest individual demand
-    bottleneck = {'table_type': '4-top', 'persona': None, 'utilization': 0, 'total_utilization': total_utilization}
-    
-    for persona, type_demands in demands['type_demands'].items():
-        persona_4_top_demand = (type_demands['reserved_4_blocks'] + 
-                            type_demands['reserved_2_blocks']/2 + 
-                            type_demands['mixed_seat_blocks']/4)
-        utilization = (persona_4_top_demand / MONTHLY_4_TOP_BLOCKS) * 100
-        if utilization > bottleneck['utilization']:
-            bottleneck['utilization'] = utilization
-            bottleneck['persona'] = persona
-    
-    return bottleneck
+
+    marginal_seats = {
+        persona: sum(
+            duals['demand'][demand_key]['shadow_price'] * type_demands[demand_key]
+            for demand_key in DEMAND_CONSTRAINTS
+        )
+        for persona, type_demands in demands['type_demands'].items()
+    }
+    total_marginal = sum(marginal_seats.values())
+
+    persona_contributions = {}
+    for persona, seats in marginal_seats.items():
+        member_count = int(M * PERSONA_DISTRIBUTION[persona])
+        persona_contributions[persona] = {
+            'marginal_seats': seats,
+            'per_member': seats / member_count if member_count else 0,
+            'share': seats / total_marginal * 100 if total_marginal else 0
+        }
+
+    ranking = sorted(marginal_seats, key=marginal_seats.get, reverse=True)
+    top_persona = ranking[0] if ranking and marginal_seats[ranking[0]] > 0 else None
+
+    return {
+        'table_type': table_type.replace('_', '-'),
+        'binding_tables': [t.replace('_', '-') for t, d in duals['capacity'].items() if d['shadow_price'] < 0],
+        'persona': top_persona,
+        'pressure_share': persona_contributions[top_persona]['share'] if top_persona else 0,
+        'total_utilization': duals['capacity'][table_type]['utilization'],
+        'shortfall_seats': duals['shortfall_seats'],
+        'shadow_prices': {
+            **{f"{t}_capacity": d['shadow_price'] for t, d in duals['capacity'].items()},
+            **{DEMAND_CONSTRAINTS[k]: d['shadow_price'] for k, d in duals['demand'].items()}
+        },
+        'slack': {
+            **{f"{t}_capacity": d['slack'] for t, d in duals['capacity'].items()},
+            **{DEMAND_CONSTRAINTS[k]: d['slack'] for k, d in duals['demand'].items()}
+        },
+        'persona_contributions': persona_contributions,
+        'persona_ranking': ranking
+    }
 
 def generate_summary(test_members, results_list):
     """Generate a high-level summary of capacity analysis"""
@@ -444,14 +711,21 @@ def generate_summary(test_members, results_list):
     else:
         summary.append("❌ No viable member count found")
     
+    if bottleneck is None:
+        return "\n".join(summary)
+
     summary.append("")  # Add spacing
     summary.append(f"📊 Bottleneck at {first_fail} members:")
-    summary.append(f"• Total Table Utilization: {bottleneck['total_utilization']:.1f}%")
+    summary.append(f"• Table Type: {bottleneck['table_type']}")
+    summary.append(f"• Table Utilization: {bottleneck['total_utilization']:.1f}%")
+    summary.append(f"• Unmet Demand: {bottleneck['shortfall_seats']:.0f} seat-blocks")
     summary.append("")  # Add spacing
     summary.append("Highest Individual Impact:")
-    summary.append(f"• Persona Type: {bottleneck['persona'].title()}")
-    summary.append(f"• Their Utilization: {bottleneck['utilization']:.1f}%")
-    summary.append(f"• Table Type: {bottleneck['table_type']}")
+    if bottleneck['persona']:
+        summary.append(f"• Persona Type: {bottleneck['persona'].title()}")
+        summary.append(f"• Their Share of Marginal Demand: {bottleneck['pressure_share']:.1f}%")
+    else:
+        summary.append("• Demand fits fractionally; the limit comes from whole-table rounding")
     
     return "\n".join(summary)
 
@@ -498,9 +772,11 @@ def analyze_capacity(test_members=[200, 250, 300, 350, 400]):
                 
                 print("\nOperating Hours:")
                 print("-" * 20)
-                print("Weekdays: 5PM-11PM (2 blocks/day * 5 days = 10 blocks/week)")
-                print("Weekends: 9AM-11PM (~4.67 blocks/day * 2 days = 9 blocks/week)")
-                print(f"Total blocks per month: {TIME_BLOCKS_PER_MONTH}")
+                counts = PLANNING_CALENDAR.block_counts(*PLANNING_MONTH)
+                for label, days in (('weekday', operating_calendar.WEEKDAYS[:5]), ('weekend', operating_calendar.WEEKEND)):
+                    spans = dict.fromkeys(operating_calendar.format_hours(PLANNING_CALENDAR.hours.get(day)) for day in days)
+                    print(f"{label.title()}s: {', '.join(spans)} ({counts[label]} blocks)")
+                print(f"Total blocks in {PLANNING_MONTH[0]}-{PLANNING_MONTH[1]:02d}: {TIME_BLOCKS_PER_MONTH}")
             
             print("\nBy Persona Type:")
             print("-" * 20)
@@ -540,88 +816,20 @@ def analyze_capacity(test_members=[200, 250, 300, 350, 400]):
     return can_fit
 
 def calculate_plan_value(plan_type):
-    """Calculate the value and features for a given plan type."""
-    if plan_type.lower() == "basic":
-        features = {
-            "guest_passes": 1,
-            "retail_discount": 0.1,  # 10%
-            "snack_discount": 0.1,   # 10%
-            "mixed_access": False,
-            "additional_members": 0,  # No additional members
-            "game_checkouts": 1
-        }
-        price = BASIC_PLAN_PRICE
-    elif plan_type.lower() == "standard":
-        features = {
-            "guest_passes": 2,
-            "retail_discount": 0.15,  # 15%
-            "snack_discount": 0.15,   # 15%
-            "mixed_access": True,
-            "additional_members": 1,  # One additional member
-            "game_checkouts": 2
-        }
-        price = STANDARD_PLAN_PRICE
-    elif plan_type.lower() == "family":
-        features = {
-            "guest_passes": 4,
-            "retail_discount": 0.2,   # 20%
-            "snack_discount": 0.2,    # 20%
-            "mixed_access": True,
-            "additional_members": 3,  # Three additional family members
-            "game_checkouts": 4
-        }
-        price = FAMILY_PLAN_PRICE
-    else:
-        raise ValueError(f"Invalid plan type: {plan_type}")
-    
-    # Calculate base value
-    value = BASE_VISIT_VALUE
-    
-    # Add value for features
-    value += features["guest_passes"] * GUEST_PRICE
-    if features["mixed_access"]:
-        value += MIXED_VALUE
-    value += features["game_checkouts"] * GAME_CHECKOUT_VALUE
-    
-    # Cap the base value
-    value = min(value, BASE_VALUE_CAP)
-    
-    return {
-        "plan_type": plan_type,
-        "price": float(price),
-        "monthly_value": float(value),
-        "value_ratio": float(value / price),
-        "features": features
-    }
+    """Calculate the value and features for a given plan type (from the plan catalog)."""
+    # Imported here because plan_catalog builds on this module's constants
+    from plan_catalog import current_catalog
+    return current_catalog().value(plan_type)
+
+def get_plan_types():
+    """Names of every plan in the catalog, in order"""
+    from plan_catalog import current_catalog
+    return current_catalog().plan_types()
 
 def get_plan_features(plan_type):
     """Get list of features for a given plan type."""
-    features = []
-    
-    if plan_type.lower() == "basic":
-        features = [
-            '1 Guest Pass',
-            '10% Retail Discount',
-            '1 Game Checkout'
-        ]
-    elif plan_type.lower() == "standard":
-        features = [
-            '2 Guest Passes',
-            '15% Retail Discount',
-            'Mixed Event Access',
-            '1 Additional Member',
-            '2 Game Checkouts'
-        ]
-    elif plan_type.lower() == "family":
-        features = [
-            '4 Guest Passes',
-            '20% Retail Discount',
-            'Mixed Event Access',
-            '3 Additional Members',
-            '4 Game Checkouts'
-        ]
-    
-    return features
+    from plan_catalog import current_catalog
+    return current_catalog().labels(plan_type)
 
 def calculate_total_guests(M):
     """Calculate total monthly guests for M members"""
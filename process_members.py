@@ -1,79 +1,12 @@
 # ABOUTME: Utility script to parse raw member data from text format into structured CSV
 # ABOUTME: Normalizes visit frequency data and extracts member information for analysis
 
-import re
 import csv
 
-def normalize_frequency(freq):
-    if not freq:
-        return 0
-    
-    freq = freq.lower()
-    
-    # Daily or more
-    if any(term in freq for term in ['daily', '25 hours', 'insatiable', 'all the time', 'everyday']):
-        return 30
-    
-    # Multiple times per week
-    if any(term in freq for term in ['2-3 week', '3-4 week', 'twice week', '2x week']):
-        return 10
-    
-    # Weekly
-    if any(term in freq for term in ['weekly', 'once a week', '1x week', 'per week', 'biweekly', 'every other week']):
-        return 4
-    
-    # Multiple times per month
-    if any(term in freq for term in ['1-2 month', '2-3 month', 'twice month', '2x month']):
-        return 2
-    
-    # Monthly
-    if 'month' in freq:
-        return 1
-    
-    # Default to monthly if unclear
-    return 1
+from roster_ingest import iter_text_members, parse_member_lines
 
 def extract_member_info(text):
-    members = []
-    current_member = {}
-    
-    lines = text.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        
-        if not line or ' — ' in line or 'Thread' in line or 'Messages' in line:
-            if current_member and 'Name' in current_member:
-                if 'How often you want to play' in current_member:
-                    current_member['Visits per month'] = normalize_frequency(current_member['How often you want to play'])
-                members.append(current_member)
-                current_member = {}
-            continue
-            
-        if line.startswith('Name:'):
-            if current_member and 'Name' in current_member:
-                if 'How often you want to play' in current_member:
-                    current_member['Visits per month'] = normalize_frequency(current_member['How often you want to play'])
-                members.append(current_member)
-                current_member = {}
-            current_member['Name'] = line.replace('Name:', '').strip()
-        elif line.startswith('City:'):
-            current_member['City'] = line.replace('City:', '').strip()
-        elif line.startswith('Fave game (today):'):
-            current_member['Fav game today'] = line.replace('Fave game (today):', '').strip()
-        elif line.startswith('Looking to play:'):
-            current_member['Looking to play'] = line.replace('Looking to play:', '').strip()
-        elif line.startswith('How often'):
-            freq = line.replace('How often you want to play:', '').replace('How often do you want to play:', '').strip()
-            current_member['How often you want to play'] = freq
-            current_member['Visits per month'] = normalize_frequency(freq)
-    
-    if current_member and 'Name' in current_member:
-        if 'How often you want to play' in current_member:
-            current_member['Visits per month'] = normalize_frequency(current_member['How often you want to play'])
-        members.append(current_member)
-    
-    return members
+    return list(parse_member_lines(text.split('\n')))
 
 def clean_members(members):
     cleaned = []
@@ -103,13 +36,10 @@ def write_csv(members, filename):
         writer.writeheader()
         writer.writerows(members)
 
-# Read the input file
-with open('OBG Members.txt', 'r', encoding='utf-8') as f:
-    text = f.read()
-
-# Process the data
-members = extract_member_info(text)
-cleaned_members = clean_members(members)
+if __name__ == "__main__":
+    # Stream the input file so the whole roster is never held as one string
+    members = iter_text_members('OBG Members.txt')
+    cleaned_members = clean_members(members)
 
-# Write to CSV
-write_csv(cleaned_members, 'OBG_Members_Processed.csv')
+    # Write to CSV
+    write_csv(cleaned_members, 'OBG_Members_Processed.csv')
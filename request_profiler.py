@@ -0,0 +1,174 @@
+# ABOUTME: Opt-in sampling profiler for single API requests, storing collapsed stacks (flame graph input) per request ID
+# ABOUTME: Turned on per request by authorized users with ?profile=1 or an X-Profile header; nothing runs when it is off
+
+import collections
+import os
+import sys
+import threading
+import time
+import uuid
+
+SAMPLE_INTERVAL = 0.002   # Seconds between stack samples
+MAX_PROFILES = 20         # Most recent profiles kept in memory
+MAX_DEPTH = 128           # Frames kept per stack, innermost dropped beyond this
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'X-Profile'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+def frame_label(frame):
+    """'module:function' for a stack frame"""
+    code = frame.f_code
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}"
+
+def collapse(frame, thread_name):
+    """One sample's stack as a collapsed line, outermost frame first after the thread name"""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ';'.join(reversed(labels))
+
+class RequestProfile:
+    """Wall-clock stack samples of the threads working on one request.
+
+    Sampling covers the request's own thread plus any solver threads
+    registered through track(), so time spent waiting on the CBC
+    subprocess or in JSON serialization shows up where it happened.
+    """
+
+    def __init__(self, request_id, method, path, interval=SAMPLE_INTERVAL):
+        self.id = request_id
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.started = time.time()
+        self.threads = {threading.get_ident(): 'request'}
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.duration_ms = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name=f'profiler-{request_id}', daemon=True)
+        self._sampler.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self.threads.items())
+            for ident, name in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse(frame, name)] += 1
+            self.samples += 1
+
+    def track(self, func):
+        """Wrap func so the thread that runs it is sampled while it does"""
+        def tracked(*args, **kwargs):
+            ident = threading.get_ident()
+            with self._lock:
+                self.threads[ident] = threading.current_thread().name
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.threads.pop(ident, None)
+        return tracked
+
+    def stop(self):
+        """Stop sampling (idempotent)"""
+        if self.duration_ms is None:
+            self._stop.set()
+            self._sampler.join()
+            self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def collapsed(self):
+        """Collapsed-stack text ('frame;frame;frame count' per line), as flamegraph.pl and speedscope read"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'started': self.started,
+            'duration_ms': self.duration_ms,
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'stacks': len(self.stacks)
+        }
+
+class ProfileStore:
+    """The most recent finished profiles, by request ID"""
+
+    def __init__(self, limit=MAX_PROFILES):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._profiles = collections.OrderedDict()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            self._profiles.move_to_end(profile.id)
+            while len(self._profiles) > self.limit:
+                self._profiles.popitem(last=False)
+
+    def get(self, request_id):
+        with self._lock:
+            return self._profiles.get(request_id)
+
+    def summaries(self):
+        """Summaries of the stored profiles, newest first"""
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
+
+profiles = ProfileStore()
+
+def wants_profile(request):
+    """Whether a request asks to be profiled"""
+    return request.args.get(PROFILE_PARAM) == '1' or request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true')
+
+def current_profile():
+    """The profile of the request being handled, or None"""
+    from flask import g
+    return g.get('request_profile')
+
+def track(func):
+    """func, wrapped so its thread is sampled when the current request is being profiled"""
+    profile = current_profile()
+    return profile.track(func) if profile else func
+
+def init_profiling(app, authorized):
+    """Profile requests to the app that ask for it and pass authorized(request).
+
+    Call before other after_request hooks are installed: Flask runs them in
+    reverse order, so the profile then also covers them (e.g. compression).
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        if wants_profile(request) and authorized(request):
+            request_id = (request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex)[:64]
+            g.request_profile = RequestProfile(request_id, request.method, request.full_path.rstrip('?'))
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.stop()
+            profiles.add(profile)
+            response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    @app.teardown_request
+    def abandon_profile(error):
+        # Requests that raised never reach after_request; keep what was sampled
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.stop()
+            profiles.add(profile)
+
+    return app
@@ -5,6 +5,9 @@ import planner
 from plan_optimizer import PlanOptimizer
 from value_calculator import ValueCalculator
 
+# Revenue components of a member's monthly spend, in revenue_breakdown order
+REVENUE_COMPONENTS = ['memberships', 'guests', 'mixed_events', 'snacks', 'retail']
+
 class RevenuePlanner:
     def __init__(self):
         self.plan_optimizer = PlanOptimizer()
@@ -12,15 +15,60 @@ class RevenuePlanner:
         
     def get_optimal_plan_for_persona(self, persona):
         """Get the plan with highest value ratio for a persona"""
-        value_ratios = {}
-        for plan_type in ["basic", "standard", "family"]:
-            plan_data = planner.calculate_plan_value(plan_type)
-            value = self.value_calculator.calculate_persona_value(plan_data["features"], persona)
-            value_ratios[plan_type] = (value / plan_data["price"], plan_data["price"])
-        
+        table = self.value_calculator.value_table()
+        best = int(table['ratios'][:, table['personas'].index(persona)].argmax())
+
         # Return plan type and price of the plan with highest value ratio
-        best_plan = max(value_ratios.items(), key=lambda x: x[1][0])
-        return best_plan[0], best_plan[1][1]
+        return table['plans'][best], float(table['prices'][best])
+
+    def persona_revenue(self, persona_type):
+        """Monthly revenue from one member of a persona on their best plan, by component"""
+        persona_data = planner.PERSONAS[persona_type]
+        spending = planner.SPENDING
+
+        # Get best plan for this persona
+        plan_type, plan_price = self.get_optimal_plan_for_persona(persona_type)
+
+        # Calculate membership revenue
+        membership_revenue = plan_price
+
+        # Calculate guest revenue
+        guest_revenue = (
+            persona_data['guests_per_month'] * 
+            planner.GUEST_PRICE * 
+            planner.GUEST_SPENDING_MULTIPLIER
+        )
+
+        # Calculate mixed event revenue (if they have access)
+        plan_features = planner.calculate_plan_value(plan_type)["features"]
+        mixed_revenue = (
+            persona_data['event_visits'] * 
+            planner.GUEST_PRICE if plan_features["mixed_access"] else 0
+        )
+
+        # Calculate total visits per month
+        visits_per_month = persona_data['reserved_visits'] + persona_data['event_visits']
+
+        # Calculate snack and retail revenue
+        snack_revenue = (
+            visits_per_month * 
+            spending['snacks'][persona_type] * 
+            (1 - plan_features["snack_discount"])
+        )
+        retail_revenue = (
+            spending['retail_monthly'][persona_type] * 
+            (1 - plan_features["retail_discount"])
+        )
+
+        return {
+            'plan_type': plan_type,
+            'memberships': membership_revenue,
+            'guests': guest_revenue,
+            'mixed_events': mixed_revenue,
+            'snacks': snack_revenue,
+            'retail': retail_revenue,
+            'total': membership_revenue + guest_revenue + mixed_revenue + snack_revenue + retail_revenue
+        }
 
     def calculate_monthly_revenue(self):
         """Calculate projected monthly revenue based on capacity and persona distribution"""
@@ -28,103 +76,37 @@ class RevenuePlanner:
         test_members = [200, 250, 300, 350, 400]
         max_capacity = 0
         for M in test_members:
-            if planner.can_accommodate(M)[0]:
+            if planner.can_accommodate(M, verbose=False)[0]:
                 max_capacity = M
         
         if max_capacity == 0:
             raise Exception("No viable member capacity found")
         
         # Calculate revenue per persona
-        total_membership_revenue = 0
-        total_guest_revenue = 0
-        total_mixed_revenue = 0
-        total_snack_revenue = 0
-        total_retail_revenue = 0
+        breakdown = {component: 0 for component in REVENUE_COMPONENTS}
         persona_revenues = {}
         
         for persona_type, distribution in planner.PERSONA_DISTRIBUTION.items():
             member_count = max_capacity * distribution
-            persona_data = planner.PERSONAS[persona_type]
-            spending = planner.SPENDING
-            
-            # Get best plan for this persona
-            plan_type, plan_price = self.get_optimal_plan_for_persona(persona_type)
-            
-            # Calculate membership revenue
-            membership_revenue = plan_price
-            
-            # Calculate guest revenue
-            guest_revenue = (
-                persona_data['guests_per_month'] * 
-                planner.GUEST_PRICE * 
-                planner.GUEST_SPENDING_MULTIPLIER
-            )
-            
-            # Calculate mixed event revenue (if they have access)
-            plan_features = planner.calculate_plan_value(plan_type)["features"]
-            mixed_revenue = (
-                persona_data['event_visits'] * 
-                planner.GUEST_PRICE if plan_features["mixed_access"] else 0
-            )
-            
-            # Calculate total visits per month
-            visits_per_month = persona_data['reserved_visits'] + persona_data['event_visits']
-            
-            # Calculate snack and retail revenue
-            snack_revenue = (
-                visits_per_month * 
-                spending['snacks'][persona_type] * 
-                (1 - plan_features["snack_discount"])
-            )
-            retail_revenue = (
-                spending['retail_monthly'][persona_type] * 
-                (1 - plan_features["retail_discount"])
-            )
-            
-            # Total monthly revenue for this persona
-            total_persona_revenue = (
-                membership_revenue + 
-                guest_revenue + 
-                mixed_revenue + 
-                snack_revenue + 
-                retail_revenue
-            )
+            revenue = self.persona_revenue(persona_type)
             
             # Store individual components for totals
-            total_membership_revenue += membership_revenue * member_count
-            total_guest_revenue += guest_revenue * member_count
-            total_mixed_revenue += mixed_revenue * member_count
-            total_snack_revenue += snack_revenue * member_count
-            total_retail_revenue += retail_revenue * member_count
+            for component in REVENUE_COMPONENTS:
+                breakdown[component] += revenue[component] * member_count
             
             # Store persona revenue details
             persona_revenues[persona_type] = {
-                'membership': membership_revenue,
-                'extras': guest_revenue + mixed_revenue + snack_revenue + retail_revenue,
-                'total': total_persona_revenue,
+                'membership': revenue['memberships'],
+                'extras': revenue['guests'] + revenue['mixed_events'] + revenue['snacks'] + revenue['retail'],
+                'total': revenue['total'],
                 'member_count': member_count
             }
         
-        # Calculate total monthly revenue
-        total_revenue = (
-            total_membership_revenue +
-            total_guest_revenue +
-            total_mixed_revenue +
-            total_snack_revenue +
-            total_retail_revenue
-        )
-        
         return {
             'max_capacity': max_capacity,
             'persona_revenues': persona_revenues,
-            'total_revenue': total_revenue,
-            'revenue_breakdown': {
-                'memberships': total_membership_revenue,
-                'guests': total_guest_revenue,
-                'mixed_events': total_mixed_revenue,
-                'snacks': total_snack_revenue,
-                'retail': total_retail_revenue
-            }
+            'total_revenue': sum(breakdown.values()),
+            'revenue_breakdown': breakdown
         }
     
     def print_revenue_projection(self):
@@ -0,0 +1,159 @@
+# ABOUTME: Member capacity that holds across uncertain persona visit rates, not just at their means
+# ABOUTME: Worst case over a +/-x% box, and robust and chance-constrained counts over sampled busy and quiet months
+
+import sys
+import time
+
+import numpy as np
+
+import planner
+from growth_projection import feasibility_cache
+
+DEFAULT_SPREAD = 0.2        # Visit rates vary by up to +/-20% per persona
+DEFAULT_SCENARIOS = 500
+DEFAULT_RELIABILITY = 0.95  # Share of sampled months the chance-constrained count must fit
+# How much of a month's swing is shared by every persona (busy season) rather than each persona's own
+COMMON_SHARE = 0.5
+VISIT_FIELDS = ['reserved_visits', 'event_visits']
+
+def _spreads(spread, persona_types):
+    """Per-persona spread from one number or a {persona: spread} dict"""
+    if isinstance(spread, dict):
+        return np.array([spread.get(p, 0.0) for p in persona_types])
+    return np.full(len(persona_types), float(spread))
+
+def visit_demands(personas=None):
+    """Monthly demand of one member of each persona from each visit field (personas x fields x demand keys).
+
+    Demand is linear in each visit rate, so scaling a persona's rates
+    scales these rows.
+    """
+    personas = personas or planner.PERSONAS
+    keys = list(planner.DEMAND_CONSTRAINTS)
+    rows = []
+    for persona_type, persona in personas.items():
+        fields = []
+        for field in VISIT_FIELDS:
+            only = dict(persona, **{other: 0 for other in VISIT_FIELDS if other != field})
+            demand = planner.demand_per_member({persona_type: 1.0}, {persona_type: only})
+            fields.append([demand[key] for key in keys])
+        rows.append(fields)
+    return np.array(rows)
+
+def per_member_demand(multipliers, distribution=None, personas=None):
+    """Demand of one average member for each set of visit-rate multipliers (scenarios x personas x fields)"""
+    personas = personas or planner.PERSONAS
+    distribution = distribution or planner.PERSONA_DISTRIBUTION
+    shares = np.array([distribution.get(p, 0.0) for p in personas])
+    return np.einsum('spf,p,pfk->sk', multipliers, shares, visit_demands(personas))
+
+def sample_multipliers(scenarios=DEFAULT_SCENARIOS, spread=DEFAULT_SPREAD, common_share=COMMON_SHARE,
+                       personas=None, seed=0):
+    """Visit-rate multipliers for sampled months (scenarios x personas x visit fields).
+
+    Each multiplier is normal around 1 with standard deviation spread / 2,
+    so +/-spread is a two-sigma month, clipped to [1 - spread, 1 + spread].
+    Part of each month's swing is common to all personas.
+    """
+    personas = personas or planner.PERSONAS
+    rng = np.random.default_rng(seed)
+    sd = _spreads(spread, list(personas))[None, :, None]
+    common = rng.standard_normal((scenarios, 1, 1))
+    own = rng.standard_normal((scenarios, len(personas), len(VISIT_FIELDS)))
+    z = np.sqrt(common_share) * common + np.sqrt(1 - common_share) * own
+    return np.clip(1 + sd / 2 * z, 1 - sd, 1 + sd)
+
+def scenario_capacities(demands, capacity=None):
+    """Whole members each per-member demand row can hold, found by bisecting all rows together.
+
+    Rows without any demand never run out of tables and are returned as
+    -1 rather than searched. Feasibility is checked through the shared FeasibilityCache, so the
+    LP solves' points and dual cuts answer most rows without new solves.
+    """
+    demands = np.asarray(demands, dtype=float)
+    cache = feasibility_cache(capacity)
+    low = np.zeros(len(demands), dtype=np.int64)          # Fits
+    high = np.ones(len(demands), dtype=np.int64)          # Unknown until it doesn't fit
+    growing = demands.any(axis=1)
+    while growing.any():
+        fits = cache.fits(high[growing, None] * demands[growing])
+        rows = np.flatnonzero(growing)
+        low[rows[fits]] = high[rows[fits]]
+        high[rows[fits]] *= 2
+        growing[rows[~fits]] = False
+    while ((high - low) > 1).any():
+        mid = (low + high) // 2
+        active = (high - low) > 1
+        fits = cache.fits(mid[active, None] * demands[active])
+        rows = np.flatnonzero(active)
+        low[rows[fits]] = mid[rows[fits]]
+        high[rows[~fits]] = mid[rows[~fits]]
+    low[~demands.any(axis=1)] = -1
+    return low
+
+def can_accommodate_robustly(M, spread=DEFAULT_SPREAD, scenarios=DEFAULT_SCENARIOS,
+                             reliability=DEFAULT_RELIABILITY, common_share=COMMON_SHARE, capacity=None, seed=0):
+    """Whether M members fit in at least `reliability` of sampled months, and the share of months they fit"""
+    demands = per_member_demand(sample_multipliers(scenarios, spread, common_share, seed=seed))
+    share = float(feasibility_cache(capacity).fits(M * demands).mean()) if scenarios else 1.0
+    return share >= reliability, share
+
+def robust_capacity(spread=DEFAULT_SPREAD, scenarios=DEFAULT_SCENARIOS, reliability=DEFAULT_RELIABILITY,
+                    common_share=COMMON_SHARE, capacity=None, seed=0):
+    """Member counts that fit the tables at mean visit rates, across a box of rates, and across sampled months.
+
+    * nominal: the usual capacity at the mean rates;
+    * box: the count that fits every combination of rates within
+      +/-spread per persona. Demand only grows with the rates, so the
+      worst case is every rate at its maximum;
+    * robust: the count that fits every sampled month;
+    * chance: the count that fits at least `reliability` of sampled months.
+
+    Counts use the planner's seating LP relaxation, as the mix optimizer
+    and growth projection do.
+    """
+    start = time.perf_counter()
+    cache = feasibility_cache(capacity)
+    solves_before = cache.solves
+    persona_types = list(planner.PERSONAS)
+
+    nominal_multipliers = np.ones((1, len(persona_types), len(VISIT_FIELDS)))
+    box_multipliers = 1 + _spreads(spread, persona_types)[None, :, None] * nominal_multipliers
+    sampled = sample_multipliers(scenarios, spread, common_share, seed=seed)
+
+    demands = per_member_demand(np.concatenate([nominal_multipliers, box_multipliers, sampled]))
+    members = scenario_capacities(demands, capacity)
+    nominal, box, sampled_members = int(members[0]), int(members[1]), np.sort(members[2:])
+
+    needed = int(np.ceil(reliability * scenarios))
+    chance = int(sampled_members[scenarios - needed]) if scenarios else nominal
+
+    return {
+        'spread': spread,
+        'scenarios': scenarios,
+        'reliability': reliability,
+        'nominal_members': nominal,
+        'box_members': box,
+        'robust_members': int(sampled_members[0]) if scenarios else nominal,
+        'chance_members': chance,
+        'scenario_members': {
+            f'p{q}': float(np.percentile(sampled_members, q)) for q in (5, 25, 50, 75, 95)
+        } if scenarios else {},
+        'lp_solves': cache.solves - solves_before,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_robust_capacity(spread=DEFAULT_SPREAD, scenarios=DEFAULT_SCENARIOS):
+    """Print how many members fit at mean rates versus busy months"""
+    result = robust_capacity(spread, scenarios)
+    print(f"\nRobust Member Capacity (+/-{spread * 100:.0f}% visit rates, {scenarios} sampled months, "
+          f"{result['lp_solves']} LP solves, {result['elapsed_ms']:.0f} ms)")
+    print("=" * 50)
+    print(f"At mean visit rates: {result['nominal_members']} members")
+    print(f"Fits {result['reliability'] * 100:.0f}% of sampled months: {result['chance_members']} members")
+    print(f"Fits every sampled month: {result['robust_members']} members")
+    print(f"Fits every rate within +/-{spread * 100:.0f}%: {result['box_members']} members")
+
+if __name__ == "__main__":
+    print_robust_capacity(float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SPREAD,
+                          int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SCENARIOS)
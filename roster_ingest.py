@@ -0,0 +1,202 @@
+# ABOUTME: Streaming ingestion of member rosters (raw text export or processed CSV) into planner inputs
+# ABOUTME: Aggregates members into persona counts and visit rates shaped like PERSONA_DISTRIBUTION and PERSONAS
+
+import csv
+import json
+import sys
+
+import numpy as np
+
+import planner
+from frequency import normalize_frequency
+
+# Roster text prefixes and the member field each one fills
+TEXT_FIELDS = [
+    ('City:', 'City'),
+    ('Fave game (today):', 'Fav game today'),
+    ('Looking to play:', 'Looking to play')
+]
+FREQUENCY_PREFIXES = ['How often you want to play:', 'How often do you want to play:']
+
+CHUNK_SIZE = 10000  # Members classified together when streaming with the default rules
+
+def _finish_member(member):
+    """Fill in the normalized visit frequency once a member's lines are complete"""
+    if 'How often you want to play' in member:
+        member['Visits per month'] = normalize_frequency(member['How often you want to play'])
+    return member
+
+def parse_member_lines(lines):
+    """Yield one member dict at a time from roster text lines.
+
+    Accepts any iterable of lines (an open file streams without loading the
+    whole roster). A member ends at a blank or separator line, or when the
+    next 'Name:' line starts.
+    """
+    current = {}
+    for line in lines:
+        line = line.strip()
+
+        if not line or ' — ' in line or 'Thread' in line or 'Messages' in line:
+            if 'Name' in current:
+                yield _finish_member(current)
+                current = {}
+            continue
+
+        if line.startswith('Name:'):
+            if 'Name' in current:
+                yield _finish_member(current)
+                current = {}
+            current['Name'] = line.replace('Name:', '').strip()
+        elif line.startswith('How often'):
+            freq = line
+            for prefix in FREQUENCY_PREFIXES:
+                freq = freq.replace(prefix, '')
+            current['How often you want to play'] = freq.strip()
+        else:
+            for prefix, field in TEXT_FIELDS:
+                if line.startswith(prefix):
+                    current[field] = line.replace(prefix, '').strip()
+                    break
+
+    if 'Name' in current:
+        yield _finish_member(current)
+
+def iter_text_members(path):
+    """Stream members from a raw roster text export"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from parse_member_lines(f)
+
+def iter_csv_members(path):
+    """Stream members from a processed roster CSV.
+
+    Visit frequency is re-normalized from the raw answer so that the CSV's
+    stored 'Visits per month' column can't drift from the current rules.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield _finish_member(row)
+
+def iter_members(path):
+    """Stream members from a roster file, choosing the parser by extension"""
+    if path.lower().endswith('.csv'):
+        return iter_csv_members(path)
+    return iter_text_members(path)
+
+def persona_visit_totals(personas=None):
+    """Total monthly visits (reserved + event) for each persona"""
+    personas = personas or planner.PERSONAS
+    return {
+        persona_type: data['reserved_visits'] + data['event_visits']
+        for persona_type, data in personas.items()
+    }
+
+def assign_persona(member, personas=None):
+    """Persona for one member under persona_clustering's rules"""
+    from persona_clustering import assign_personas, member_arrays  # persona_clustering builds on this module
+    personas = list(personas or planner.PERSONAS)
+    visits, text = member_arrays([member])
+    return personas[assign_personas(visits, text, personas)[0]]
+
+class PersonaAggregator:
+    """Running persona counts and visit sums, updated as members stream in.
+
+    With the default rules members are classified a chunk at a time over
+    NumPy arrays; a custom assign(member) is called once per member.
+    """
+
+    def __init__(self, personas=None, assign=None):
+        self.personas = personas or planner.PERSONAS
+        self.assign = assign
+        self.counts = {persona_type: 0 for persona_type in self.personas}
+        self.visit_sums = {persona_type: 0.0 for persona_type in self.personas}
+        self.unclassified = 0
+
+    def add(self, member):
+        """Count one member; members without a usable visit frequency are set aside"""
+        visits = member.get('Visits per month')
+        if not visits:
+            self.unclassified += 1
+            return None
+        persona_type = self.assign(member) if self.assign else assign_persona(member, self.personas)
+        self.counts[persona_type] += 1
+        self.visit_sums[persona_type] += float(visits)
+        return persona_type
+
+    def add_chunk(self, members):
+        """Classify a list of members together under the default rules and add them to the totals"""
+        from persona_clustering import assign_personas, member_arrays  # persona_clustering builds on this module
+        if not members:
+            return self
+        personas = list(self.personas)
+        visits, text = member_arrays(members)
+        assigned = assign_personas(visits, text, personas)
+        classified = assigned >= 0
+        counts = np.bincount(assigned[classified], minlength=len(personas))
+        sums = np.bincount(assigned[classified], weights=visits[classified], minlength=len(personas))
+        for i, persona_type in enumerate(personas):
+            self.counts[persona_type] += int(counts[i])
+            self.visit_sums[persona_type] += float(sums[i])
+        self.unclassified += int((~classified).sum())
+        return self
+
+    def add_all(self, members, chunk_size=CHUNK_SIZE):
+        """Add a stream of members without holding the whole roster"""
+        if self.assign:
+            for member in members:
+                self.add(member)
+            return self
+        chunk = []
+        for member in members:
+            chunk.append(member)
+            if len(chunk) >= chunk_size:
+                self.add_chunk(chunk)
+                chunk = []
+        return self.add_chunk(chunk)
+
+    def profile(self):
+        """Distribution and visit fields ready to replace PERSONA_DISTRIBUTION and PERSONAS.
+
+        A persona's mean visits are split into reserved and event visits in
+        the same proportion as its current PERSONAS entry. Personas with no
+        members keep their current visit rates.
+        """
+        total = sum(self.counts.values())
+        distribution = {}
+        visit_means = {}
+        personas = {}
+        for persona_type, data in self.personas.items():
+            count = self.counts[persona_type]
+            distribution[persona_type] = round(count / total, 4) if total else 0.0
+            visit_means[persona_type] = round(self.visit_sums[persona_type] / count, 2) if count else None
+
+            base_total = data['reserved_visits'] + data['event_visits']
+            if count and base_total:
+                mean_visits = self.visit_sums[persona_type] / count
+                reserved_share = data['reserved_visits'] / base_total
+                personas[persona_type] = {
+                    'reserved_visits': round(mean_visits * reserved_share, 2),
+                    'event_visits': round(mean_visits * (1 - reserved_share), 2)
+                }
+            else:
+                personas[persona_type] = {
+                    'reserved_visits': data['reserved_visits'],
+                    'event_visits': data['event_visits']
+                }
+
+        return {
+            'member_count': total,
+            'unclassified': self.unclassified,
+            'counts': dict(self.counts),
+            'distribution': distribution,
+            'visits_per_month': visit_means,
+            'personas': personas
+        }
+
+def ingest_roster(path, personas=None, assign=None):
+    """Stream a roster file into a persona profile"""
+    return PersonaAggregator(personas, assign).add_all(iter_members(path)).profile()
+
+if __name__ == "__main__":
+    roster_path = sys.argv[1] if len(sys.argv) > 1 else 'OBG_Members_Processed.csv'
+    print(json.dumps(ingest_roster(roster_path), indent=2))
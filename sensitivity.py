@@ -0,0 +1,260 @@
+# ABOUTME: What-if sensitivity analysis of member capacity and revenue to every model assumption
+# ABOUTME: Evaluates batched finite differences with vectorized demand/revenue math and a cached capacity LP
+
+import functools
+import math
+import time
+
+import numpy as np
+
+import planner
+import value_kernel
+
+PERSONA_ATTRIBUTES = ['price', 'guests_per_month', 'reserved_visits', 'event_visits', 'game_checkouts']
+DEMAND_KEYS = list(planner.DEMAND_CONSTRAINTS)
+
+@functools.lru_cache(maxsize=4096)
+def capacity_for_demand(per_member_demand, capacity):
+    """Member capacity for a per-member demand tuple (ordered as DEMAND_KEYS) and table capacity.
+
+    capacity is the monthly capacity as sorted (table type, blocks) pairs,
+    so a new planning month gets fresh solves. Within one capacity, only the
+    per-member demand matters, so perturbations that leave demand unchanged
+    (prices, spending, plan choice) reuse the cached solve. Zero demand has
+    no capacity limit and gives NaN.
+    """
+    members = planner.max_member_capacity(dict(zip(DEMAND_KEYS, per_member_demand)), dict(capacity))
+    return math.nan if members is None else members
+
+def json_number(value):
+    """value as a float, or None when it isn't finite (JSON has no NaN or Infinity)"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+def base_parameters(plan_types=None):
+    """Flatten the current model assumptions into (labels, groups, values)"""
+    plan_types = plan_types or planner.get_plan_types()
+    labels, groups, values = [], [], []
+
+    def add(label, group, value):
+        labels.append(label)
+        groups.append(group)
+        values.append(float(value))
+
+    for persona, share in planner.PERSONA_DISTRIBUTION.items():
+        add(f"distribution.{persona}", 'distribution', share)
+    for persona in planner.PERSONA_DISTRIBUTION:
+        for attribute in PERSONA_ATTRIBUTES:
+            add(f"personas.{persona}.{attribute}", 'persona', planner.PERSONAS[persona][attribute])
+    for plan_type in plan_types:
+        add(f"plan_prices.{plan_type}", 'price', planner.calculate_plan_value(plan_type)['price'])
+    add("guest_price", 'price', planner.GUEST_PRICE)
+    for category in ['snacks', 'retail_monthly']:
+        for persona in planner.PERSONA_DISTRIBUTION:
+            add(f"spending.{category}.{persona}", 'spending', planner.SPENDING[category][persona])
+
+    return labels, groups, np.array(values)
+
+class SensitivityModel:
+    """Vectorized capacity and revenue model over a batch of parameter rows"""
+
+    def __init__(self):
+        self.personas = list(planner.PERSONA_DISTRIBUTION)
+        self.plan_types = planner.get_plan_types()
+        self.labels, self.groups, self.base = base_parameters(self.plan_types)
+
+        n = len(self.personas)
+        a = len(PERSONA_ATTRIBUTES)
+        self.share_slice = slice(0, n)
+        self.persona_slice = slice(n, n + n * a)
+        self.plan_slice = slice(n + n * a, n + n * a + len(self.plan_types))
+        self.guest_price_index = self.plan_slice.stop
+        self.snack_slice = slice(self.guest_price_index + 1, self.guest_price_index + 1 + n)
+        self.retail_slice = slice(self.snack_slice.stop, self.snack_slice.stop + n)
+
+        # Plan features are fixed per plan, so they are read once
+        features = [planner.calculate_plan_value(plan_type)['features'] for plan_type in self.plan_types]
+        self.plan_features = {
+            key: np.array([float(f[key]) for f in features])
+            for key in ['guest_passes', 'retail_discount', 'snack_discount',
+                        'mixed_access', 'additional_members', 'game_checkouts']
+        }
+        self.value_features = value_kernel.feature_matrix(features)
+
+    def unpack(self, rows):
+        """Split a (rows, parameters) matrix into named arrays"""
+        shares = rows[:, self.share_slice]
+        shares = shares / shares.sum(axis=1, keepdims=True)  # Keep the mix summing to 1
+        traits = rows[:, self.persona_slice].reshape(len(rows), len(self.personas), len(PERSONA_ATTRIBUTES))
+        traits = {attribute: traits[:, :, i] for i, attribute in enumerate(PERSONA_ATTRIBUTES)}
+        return {
+            'shares': shares,
+            'traits': traits,
+            'plan_prices': rows[:, self.plan_slice],
+            'guest_price': rows[:, self.guest_price_index],
+            'snacks': rows[:, self.snack_slice],
+            'retail': rows[:, self.retail_slice]
+        }
+
+    def demand_per_member(self, params):
+        """Monthly demand of one average member for each row, as a (rows, demand keys) array"""
+        traits = params['traits']
+        group_size = 1 + traits['guests_per_month']
+        reserved = params['shares'] * traits['reserved_visits']
+
+        # Same table-size rule as compute_demands
+        table_key = np.select(
+            [group_size <= 2, group_size <= 4, group_size <= 6],
+            [DEMAND_KEYS.index('reserved_2_blocks'), DEMAND_KEYS.index('reserved_4_blocks'),
+             DEMAND_KEYS.index('reserved_6_blocks')],
+            default=DEMAND_KEYS.index('reserved_8_blocks')
+        )
+
+        demand = np.zeros((len(reserved), len(DEMAND_KEYS)))
+        for k, demand_key in enumerate(DEMAND_KEYS):
+            if demand_key == 'mixed_seat_blocks':
+                demand[:, k] = (params['shares'] * traits['event_visits']).sum(axis=1)
+            else:
+                demand[:, k] = np.where(table_key == k, reserved, 0).sum(axis=1)
+        return demand
+
+    def capacity(self, demand):
+        """Member capacity for each row of per-member demand, solving each distinct row once"""
+        rounded = np.round(demand, 9)
+        unique_rows, inverse = np.unique(rounded, axis=0, return_inverse=True)
+        capacity = tuple(sorted(planner.monthly_capacity().items()))
+        capacities = np.array([capacity_for_demand(tuple(row), capacity) for row in unique_rows])
+        return capacities[inverse.reshape(-1)]
+
+    def revenue_per_member(self, params):
+        """Monthly revenue of one average member for each row (RevenuePlanner's components)"""
+        traits = params['traits']
+        f = self.plan_features
+        visits = traits['reserved_visits'] + traits['event_visits']
+        price_per_visit = traits['price']
+
+        # Perceived plan value, shaped (rows, plans, personas), from the shared value kernel
+        persona_traits = np.stack([visits, price_per_visit, traits['guests_per_month'], traits['game_checkouts']], axis=-1)
+        value = value_kernel.value_components(persona_traits, self.value_features).sum(axis=0)
+
+        # Each persona takes the plan with the best value ratio
+        ratios = value / params['plan_prices'][:, :, None]
+        best = ratios.argmax(axis=1)
+
+        plan_price = np.take_along_axis(params['plan_prices'], best, axis=1)
+        mixed_access = f['mixed_access'][best]
+        snack_discount = f['snack_discount'][best]
+        retail_discount = f['retail_discount'][best]
+        guest_price = params['guest_price'][:, None]
+
+        revenue = (
+            plan_price +
+            traits['guests_per_month'] * guest_price * planner.GUEST_SPENDING_MULTIPLIER +
+            traits['event_visits'] * guest_price * mixed_access +
+            visits * params['snacks'] * (1 - snack_discount) +
+            params['retail'] * (1 - retail_discount)
+        )
+        return (params['shares'] * revenue).sum(axis=1)
+
+    def evaluate(self, rows):
+        """Member capacity and total monthly revenue at capacity for each parameter row"""
+        params = self.unpack(rows)
+        capacity = self.capacity(self.demand_per_member(params))
+        revenue = capacity * self.revenue_per_member(params)
+        return capacity, revenue
+
+def analyze_sensitivity(step=0.05, metric='revenue', top=None):
+    """Rank every model assumption by how much it moves capacity and revenue.
+
+    Each parameter is perturbed by +/- step (relative, or absolute when the
+    parameter is zero) with all other parameters held at their base values.
+    Parameters are non-negative, so the low side is clipped at zero. All
+    perturbations are evaluated in one batch.
+    """
+    start = time.perf_counter()
+    misses_before = capacity_for_demand.cache_info().misses
+
+    model = SensitivityModel()
+    base = model.base
+    k = len(base)
+
+    delta = np.where(base != 0, np.abs(base) * step, step)
+    low = np.maximum(base - delta, 0)
+    high = base + delta
+
+    # Row 0 is the base case, then a low and a high row per parameter
+    rows = np.tile(base, (1 + 2 * k, 1))
+    rows[1 + np.arange(k), np.arange(k)] = low
+    rows[1 + k + np.arange(k), np.arange(k)] = high
+
+    capacity, revenue = model.evaluate(rows)
+    outcomes = {'capacity': capacity, 'revenue': revenue}
+
+    parameters = []
+    for i, label in enumerate(model.labels):
+        entry = {
+            'parameter': label,
+            'group': model.groups[i],
+            'base_value': base[i],
+            'low_value': low[i],
+            'high_value': high[i]
+        }
+        for name, values in outcomes.items():
+            low_outcome, base_outcome, high_outcome = values[1 + i], values[0], values[1 + k + i]
+            derivative = (high_outcome - low_outcome) / (high[i] - low[i])
+
+            # One-sided slopes that disagree mean the step crossed a threshold,
+            # e.g. a group outgrowing its table size, so the derivative is only indicative
+            left = (base_outcome - low_outcome) / (base[i] - low[i]) if base[i] > low[i] else derivative
+            right = (high_outcome - base_outcome) / (high[i] - base[i])
+            kink = abs(right - left) > 1e-6 + 0.5 * max(abs(left), abs(right))
+
+            entry[name] = {
+                'low': low_outcome,
+                'high': high_outcome,
+                'derivative': derivative,
+                'elasticity': derivative * base[i] / base_outcome if base_outcome else 0.0,
+                'kink': kink
+            }
+        parameters.append(entry)
+
+    parameters.sort(key=lambda e: abs(e[metric]['high'] - e[metric]['low']), reverse=True)
+    if top:
+        parameters = parameters[:top]
+
+    # Convert NumPy scalars so the result serializes as plain JSON
+    for entry in parameters:
+        for key in ['base_value', 'low_value', 'high_value']:
+            entry[key] = float(entry[key])
+        for name in outcomes:
+            entry[name] = {key: value if key == 'kink' else json_number(value) for key, value in entry[name].items()}
+            entry[name]['kink'] = bool(entry[name]['kink'])
+
+    return {
+        'base': {
+            'max_members': json_number(capacity[0]),
+            'total_revenue': json_number(revenue[0])
+        },
+        'step': step,
+        'metric': metric,
+        'parameters': parameters,
+        'solver_calls': capacity_for_demand.cache_info().misses - misses_before,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_sensitivity(top=10):
+    """Print the most influential assumptions for capacity and revenue"""
+    for metric in ['capacity', 'revenue']:
+        results = analyze_sensitivity(metric=metric, top=top)
+        print(f"\nTop {top} Drivers of {metric.title()}")
+        print("=" * 50)
+        base = results['base']['max_members'] if metric == 'capacity' else results['base']['total_revenue']
+        print(f"Base: {base:,.1f}")
+        for entry in results['parameters']:
+            outcome = entry[metric]
+            note = "  [crosses a threshold]" if outcome['kink'] else ""
+            print(f"  {entry['parameter']:<40} {outcome['low']:>12,.1f} .. {outcome['high']:>12,.1f}"
+                  f"  (elasticity {outcome['elasticity']:+.2f}){note}")
+
+if __name__ == "__main__":
+    print_sensitivity()
@@ -0,0 +1,209 @@
+# ABOUTME: Discrete-event simulation of a month of reservations and walk-ins on concrete tables
+# ABOUTME: Books tables through the live allocator's greedy policy and reports rejections, no-shows and utilization per block
+
+import heapq
+import math
+import sys
+import time
+
+import numpy as np
+
+import planner
+from allocator import TABLE_SEATS, Allocator, default_inventory
+
+NO_SHOW_RATE = 0.1           # Share of reservations whose party never arrives
+BOOKING_LEAD_DAYS = 7        # Reservations are made up to a week ahead
+WALK_IN_WINDOW_HOURS = 3     # Walk-ins arrive any time during their block
+WEEKEND_DEMAND_WEIGHT = 2.0  # A weekend block is this many times as popular as a weekday block
+
+# Event kinds, in the order they are handled when they share a timestamp
+BOOKING, BLOCK_START, WALK_IN = 0, 1, 2
+
+class Event:
+    """One simulation event; ordered by time, then kind, then creation order"""
+    __slots__ = ('time', 'kind', 'seq', 'block', 'persona', 'party_size', 'no_show')
+
+    def __init__(self, time, kind, seq, block, persona=None, party_size=1, no_show=False):
+        self.time = time
+        self.kind = kind
+        self.seq = seq
+        self.block = block
+        self.persona = persona
+        self.party_size = party_size
+        self.no_show = no_show
+
+    def __lt__(self, other):
+        return (self.time, self.kind, self.seq) < (other.time, other.kind, other.seq)
+
+class BlockState:
+    """Tallies for one time block"""
+    __slots__ = ('reservations', 'open_seats', 'seated', 'booked', 'rejected',
+                 'no_shows', 'walk_ins', 'walk_ins_rejected')
+
+    def __init__(self):
+        self.reservations = []  # (booking id, event) for each accepted booking
+        self.open_seats = 0
+        self.seated = 0
+        self.booked = 0
+        self.rejected = 0
+        self.no_shows = 0
+        self.walk_ins = 0
+        self.walk_ins_rejected = 0
+
+def _group_party_size(persona):
+    return min(math.ceil(1 + persona['guests_per_month']), max(TABLE_SEATS.values()))
+
+def generate_events(M, seed=0, no_show_rate=NO_SHOW_RATE):
+    """Reservation bookings and walk-ins for a month at M members.
+
+    Each persona's reserved visits become bookings for a party of the
+    member plus their guests; event visits become single-seat walk-ins.
+    Counts are Poisson around the persona means, and blocks are drawn with
+    weekend blocks weighted more heavily.
+    """
+    rng = np.random.default_rng(seed)
+    schedule = planner.monthly_block_schedule()
+    block_times = np.array([block['day'] * 24 + block['start_hour'] for block in schedule], dtype=float)
+    weights = np.array([WEEKEND_DEMAND_WEIGHT if block['weekend'] else 1.0 for block in schedule])
+    weights /= weights.sum()
+
+    events = []
+    seq = 0
+    for persona_type, pct in planner.PERSONA_DISTRIBUTION.items():
+        persona = planner.PERSONAS[persona_type]
+        members = int(M * pct)
+        party_size = _group_party_size(persona)
+
+        n_bookings = rng.poisson(members * persona['reserved_visits'])
+        blocks = rng.choice(len(schedule), size=n_bookings, p=weights)
+        booked_at = block_times[blocks] - rng.uniform(0, BOOKING_LEAD_DAYS * 24, size=n_bookings)
+        no_shows = rng.random(n_bookings) < no_show_rate
+        for block, at, no_show in zip(blocks.tolist(), booked_at.tolist(), no_shows.tolist()):
+            events.append(Event(at, BOOKING, seq, block, persona_type, party_size, no_show))
+            seq += 1
+
+        n_walk_ins = rng.poisson(members * persona['event_visits'])
+        blocks = rng.choice(len(schedule), size=n_walk_ins, p=weights)
+        arrive_at = block_times[blocks] + rng.uniform(0, WALK_IN_WINDOW_HOURS, size=n_walk_ins)
+        for block, at in zip(blocks.tolist(), arrive_at.tolist()):
+            events.append(Event(at, WALK_IN, seq, block, persona_type))
+            seq += 1
+
+    for block, at in enumerate(block_times.tolist()):
+        events.append(Event(at, BLOCK_START, seq, block))
+        seq += 1
+
+    return schedule, events
+
+def simulate_month(M, seed=0, tables=None, no_show_rate=NO_SHOW_RATE):
+    """Run a month of events through the tables and report what happened.
+
+    Bookings are accepted or rejected in the order they are made, using
+    the live allocator's best-fit table choice. At each
+    block's start no-show parties release their table part, and every seat
+    not held by a reservation opens for walk-ins, who are seated in arrival
+    order until the seats run out.
+    """
+    start = time.perf_counter()
+    inventory = tables or default_inventory()
+    total_seats = sum(TABLE_SEATS[table_type] * count for table_type, count in inventory.items())
+
+    schedule, events = generate_events(M, seed, no_show_rate)
+    heapq.heapify(events)
+    allocator = Allocator(inventory, blocks=len(schedule))
+    blocks = [BlockState() for _ in schedule]
+    rejected_by_persona = {persona_type: 0 for persona_type in planner.PERSONA_DISTRIBUTION}
+    requested_by_persona = dict(rejected_by_persona)
+    processed = 0
+
+    while events:
+        event = heapq.heappop(events)
+        processed += 1
+        state = blocks[event.block]
+
+        if event.kind == BOOKING:
+            requested_by_persona[event.persona] += 1
+            booking = allocator.assign(event.block, event.party_size)
+            if booking is None:
+                state.rejected += 1
+                rejected_by_persona[event.persona] += 1
+            else:
+                state.booked += 1
+                state.reservations.append((booking['booking_id'], event))
+
+        elif event.kind == BLOCK_START:
+            for booking_id, booking in state.reservations:
+                if booking.no_show:
+                    allocator.release(booking_id)
+                    state.no_shows += 1
+                else:
+                    state.seated += booking.party_size
+            state.open_seats = allocator.free_seats(event.block)
+
+        else:  # WALK_IN
+            requested_by_persona[event.persona] += 1
+            state.walk_ins += 1
+            if state.open_seats > 0:
+                state.open_seats -= 1
+                state.seated += 1
+            else:
+                state.walk_ins_rejected += 1
+                rejected_by_persona[event.persona] += 1
+
+    block_report = []
+    for block, state in zip(schedule, blocks):
+        block_report.append({
+            'index': block['index'],
+            'day': block['day'],
+            'weekday': block['weekday'],
+            'start_hour': block['start_hour'],
+            'reservations': state.booked,
+            'reservations_rejected': state.rejected,
+            'no_shows': state.no_shows,
+            'walk_ins': state.walk_ins,
+            'walk_ins_rejected': state.walk_ins_rejected,
+            'seats_used': state.seated,
+            'utilization': state.seated / total_seats * 100 if total_seats else 0
+        })
+
+    bookings = sum(b['reservations'] + b['reservations_rejected'] for b in block_report)
+    walk_ins = sum(b['walk_ins'] for b in block_report)
+    return {
+        'members': M,
+        'events': processed,
+        'summary': {
+            'bookings': bookings,
+            'booking_rejection_rate': (sum(b['reservations_rejected'] for b in block_report) / bookings * 100
+                                       if bookings else 0),
+            'walk_ins': walk_ins,
+            'walk_in_rejection_rate': (sum(b['walk_ins_rejected'] for b in block_report) / walk_ins * 100
+                                       if walk_ins else 0),
+            'no_shows': sum(b['no_shows'] for b in block_report),
+            'seat_utilization': sum(b['utilization'] for b in block_report) / len(block_report),
+            'peak_utilization': max(b['utilization'] for b in block_report)
+        },
+        'rejection_rate_by_persona': {
+            persona_type: (rejected_by_persona[persona_type] / requested_by_persona[persona_type] * 100
+                           if requested_by_persona[persona_type] else 0)
+            for persona_type in rejected_by_persona
+        },
+        'blocks': block_report,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+def print_simulation(M, seed=0):
+    """Print a month's simulated rejections and utilization"""
+    results = simulate_month(M, seed)
+    summary = results['summary']
+    print(f"\nSimulated Month for {M} Members ({results['events']:,} events, {results['elapsed_ms']:.0f} ms)")
+    print("=" * 50)
+    print(f"Bookings: {summary['bookings']:,} ({summary['booking_rejection_rate']:.1f}% rejected)")
+    print(f"Walk-ins: {summary['walk_ins']:,} ({summary['walk_in_rejection_rate']:.1f}% turned away)")
+    print(f"No-shows: {summary['no_shows']:,}")
+    print(f"Average Seat Utilization: {summary['seat_utilization']:.1f}% (peak {summary['peak_utilization']:.1f}%)")
+    print("\nRejection Rate by Persona:")
+    for persona_type, rate in results['rejection_rate_by_persona'].items():
+        print(f"  {persona_type.title()}: {rate:.1f}%")
+
+if __name__ == "__main__":
+    print_simulation(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,46 @@
+# ABOUTME: Single-flight request coalescing: concurrent callers with the same key share one in-flight computation
+# ABOUTME: Used to stop identical dashboard requests from each starting their own set of solves
+
+import threading
+
+class SingleFlight:
+    """Deduplicates concurrent work by key.
+
+    The first caller for a key starts the work and gets its Future; callers
+    arriving while it is still running get the same Future. Once it
+    finishes the key is forgotten, so the next call computes afresh (keys
+    should include whatever the result depends on, e.g. the config version).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.started = 0
+        self.shared = 0
+
+    def submit(self, key, start, *args, **kwargs):
+        """Future for key's in-flight work, calling start(*args, **kwargs) to begin it if there is none.
+
+        start must return a concurrent.futures.Future. If it raises, nothing
+        is recorded and the error goes to this caller only.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            future = start(*args, **kwargs)
+            self._calls[key] = future
+            self.started += 1
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'started': self.started, 'shared': self.shared}
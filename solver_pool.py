@@ -0,0 +1,165 @@
+# ABOUTME: Bounded executor for the LP-heavy API computations, with a queue limit that rejects overflow
+# ABOUTME: Also provides a per-thread stdout capture so concurrent requests don't mix their printed reports
+
+import contextlib
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# CBC runs as a subprocess, so a few threads give real parallel solves
+SOLVER_WORKERS = int(os.environ.get('SOLVER_WORKERS', 2))
+# Requests allowed to wait for a free worker before new ones are turned away
+SOLVER_QUEUE = int(os.environ.get('SOLVER_QUEUE', 4))
+# Seconds a request waits for its result before giving up
+SOLVER_TIMEOUT = float(os.environ.get('SOLVER_TIMEOUT', 120))
+
+class PoolBusy(Exception):
+    """Raised when every worker is busy and the queue is full"""
+
+class SharedLock:
+    """A lock that many threads can hold shared, or one thread exclusively.
+
+    Analyses hold it shared while they read the planner's module state;
+    swapping that state holds it exclusively, so it waits for running
+    analyses to finish and new ones wait for the swap. A waiting exclusive
+    holder goes ahead of new shared ones.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextlib.contextmanager
+    def shared(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._exclusive and not self._waiting)
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._waiting += 1
+            self._condition.wait_for(lambda: not self._exclusive and not self._shared)
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+class SolverPool:
+    """A fixed number of worker threads plus a bounded wait queue.
+
+    submit() refuses work once workers + queue jobs are in flight, so a
+    burst of expensive requests cannot pile up behind the solver; the
+    caller turns that into a 503 and the web threads stay free for cheap
+    endpoints.
+    """
+
+    def __init__(self, workers=SOLVER_WORKERS, queue=SOLVER_QUEUE):
+        self.workers = workers
+        self.queue = queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='solver')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func on the pool and return its Future, or raise PoolBusy"""
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue:
+                self._rejected += 1
+                raise PoolBusy(f"{self._in_flight} solver jobs already in flight")
+            self._in_flight += 1
+
+        def job():
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._in_flight -= 1
+                    self._completed += 1
+
+        try:
+            return self._executor.submit(job)
+        except RuntimeError:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+    def run(self, func, *args, timeout=SOLVER_TIMEOUT, **kwargs):
+        """Run func on the pool and wait for its result (concurrent.futures.TimeoutError after timeout seconds)"""
+        return self.submit(func, *args, **kwargs).result(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue': self.queue,
+                'running': self._running,
+                'waiting': self._in_flight - self._running,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+class _ThreadStdout:
+    """sys.stdout stand-in that sends each thread's writes to its own capture buffer, if it has one"""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'buffer', None) or self.default
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+_install_lock = threading.Lock()
+
+def capture_output(func, *args, **kwargs):
+    """Capture what func prints on this thread.
+
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, so
+    two requests capturing at once would steal each other's output; this
+    keeps one buffer per thread instead.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+        stdout = sys.stdout
+
+    output = io.StringIO()
+    previous = getattr(stdout.local, 'buffer', None)
+    stdout.local.buffer = output
+    try:
+        func(*args, **kwargs)
+    finally:
+        stdout.local.buffer = previous
+    return output.getvalue()
@@ -0,0 +1,66 @@
+# ABOUTME: Tests for the online bitset table allocator and its booking endpoints
+# ABOUTME: Checks best-fit placement, split/full conflicts, release, and the /api/allocate and /api/release flow
+
+import base64
+
+from allocator import Allocator
+
+AUTH = {'Authorization': 'Basic ' + base64.b64encode(b'user:0a82f59436f2ccda6420b060c7eecffe').decode()}
+
+def test_best_fit_and_split_rules():
+    """Pairs go to 2-tops before splitting tables, and a split table can't also seat a full party"""
+    allocator = Allocator({'2_top': 1, '4_top': 1, '6_top': 1}, blocks=1)
+
+    first = allocator.assign(0, 2)
+    assert first['table_type'] == '2_top'
+
+    second = allocator.assign(0, 2)
+    assert second['table_type'] == '4_top' and second['setup'] == [2, 2]
+    third = allocator.assign(0, 2)
+    assert third['table'] == second['table']  # Fills the other half before splitting the 6-top
+
+    six = allocator.assign(0, 6)
+    assert six['table_type'] == '6_top' and six['setup'] == [6]
+    assert allocator.assign(0, 4) is None
+    assert allocator.free_seats(0) == 0
+
+    assert allocator.release(third['booking_id'])
+    assert not allocator.release(third['booking_id'])
+    assert allocator.free_seats(0) == 2
+    assert allocator.assign(0, 2)['table'] == second['table']
+
+def test_allocate_and_release_endpoints():
+    """The API books, refuses when full, and releases bookings"""
+    import app as app_module
+    app_module.reservation_allocator = Allocator({'4_top': 1}, blocks=2)
+    client = app_module.app.test_client()
+
+    assert client.post('/api/allocate', json={'block': 0, 'party_size': 4}).status_code == 401
+    booked = client.post('/api/allocate', json={'block': 0, 'party_size': 4}, headers=AUTH)
+    assert booked.status_code == 200
+    booking_id = booked.get_json()['booking_id']
+
+    assert client.post('/api/allocate', json={'block': 0, 'party_size': 2}, headers=AUTH).status_code == 409
+    assert client.post('/api/allocate', json={'block': 5, 'party_size': 2}, headers=AUTH).status_code == 400
+    assert client.post('/api/release', json={'booking_id': booking_id}, headers=AUTH).status_code == 200
+    assert client.post('/api/release', json={'booking_id': booking_id}, headers=AUTH).status_code == 404
+    assert client.post('/api/allocate', json={'block': 0, 'party_size': 2}, headers=AUTH).status_code == 200
+
+def test_new_planning_month_rebuilds_the_allocator():
+    """When the planning month moves on, bookings restart on the new month's blocks"""
+    import app as app_module
+    import planner
+    try:
+        planner.use_planning_month(2026, 2)
+        planner._month_pinned = False  # As if February had been the current month
+        app_module.reservation_allocator = Allocator({'4_top': 1}, blocks=2)
+        app_module.app.test_client().get('/api/constants')
+        assert planner.PLANNING_MONTH != (2026, 2)
+        assert len(app_module.reservation_allocator.states) == planner.TIME_BLOCKS_PER_MONTH
+    finally:
+        planner.use_planning_month()
+
+if __name__ == "__main__":
+    test_best_fit_and_split_rules()
+    test_allocate_and_release_endpoints()
+    test_new_planning_month_rebuilds_the_allocator()
@@ -0,0 +1,34 @@
+# ABOUTME: Test suite for the serverless entry point in api/index.py
+# ABOUTME: Verifies heavy analysis modules and the solver stay unloaded until a route needs them
+
+import json
+import subprocess
+import sys
+
+COLD_START_CHECK = """
+import importlib.util, json, sys
+spec = importlib.util.spec_from_file_location('serverless_index', 'api/index.py')
+index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(index)
+client = index.app.test_client()
+before = {name: name in sys.modules for name in ('pulp', 'plan_optimizer', 'revenue_planner')}
+constants = client.get('/api/constants').get_json()
+after_constants = 'pulp' in sys.modules
+unauthorized = client.get('/api/debug/startup').status_code
+print(json.dumps({'before': before, 'constants': constants,
+                  'after_constants': after_constants, 'unauthorized': unauthorized}))
+"""
+
+def test_cold_start_defers_solver_imports():
+    """Importing the app and serving /api/constants must not pull in PuLP or the optimizers"""
+    completed = subprocess.run([sys.executable, '-c', COLD_START_CHECK],
+                               capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert not any(result['before'].values()), f"Modules imported at load: {result['before']}"
+    assert result['constants']['GUEST_PRICE'] > 0
+    assert not result['after_constants'], "/api/constants should not import the solver"
+    assert result['unauthorized'] == 401
+
+if __name__ == "__main__":
+    test_cold_start_defers_solver_imports()
@@ -0,0 +1,31 @@
+# ABOUTME: Tests for the static snapshot build command
+# ABOUTME: Checks that artifact inputs follow the modules' imports and that manifest paths follow the output directory
+
+import os
+
+import pytest
+
+from build_snapshot import ARTIFACTS, ROOT_DIR, SNAPSHOT_DIR, artifact_inputs, local_imports, snapshot_url
+
+def test_inputs_cover_every_imported_module():
+    """Each artifact depends on its module and, transitively, everything that module imports"""
+    for spec in ARTIFACTS.values():
+        inputs = artifact_inputs(spec)
+        assert spec['module'] + '.py' in inputs
+        for name in inputs:
+            if name.endswith('.py'):
+                assert {module + '.py' for module in local_imports(name[:-3])} <= set(inputs)
+        assert ('config.json' in inputs) == bool(spec.get('config'))
+    assert 'value_kernel.py' in artifact_inputs(ARTIFACTS['optimizer'])
+    assert 'operating_calendar.py' in artifact_inputs(ARTIFACTS['planner'])
+
+def test_manifest_paths_follow_the_output_directory():
+    """The URL path comes from where the snapshot is written, and only directories the app serves are allowed"""
+    assert snapshot_url(SNAPSHOT_DIR) == '/static/snapshot'
+    assert snapshot_url(os.path.join(ROOT_DIR, 'static', 'preview')) == '/static/preview'
+    with pytest.raises(ValueError):
+        snapshot_url(os.path.dirname(ROOT_DIR))
+
+if __name__ == "__main__":
+    test_inputs_cover_every_imported_module()
+    test_manifest_paths_follow_the_output_directory()
@@ -0,0 +1,39 @@
+# ABOUTME: Test suite for response compression of the JSON API
+# ABOUTME: Verifies Accept-Encoding negotiation and that large JSON bodies come back gzip-encoded and intact
+
+import gzip
+import json
+
+from flask import Flask, jsonify
+
+import compression
+
+def test_choose_encoding():
+    """Encodings follow the client's q-values and fall back to gzip when Brotli isn't installed"""
+    assert compression.choose_encoding(None) is None
+    assert compression.choose_encoding('identity') is None
+    assert compression.choose_encoding('gzip;q=0, deflate') is None
+    assert compression.choose_encoding('gzip, deflate') == 'gzip'
+    assert compression.choose_encoding('*') == ('br' if compression.brotli else 'gzip')
+    assert compression.choose_encoding('br;q=0.5, gzip') == 'gzip'
+
+def test_large_json_is_compressed():
+    """Large JSON responses are gzipped when accepted; small ones and other clients get plain JSON"""
+    app = compression.init_compression(Flask(__name__))
+    payload = {'rows': [{'members': m, 'fits': m < 300} for m in range(500)]}
+    app.add_url_rule('/big', 'big', lambda: jsonify(payload))
+    app.add_url_rule('/small', 'small', lambda: jsonify({'ok': True}))
+    client = app.test_client()
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert json.loads(gzip.decompress(response.data)) == payload
+
+    assert 'Content-Encoding' not in client.get('/big').headers
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+
+if __name__ == "__main__":
+    test_choose_encoding()
+    test_large_json_is_compressed()
@@ -0,0 +1,86 @@
+# ABOUTME: Tests for the atomic, debounced config store
+# ABOUTME: Covers deep merges, coalesced flushes, history persistence and rollback
+
+import json
+import time
+
+import pytest
+
+from config_store import ConfigStore, deep_merge
+
+def test_deep_merge_keeps_unmentioned_fields():
+    """Nested sections are merged rather than replaced"""
+    config = {'personas': {'casual': {'reserved_visits': 1, 'event_visits': 0.5}}, 'plan_prices': {'basic': 50}}
+    undo = []
+    deep_merge(config, {'personas': {'casual': {'event_visits': 1}}, 'new': [1]}, undo=undo)
+    assert config['personas']['casual'] == {'reserved_visits': 1, 'event_visits': 1}
+    assert config['plan_prices'] == {'basic': 50}
+    assert undo == [[['personas', 'casual', 'event_visits'], 0.5, True], [['new'], None, False]]
+
+def test_burst_of_updates_is_one_flush(tmp_path):
+    """Updates return at once; a burst is written out together after the delay"""
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'plan_prices': {'basic_plan_price': 50}}))
+    store = ConfigStore(str(path), delay=60)
+
+    for price in (51, 52, 53):
+        store.update({'plan_prices': {'basic_plan_price': price}})
+    assert store.version == 3
+    assert json.loads(path.read_text())['plan_prices']['basic_plan_price'] == 50  # Not written yet
+
+    assert store.flush() is True
+    assert store.flush() is False  # Nothing pending
+    assert json.loads(path.read_text())['plan_prices']['basic_plan_price'] == 53
+    assert [entry['version'] for entry in store.history()] == [1, 2, 3]
+    assert list(tmp_path.glob('.config-*')) == []  # No temp files left behind
+
+def test_rollback_restores_and_survives_restart(tmp_path):
+    """Rolling back is itself a version, and history carries across store instances"""
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'distribution': {'casual': 0.5, 'everyday': 0.5}}))
+    store = ConfigStore(str(path), delay=None)
+    store.update({'distribution': {'casual': 0.4, 'everyday': 0.6}})
+    store.update({'venues': [{'name': 'east'}]})
+
+    reopened = ConfigStore(str(path), delay=None)
+    assert reopened.version == 2
+    assert reopened.rollback(0) == 3
+    assert reopened.get() == {'distribution': {'casual': 0.5, 'everyday': 0.5}}
+    assert json.loads(path.read_text()) == reopened.get()
+
+    reopened.rollback(2)  # Undo the rollback
+    assert reopened.get()['venues'] == [{'name': 'east'}]
+    with pytest.raises(ValueError):
+        reopened.rollback(10)
+
+def test_failed_background_flush_is_recorded_and_retried(tmp_path):
+    """A write error in the timer thread is kept in flush_error; the change stays pending until a flush succeeds"""
+    folder = tmp_path / 'missing'
+    store = ConfigStore(str(folder / 'config.json'), initial={'distribution': {}}, delay=0.01)
+    store.update({'distribution': {'casual': 1.0}})
+    deadline = time.time() + 5
+    while store.flush_error is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert 'config.json' in store.flush_error
+
+    with pytest.raises(OSError):
+        store.flush()
+    folder.mkdir()
+    assert store.flush() is True
+    assert store.flush_error is None
+    assert json.loads((folder / 'config.json').read_text()) == {'distribution': {'casual': 1.0}}
+
+def test_only_config_readers_flush_before_running(monkeypatch):
+    """A pending write that fails only affects endpoints that read config.json"""
+    import app as app_module
+
+    def failing_flush():
+        raise OSError('disk full')
+
+    monkeypatch.setattr(app_module.config_store, 'flush', failing_flush)
+    client = app_module.app.test_client()
+    assert client.get('/api/constants').status_code == 200
+    assert client.get('/api/games?n=1').status_code == 200
+    response = client.get('/api/revenue')
+    assert response.status_code == 500
+    assert 'disk full' in response.get_json()['error']
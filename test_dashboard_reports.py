@@ -0,0 +1,44 @@
+# ABOUTME: Test suite for the structured dashboard reports behind /api/planner, /api/optimizer and /api/personas
+# ABOUTME: Verifies field selection, the compact planner report and the routes' 400 on unknown fields
+
+import pytest
+
+import dashboard_reports
+import planner
+
+def test_parse_fields():
+    """No value gives the defaults, 'all' every field, and unknown names are refused"""
+    available = dashboard_reports.PLANNER_FIELDS
+    assert dashboard_reports.parse_fields(None, available, ['capacity']) == ['capacity']
+    assert dashboard_reports.parse_fields('all', available, ['capacity']) == available
+    assert dashboard_reports.parse_fields('tables, demand', available, []) == ['tables', 'demand']
+    with pytest.raises(ValueError, match='bogus'):
+        dashboard_reports.parse_fields('capacity,bogus', available, [])
+
+def test_planner_report_matches_capacity_check():
+    """Each member count's fit agrees with the planner, and the bottleneck is the first count that fails"""
+    report = dashboard_reports.planner_report(['capacity', 'bottleneck'], [200, 400])
+    assert [row['members'] for row in report['capacity']] == [200, 400]
+    assert report['capacity'][0]['fits'] == planner.can_accommodate(200, verbose=False)[0]
+    assert report['max_feasible'] == 200
+    assert report['bottleneck']['members'] == 400
+    assert 'detailed_output' not in report and 'summary' not in report
+
+    text = dashboard_reports.planner_report(['summary'], [200, 400])
+    assert 'capacity' not in text and 'Maximum feasible member count: 200' in text['summary']
+
+def test_dashboard_routes_choose_fields():
+    """The routes return the requested fields and 400 for unknown ones"""
+    import app as app_module
+    client = app_module.app.test_client()
+
+    personas = client.get('/api/personas?fields=overview').get_json()
+    assert list(personas) == ['overview'] and personas['overview']['best_persona'] in planner.PERSONAS
+    plans = client.get('/api/optimizer').get_json()
+    assert {plan['plan_type'] for plan in plans['plans']} >= {'basic', 'standard', 'family'}
+    assert client.get('/api/optimizer?fields=plans,nope').status_code == 400
+
+if __name__ == "__main__":
+    test_parse_fields()
+    test_planner_report_matches_capacity_check()
+    test_dashboard_routes_choose_fields()
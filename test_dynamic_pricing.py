@@ -0,0 +1,53 @@
+# ABOUTME: Tests for block-aware guest and drop-in pricing
+# ABOUTME: Verifies the demand response, revenue never falling below flat pricing, and peak load shedding
+
+import numpy as np
+import pytest
+
+import planner
+from dynamic_pricing import PRICE_GRID, acceptance, forecast_block_load, optimize_block_prices
+from revenue_planner import RevenuePlanner
+
+def test_acceptance_is_one_at_flat_price_and_falls_with_price():
+    """Demand equals the planner's assumption at GUEST_PRICE and drops as prices rise"""
+    willingness = [planner.PERSONAS[p]['price'] for p in planner.PERSONAS]
+    response = acceptance(PRICE_GRID, willingness)
+    flat = int(np.argmin(np.abs(PRICE_GRID - planner.GUEST_PRICE)))
+    assert response[flat] == pytest.approx(np.ones(len(willingness)))
+    assert (np.diff(response, axis=0) < 0).all()
+
+def test_dynamic_prices_beat_flat_and_shed_peak_load():
+    """Per-block prices earn at least the flat revenue, and in overloaded blocks they cut the overflow"""
+    result = optimize_block_prices(600)
+    assert result['dynamic_revenue'] >= result['flat_revenue']
+    assert result['overflow_seats']['flat'] > 0
+    assert result['overflow_seats']['dynamic'] < result['overflow_seats']['flat']
+
+    weekend = [b['guest_price'] for b in result['blocks'] if b['weekday'] in ('Saturday', 'Sunday')]
+    weekday = [b['guest_price'] for b in result['blocks'] if b['weekday'] not in ('Saturday', 'Sunday')]
+    assert min(weekend) > max(weekday)  # Busier blocks are priced higher
+
+def test_peak_blocks_are_priced_above_off_peak():
+    """Below capacity, the busier weekend blocks cost more than weekday ones and the peak load falls"""
+    result = optimize_block_prices(300)
+    peak = [b for b in result['blocks'] if b['weekday'] in ('Saturday', 'Sunday')]
+    off_peak = [b for b in result['blocks'] if b['weekday'] not in ('Saturday', 'Sunday')]
+    for price in ('guest_price', 'drop_in_price'):
+        assert min(b[price] for b in peak) > max(b[price] for b in off_peak)
+    assert result['peak_utilization']['dynamic'] < result['peak_utilization']['flat']
+    assert result['dynamic_revenue'] >= result['flat_revenue']
+
+def test_members_with_mixed_access_are_a_fixed_load():
+    """Personas whose best plan includes mixed access are flagged, so only the others face the drop-in price"""
+    revenue_planner = RevenuePlanner()
+    load = forecast_block_load(300)
+    for persona_type, access in zip(load['persona_types'], load['mixed_access']):
+        plan_type, _ = revenue_planner.get_optimal_plan_for_persona(persona_type)
+        assert access == planner.calculate_plan_value(plan_type)['features']['mixed_access']
+    assert load['mixed_access'].any() and not load['mixed_access'].all()
+
+if __name__ == "__main__":
+    test_acceptance_is_one_at_flat_price_and_falls_with_price()
+    test_dynamic_prices_beat_flat_and_shed_peak_load()
+    test_peak_blocks_are_priced_above_off_peak()
+    test_members_with_mixed_access_are_a_fixed_load()
@@ -0,0 +1,35 @@
+# ABOUTME: Tests for the mixed-event scheduler
+# ABOUTME: Validates that schedules meet event demand within the tables and that the MILP displaces no more than greedy
+
+import pytest
+
+from allocator import default_inventory
+from event_scheduler import MIN_EVENT_SEATS, event_setups, schedule_events
+
+def _check_schedule(result):
+    tables = default_inventory()
+    setups = event_setups()
+    assert result['event_seats_offered'] >= result['event_seat_demand']
+    for event in result['events']:
+        assert event['seats'] >= MIN_EVENT_SEATS
+        for table_type, count in tables.items():
+            assert sum(n for name, n in event['setups'].items() if setups[name][0] == table_type) <= count
+
+def test_light_month_fits_events_into_free_tables():
+    """With room to spare, events displace no reservations"""
+    result = schedule_events(300)
+    _check_schedule(result)
+    assert result['displaced_reservation_seats'] == pytest.approx(0)
+
+def test_milp_displaces_less_than_greedy_when_busy():
+    """When events must take booked tables, the MILP schedule displaces fewer reservation seats"""
+    milp = schedule_events(450, method='milp')
+    greedy = schedule_events(450, method='greedy')
+    _check_schedule(milp)
+    _check_schedule(greedy)
+    assert milp['method'].startswith('milp')
+    assert 0 < milp['displaced_reservation_seats'] < greedy['displaced_reservation_seats']
+
+if __name__ == "__main__":
+    test_light_month_fits_events_into_free_tables()
+    test_milp_displaces_less_than_greedy_when_busy()
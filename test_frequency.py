@@ -0,0 +1,53 @@
+# ABOUTME: Tests for the shared visit frequency normalizer
+# ABOUTME: Covers cadence words, numeric and word ranges, "every N" intervals and the batch API
+
+from frequency import normalize_frequency, normalize_frequencies
+
+def test_cadence_words():
+    """Bare cadence words map to visits per month"""
+    assert normalize_frequency('Weekly!') == 4
+    assert normalize_frequency('Biweekly-ish') == 2
+    assert normalize_frequency('monthly') == 1
+    assert normalize_frequency('everyday if i could') == 30
+
+def test_ranges_use_the_midpoint():
+    """Numeric and word ranges are averaged and scaled by their unit"""
+    assert normalize_frequency('2-4x/mo.') == 3
+    assert normalize_frequency('1-2x a week') == 6
+    assert normalize_frequency('Once or twice a month') == 1.5
+    assert normalize_frequency('every 1-2 weeks') == 2.67
+    assert normalize_frequency('every other week or so') == 2
+
+def test_days_in_a_period_count_visits():
+    """Days or nights in a week or month count visits, as "times" does"""
+    assert normalize_frequency('3 days a week') == 12
+    assert normalize_frequency('3 times a week') == 12
+    assert normalize_frequency('2 days per week') == 8
+    assert normalize_frequency('one day a week') == 4
+    assert normalize_frequency('1-2 nights a week') == 6
+    assert normalize_frequency('a couple days a month') == 2
+    assert normalize_frequency('every 2 days') == 15
+
+def test_first_stated_frequency_wins():
+    """An answer naming several frequencies is read by the first one"""
+    assert normalize_frequency('Weekly or 2-3 times a week') == 4
+    assert normalize_frequency('Twice a month or every week if I have time.') == 2
+
+def test_unrecognized_answers_use_the_default():
+    """Answers without a frequency return the default"""
+    assert normalize_frequency('yes') is None
+    assert normalize_frequency('') is None
+    assert normalize_frequency('Whenever possible', default=1) == 1
+
+def test_batch_matches_single():
+    """The batch API agrees with one-at-a-time normalization"""
+    column = ['Weekly', 'weekly', '  WEEKLY ', '1-2/month', 'occasionally', 'Weekly']
+    assert normalize_frequencies(column) == [normalize_frequency(freq) for freq in column]
+
+if __name__ == "__main__":
+    test_cadence_words()
+    test_ranges_use_the_midpoint()
+    test_days_in_a_period_count_visits()
+    test_first_stated_frequency_wins()
+    test_unrecognized_answers_use_the_default()
+    test_batch_matches_single()
@@ -0,0 +1,61 @@
+# ABOUTME: Tests for the game-preference inverted index
+# ABOUTME: Covers spelling merges, pair and persona answers, and that the persisted index is reused until the roster changes
+
+import csv
+import os
+
+from game_index import GameIndex, merge_spellings
+
+MEMBERS = [
+    {'Fav game today': 'Root, Space Base', 'Looking to play': 'anything', 'Visits per month': 4},
+    {'Fav game today': 'root', 'Looking to play': 'Spacebase / heavy euros', 'Visits per month': 4},
+    {'Fav game today': 'Catan', 'Looking to play': 'light games for my kids', 'Visits per month': 2},
+    {'Fav game today': 'The Root', 'Looking to play': 'Catan', 'Visits per month': None}
+]
+
+def test_spacing_and_near_spellings_merge():
+    """Spacing variants and one-letter typos fold into the most-mentioned spelling"""
+    canonical = merge_spellings(['space base', 'spacebase', 'quacks of quedlinburg', 'quacks of quedlinberg'])
+    assert canonical['spacebase'] == 'space base'
+    assert canonical['quacks of quedlinberg'] == 'quacks of quedlinburg'
+
+def test_index_answers_titles_pairs_and_personas():
+    """Members are counted once per title, pairs count shared members, and personas split the demand"""
+    index = GameIndex.build(MEMBERS)
+    summary = index.summary()
+    assert summary['top_titles'][0] == {'title': 'Root', 'members': 3, 'by_persona': {'hobbyists': 2, 'unclassified': 1}}
+    assert summary['pairs'][0] == {'titles': ['Root', 'Space Base'], 'members': 2}
+    assert index.describe('SPACE BASE')['members'] == 2
+    assert index.describe('Catan')['pairs'] == [{'titles': ['Catan', 'Root'], 'members': 1}]
+    assert index.top_titles(persona='families') == [{'title': 'Catan', 'members': 1, 'by_persona': {'families': 1, 'unclassified': 1}}]
+    assert index.describe('Gloomhaven') is None
+
+def test_summary_counts_members_without_listing_them():
+    """The roster overview is counts by activity level and city, not member rows"""
+    members = MEMBERS + [{'City': 'Oakland (Temescal)', 'Visits per month': 12}, {'City': 'Oakland/Berkeley', 'Visits per month': 1}]
+    summary = GameIndex.build(members).summary()
+    assert summary['activity'] == {
+        'Very Active (>8x/month)': 1, 'Active (4-8x/month)': 2, 'Regular (2-4x/month)': 1,
+        'Occasional (<2x/month)': 1, 'Not stated': 1
+    }
+    assert summary['top_cities'] == [{'city': 'Oakland', 'members': 2}]
+
+def test_persisted_index_is_reused_until_the_roster_changes(tmp_path):
+    """The saved index is loaded as-is while the roster is unchanged and rebuilt when it is edited"""
+    roster = tmp_path / 'roster.csv'
+    fieldnames = ['Name', 'Fav game today', 'Looking to play', 'How often you want to play']
+
+    def write_roster(rows):
+        with open(roster, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    write_roster([{'Name': 'Ada', 'Fav game today': 'Root', 'Looking to play': '', 'How often you want to play': 'weekly'}])
+    first = GameIndex.load_or_build(str(roster))
+    assert os.path.exists(tmp_path / 'roster.games.json')
+    assert GameIndex.load_or_build(str(roster)).data == first.data
+
+    write_roster([{'Name': 'Ada', 'Fav game today': 'Catan', 'Looking to play': '', 'How often you want to play': 'weekly'}])
+    os.utime(roster, ns=(0, os.stat(roster).st_mtime_ns + 10**9))
+    assert GameIndex.load_or_build(str(roster)).top_titles(1)[0]['title'] == 'Catan'
@@ -0,0 +1,45 @@
+# ABOUTME: Tests for the game-library checkout model
+# ABOUTME: Exercises title extraction from roster answers, indexed lookups and copy sizing against the queue formulas
+
+import numpy as np
+import pytest
+
+from game_library import GameLibrary, copies_needed, queue_metrics, split_titles
+
+MEMBERS = [
+    {'Fav game today': 'Root, Ark Nova (we play it 2-3x/mo)', 'Looking to play': 'anything'},
+    {'Fav game today': 'The Root', 'Looking to play': 'Probably Agricola / heavy euros'},
+    {'Fav game today': 'root', 'Looking to play': 'Dune: Imperium'}
+]
+
+def test_titles_come_from_roster_answers():
+    """Titles are split out of free text, descriptions of tastes are dropped, and spellings merge"""
+    assert [name for name, _ in split_titles('Probably Agricola / heavy euros')] == ['Agricola']
+    assert [name for name, _ in split_titles('Game of Thrones, Love Letter, Dune: The Card Game, party games')] == [
+        'Game of Thrones', 'Love Letter', 'Dune: The Card Game'
+    ]
+    assert split_titles('anything but co op; medium to heavy; open to new games') == []
+    library = GameLibrary.from_roster(MEMBERS, catalog={'Ark Nova': 2, 'Catan': 1})
+    assert library.popularity[library.lookup('ROOT!')] == 3
+    assert library.copies[library.lookup('ark nova')] == 2
+    assert library.copies[library.lookup('Agricola')] == 0   # Mentioned but not in the catalog
+    assert library.lookup('anything') is None
+    assert library.search('dune') == ['Dune: Imperium']
+
+def test_queue_metrics_match_single_copy_formulas():
+    """With one copy a title is an M/M/1 queue: available 1 - load of the time, waiting load/(1-load) loans"""
+    metrics = queue_metrics([0.5], [1], loan_days=7)
+    assert metrics['availability'][0] == pytest.approx(0.5)
+    assert metrics['wait_days'][0] == pytest.approx(7)
+
+def test_copies_needed_is_the_fewest_that_meet_the_target():
+    """Sized copies meet the target availability and one fewer would not"""
+    load = np.array([0.05, 0.5, 1.5, 4.0])
+    needed = copies_needed(load, target=0.9)
+    assert (queue_metrics(load, needed)['availability'] >= 0.9).all()
+    assert (queue_metrics(load, needed - 1)['availability'] < 0.9).all()
+
+if __name__ == "__main__":
+    test_titles_come_from_roster_answers()
+    test_queue_metrics_match_single_copy_formulas()
+    test_copies_needed_is_the_fewest_that_meet_the_target()
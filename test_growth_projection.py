@@ -0,0 +1,55 @@
+# ABOUTME: Tests for the multi-month growth projection engine
+# ABOUTME: Compares the cached feasibility answers against direct LP solves and the projection's bookkeeping
+
+import numpy as np
+import planner
+from growth_projection import FeasibilityCache, month_capacities, project_growth
+from mix_optimizer import persona_demands
+
+def test_cached_feasibility_matches_direct_solves():
+    """Cuts and edge points give the same answers as solving each demand's LP"""
+    rng = np.random.default_rng(1)
+    demands = persona_demands()
+    keys = list(planner.DEMAND_CONSTRAINTS)
+    matrix = np.array([[demands[p][key] for key in keys] for p in planner.PERSONAS])
+    counts = rng.integers(0, 160, size=(60, len(matrix)))
+    samples = counts @ matrix
+
+    cache = FeasibilityCache()
+    fits = cache.fits(samples)
+    assert cache.solves < len(samples)
+    for demand, fit in zip(samples, fits):
+        shortfall = planner.solve_capacity_duals(dict(zip(keys, demand.tolist())))['shortfall_seats']
+        assert fit == (shortfall <= 1e-6)
+
+def test_projection_tracks_members_and_capacity():
+    """Without churn members only grow, and the first break is flagged once they outgrow the tables"""
+    result = project_growth(months=24, scenarios=50, signups=60, ramp_months=1,
+                            churn={p: 0 for p in planner.PERSONAS}, seed=3)
+    median = result['members']['p50']
+    assert len(median) == 24
+    assert all(later >= earlier for earlier, later in zip(median, median[1:]))
+    assert result['over_capacity_share'][0] == 0
+    assert result['over_capacity_share'][-1] == 1
+    assert result['first_capacity_break']['share_of_scenarios'] == 1
+    # Same seed, same path
+    again = project_growth(months=24, scenarios=50, signups=60, ramp_months=1,
+                           churn={p: 0 for p in planner.PERSONAS}, seed=3)
+    assert again['members'] == result['members']
+
+def test_short_months_break_first():
+    """Each month is checked against its own block count, so February can break while March holds"""
+    feb, mar = month_capacities(2, (2026, 2))
+    assert feb['4_top'] == planner.NUM_4_TOP * planner.PLANNING_CALENDAR.block_count(2026, 2) < mar['4_top']
+    result = project_growth(months=2, scenarios=1, initial_members=300, signups=0,
+                            churn={p: 0 for p in planner.PERSONAS}, start_month=(2026, 2))
+    assert result['over_capacity_share'] == [1, 0]
+    # A fixed capacity applies to every month
+    fixed = project_growth(months=2, scenarios=1, initial_members=300, signups=0,
+                           churn={p: 0 for p in planner.PERSONAS}, capacity=mar, start_month=(2026, 2))
+    assert fixed['over_capacity_share'] == [0, 0]
+
+if __name__ == "__main__":
+    test_cached_feasibility_matches_direct_solves()
+    test_projection_tracks_members_and_capacity()
+    test_short_months_break_first()
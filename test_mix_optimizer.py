@@ -0,0 +1,45 @@
+# ABOUTME: Tests for the revenue-maximizing member mix optimizer
+# ABOUTME: Verifies bounds, the member cap, seating feasibility and agreement with the revenue planner
+
+import pytest
+
+import planner
+from mix_optimizer import optimize_mix, persona_demands, persona_revenues
+from revenue_planner import RevenuePlanner
+
+def test_mix_respects_bounds_and_fits_the_tables():
+    """The chosen mix honours persona bounds and the cap, and its demand fits the capacity LP"""
+    result = optimize_mix(bounds={'casual': (None, 100), 'families': (20, None)}, max_members=300)
+    assert result['status'] == 'Optimal'
+    members = result['members']
+    assert members['casual'] <= 100 and members['families'] >= 20
+    assert result['total_members'] <= 300
+    assert all(float(count).is_integer() for count in members.values())
+
+    # The same member counts leave no unmet demand in the planner's seating model
+    demands = persona_demands()
+    total_demand = {
+        key: sum(demands[p][key] * count for p, count in members.items())
+        for key in planner.DEMAND_CONSTRAINTS
+    }
+    assert planner.solve_capacity_duals(total_demand)['shortfall_seats'] == pytest.approx(0, abs=1e-6)
+
+def test_revenue_matches_revenue_planner_components():
+    """Revenue is priced with the same per-persona components as calculate_monthly_revenue"""
+    revenues = persona_revenues()
+    result = optimize_mix(max_members=50, revenues=revenues)
+    expected = sum(revenues[p]['total'] * count for p, count in result['members'].items())
+    assert result['total_revenue'] == pytest.approx(expected)
+
+    monthly = RevenuePlanner().calculate_monthly_revenue()
+    for persona_type, data in monthly['persona_revenues'].items():
+        assert data['total'] == pytest.approx(revenues[persona_type]['total'])
+
+def test_impossible_bounds_are_reported():
+    """Minimums beyond the tables' capacity give a non-optimal status instead of a mix"""
+    assert optimize_mix(bounds={'families': (100000, None)})['status'] == 'Infeasible'
+
+if __name__ == "__main__":
+    test_mix_respects_bounds_and_fits_the_tables()
+    test_revenue_matches_revenue_planner_components()
+    test_impossible_bounds_are_reported()
@@ -0,0 +1,68 @@
+# ABOUTME: Tests for the operating-hours calendar
+# ABOUTME: Checks exact block counts for real months, closures and special hours, and that the planner follows the planning month
+
+import datetime
+import json
+
+import planner
+from operating_calendar import OperatingCalendar, current_calendar, format_hours, planning_month
+
+def test_block_counts_follow_the_real_month():
+    """Blocks come from the month's actual weekdays: two per weekday and four per weekend day"""
+    operating = OperatingCalendar()
+    assert operating.block_counts(2026, 2) == {'weekday': 40, 'weekend': 32, 'total': 72}
+    assert operating.block_count(2026, 8) == 82   # 21 weekdays, 5 Saturdays, 5 Sundays
+    blocks = operating.month_blocks(2026, 2)
+    assert [b['index'] for b in blocks] == list(range(72))
+    assert blocks[0]['date'] == '2026-02-01' and blocks[0]['weekday'] == 'Sunday' and blocks[0]['start_hour'] == 9
+    assert [format_hours(operating.hours[day]) for day in ('Friday', 'Saturday', 'Sunday')] == ['5PM-11PM', '9AM-11PM', '9AM-11PM']
+
+def test_closures_and_special_hours():
+    """Closed days lose their blocks, special hours replace the day's, and a dated exception beats a yearly one"""
+    operating = OperatingCalendar(exceptions={
+        '12-25': None,                # Closed every Christmas
+        '2026-12-24': [12, 18],       # Short Christmas Eve (a Thursday)
+        '2027-12-25': [9, 12]         # Open one morning block on Christmas 2027
+    })
+    regular = OperatingCalendar()
+    assert operating.block_count(2026, 12) == regular.block_count(2026, 12) - 2 - 2 + 2
+    assert [b['start_hour'] for b in operating.month_blocks(2026, 12) if b['date'] == '2026-12-24'] == [12, 15]
+    assert [b['start_hour'] for b in operating.month_blocks(2027, 12) if b['date'] == '2027-12-25'] == [9]
+
+def test_planner_constants_follow_the_planning_month():
+    """Switching the planning month changes the block count and every table's capacity"""
+    try:
+        assert planner.use_planning_month(2026, 2) == 72
+        assert planner.monthly_capacity()['4_top'] == planner.NUM_4_TOP * 72
+        assert len(planner.monthly_block_schedule()) == 72
+        assert planner.use_planning_month(2026, 8) == 82
+        assert planner.MONTHLY_2_TOP_BLOCKS == planner.NUM_2_TOP * 82
+    finally:
+        planner.use_planning_month()
+    assert planning_month({'calendar': {'planning_month': '2027-03'}}) == (2027, 3)
+
+def test_planning_month_moves_with_the_date(tmp_path):
+    """The config is read once, but the month to plan is worked out on every call unless the config pins it"""
+    path = str(tmp_path / 'config.json')
+    with open(path, 'w') as f:
+        json.dump({'calendar': {'exceptions': {'12-25': None}}}, f)
+    january, month = current_calendar(path, today=datetime.date(2026, 1, 31))
+    assert month == (2026, 1)
+    february, month = current_calendar(path, today=datetime.date(2026, 2, 1))
+    assert february is january and month == (2026, 2)
+
+def test_planner_refreshes_unless_pinned():
+    """A stale unpinned month is replaced by the configured one; a pinned month stays"""
+    try:
+        planner.use_planning_month(2026, 2)
+        assert planner.refresh_planning_month() is False
+        assert planner.PLANNING_MONTH == (2026, 2)
+
+        planner.use_planning_month()
+        configured = planner.PLANNING_MONTH
+        planner.PLANNING_MONTH = (1999, 1)  # As left behind by a month that has since ended
+        assert planner.refresh_planning_month() is True
+        assert planner.PLANNING_MONTH == configured
+        assert planner.refresh_planning_month() is False
+    finally:
+        planner.use_planning_month()
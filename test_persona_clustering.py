@@ -0,0 +1,44 @@
+# ABOUTME: Tests for rule-based persona clustering of roster members
+# ABOUTME: Covers the assignment rules and that incremental batches match a single pass
+
+import numpy as np
+
+import planner
+from persona_clustering import PersonaClusterer, assign_personas, member_arrays
+
+MEMBERS = [
+    {'Visits per month': 30, 'Looking to play': 'anything'},
+    {'Visits per month': 2, 'Looking to play': 'something my kids enjoy'},
+    {'Visits per month': 4, 'Fav game today': 'Root', 'Looking to play': 'grad student, light games'},
+    {'Visits per month': 1, 'Looking to play': 'heavy euros'},
+    {'Visits per month': 1, 'Looking to play': 'party games'},
+    {'Visits per month': 4, 'Looking to play': 'anything'},
+    {'Visits per month': 10, 'Looking to play': 'anything'},
+    {'Visits per month': None, 'Looking to play': 'heavy euros'}
+]
+
+def test_assignment_rules():
+    """Each rule sends a member to the expected persona, and unknown visits are left out"""
+    personas = list(planner.PERSONA_DISTRIBUTION)
+    visits, text = member_arrays(MEMBERS)
+    assigned = [personas[i] if i >= 0 else None for i in assign_personas(visits, text)]
+    assert assigned == ['everyday', 'families', 'students', 'hobbyists', 'casual', 'hobbyists', 'everyday', None]
+
+def test_incremental_batches_match_one_pass():
+    """Adding members in several batches gives the same profile as one batch"""
+    roster = MEMBERS * 50
+    whole = PersonaClusterer().add_batch(roster).profile()
+
+    clusterer = PersonaClusterer()
+    for start in range(0, len(roster), 7):
+        clusterer.add_batch(roster[start:start + 7])
+    assert clusterer.profile() == whole
+
+    assert whole['member_count'] == 350
+    assert whole['unclassified'] == 50
+    assert np.isclose(sum(whole['distribution'].values()), 1.0, atol=0.001)
+    assert whole['visits_per_month']['everyday'] == 20
+
+if __name__ == "__main__":
+    test_assignment_rules()
+    test_incremental_batches_match_one_pass()
@@ -0,0 +1,60 @@
+# ABOUTME: Tests for the config-driven membership plan catalog
+# ABOUTME: Checks defaults, added plans, price precedence, validation and per-version caching
+
+import json
+import os
+
+import pytest
+
+import planner
+from plan_catalog import PlanCatalog, current_catalog
+
+def test_defaults_match_builtin_plans():
+    """With no config the catalog holds the built-in plans and their labels"""
+    catalog = PlanCatalog()
+    assert catalog.plan_types() == ['basic', 'standard', 'family']
+    basic = catalog.value('Basic')
+    assert basic['price'] == planner.BASIC_PLAN_PRICE
+    assert basic['monthly_value'] == planner.BASE_VISIT_VALUE + planner.GUEST_PRICE + planner.GAME_CHECKOUT_VALUE
+    assert catalog.labels('standard') == ['2 Guest Passes', '15% Retail Discount', 'Mixed Event Access',
+                                          '1 Additional Member', '2 Game Checkouts']
+    with pytest.raises(ValueError):
+        catalog.value('platinum')
+
+def test_config_adds_plans_and_overrides_prices():
+    """Config can add plans with numeric features, and plan_prices wins over a plan's own price"""
+    catalog = PlanCatalog({
+        'plan_prices': {'standard_plan_price': 100},
+        'plans': {
+            'basic': {'features': ['Basic Access']},  # Legacy label list keeps the built-in features
+            'weekday': {'price': 20, 'features': {'guest_passes': 0, 'game_checkouts': 2}}
+        }
+    })
+    assert catalog.plan_types() == ['basic', 'standard', 'family', 'weekday']
+    assert catalog.value('standard')['price'] == 100
+    assert catalog.labels('basic') == ['Basic Access']
+    assert catalog.value('basic')['features'] == planner.DEFAULT_PLANS['basic']['features']
+    assert catalog.value('weekday')['features']['mixed_access'] is False
+    assert catalog.labels('weekday') == ['2 Game Checkouts']
+
+def test_invalid_plans_are_rejected():
+    """Unknown or non-numeric features and missing prices raise ValueError"""
+    for plans in [{'vip': {'price': 50, 'features': {'free_coffee': 1}}},
+                  {'vip': {'price': 50, 'features': {'guest_passes': 'two'}}},
+                  {'vip': {'features': {'guest_passes': 2}}}]:
+        with pytest.raises(ValueError):
+            PlanCatalog({'plans': plans})
+
+def test_catalog_is_rebuilt_only_when_config_changes(tmp_path):
+    """The same catalog object is reused until the config file changes"""
+    path = str(tmp_path / 'config.json')
+    with open(path, 'w') as f:
+        json.dump({'plan_prices': {'basic_plan_price': 40}}, f)
+    first = current_catalog(path)
+    assert current_catalog(path) is first
+    assert first.value('basic')['price'] == 40
+
+    with open(path, 'w') as f:
+        json.dump({'plan_prices': {'basic_plan_price': 45.0}}, f)
+    os.utime(path, ns=(1, 1))  # Ensure the modification time differs
+    assert current_catalog(path).value('basic')['price'] == 45
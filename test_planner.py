@@ -4,6 +4,10 @@
 import math
 from planner import (
     compute_demands,
+    analyze_bottleneck,
+    solve_capacity_duals,
+    max_member_capacity,
+    monthly_capacity,
     NUM_4_TOP,
     NUM_2_TOP,
     NUM_6_TOP,
@@ -72,5 +76,36 @@ def test_demands():
         assert utilization_4_top < 1000, f"4-top utilization ({utilization_4_top:.1f}%) is unreasonably high"
         assert utilization_2_top < 1000, f"2-top utilization ({utilization_2_top:.1f}%) is unreasonably high"
 
+def test_bottleneck_duals():
+    """Bottleneck analysis should come from a feasible LP whose duals price the shortfall"""
+    # Comfortably within capacity: nothing is unmet and no persona is blamed
+    feasible = analyze_bottleneck(100)
+    assert feasible['shortfall_seats'] == 0
+    assert feasible['persona'] is None
+
+    # Over capacity: the shortfall is priced and attributed across personas
+    bottleneck = analyze_bottleneck(400)
+    assert bottleneck['shortfall_seats'] > 0
+    assert bottleneck['table_type'] in bottleneck['binding_tables']
+    assert bottleneck['persona'] == bottleneck['persona_ranking'][0]
+    total_share = sum(c['share'] for c in bottleneck['persona_contributions'].values())
+    assert math.isclose(total_share, 100.0, abs_tol=1e-6)
+
+    # Strong duality: the unmet seat-blocks equal demand and capacity priced at their duals
+    demands = compute_demands(400)
+    duals = solve_capacity_duals(demands)
+    priced = (
+        sum(d['shadow_price'] * demands[k] for k, d in duals['demand'].items()) +
+        sum(d['shadow_price'] * monthly_capacity()[t] for t, d in duals['capacity'].items())
+    )
+    assert math.isclose(priced, duals['shortfall_seats'], rel_tol=1e-6)
+
+def test_zero_demand_has_no_member_limit():
+    """Members who need no tables have no capacity limit, reported as None rather than infinity"""
+    assert max_member_capacity({}) is None
+    assert max_member_capacity({'reserved_4_blocks': 1}) >= MONTHLY_4_TOP_BLOCKS
+
 if __name__ == "__main__":
     test_demands()
+    test_bottleneck_duals()
+    test_zero_demand_has_no_member_limit()
@@ -0,0 +1,58 @@
+# ABOUTME: Test suite for the opt-in per-request sampling profiler
+# ABOUTME: Verifies worker threads are sampled, only authorized opted-in requests are profiled, and old profiles are evicted
+
+import threading
+import time
+
+from flask import Flask, jsonify
+
+import request_profiler
+
+def slow_analysis():
+    time.sleep(0.05)
+    return 42
+
+def test_tracked_worker_thread_is_sampled():
+    """Stacks from a tracked worker thread appear under that thread's name"""
+    profile = request_profiler.RequestProfile('worker-test', 'GET', '/test', interval=0.001)
+    worker = threading.Thread(target=profile.track(slow_analysis), name='solver_0')
+    worker.start()
+    worker.join()
+    profile.stop()
+
+    assert profile.samples > 0 and profile.duration_ms >= 50
+    worker_lines = [line for line in profile.collapsed().splitlines() if line.startswith('solver_0;')]
+    assert any('test_request_profiler:slow_analysis' in line for line in worker_lines)
+
+def test_only_authorized_requests_that_opt_in_are_profiled():
+    """?profile=1 or X-Profile: 1 from an authorized client records a profile; anything else runs unprofiled"""
+    app = Flask(__name__)
+    request_profiler.init_profiling(app, lambda req: req.headers.get('X-Token') == 'ok')
+    app.add_url_rule('/slow', 'slow', lambda: jsonify(answer=slow_analysis()))
+    client = app.test_client()
+
+    assert 'X-Profile-Id' not in client.get('/slow').headers
+    assert 'X-Profile-Id' not in client.get('/slow?profile=1').headers
+    assert not any(t.name.startswith('profiler-') for t in threading.enumerate())
+
+    response = client.get('/slow', headers={'X-Profile': '1', 'X-Token': 'ok', 'X-Request-ID': 'req-1'})
+    assert response.get_json() == {'answer': 42}
+    assert response.headers['X-Profile-Id'] == 'req-1'
+    profile = request_profiler.profiles.get('req-1')
+    assert 'test_request_profiler:slow_analysis' in profile.collapsed()
+    assert profile.summary()['path'] == '/slow'
+
+def test_store_keeps_most_recent_profiles():
+    """The store drops the oldest profile beyond its limit and lists newest first"""
+    store = request_profiler.ProfileStore(limit=2)
+    for request_id in ['a', 'b', 'c']:
+        profile = request_profiler.RequestProfile(request_id, 'GET', '/')
+        profile.stop()
+        store.add(profile)
+    assert store.get('a') is None
+    assert [summary['id'] for summary in store.summaries()] == ['c', 'b']
+
+if __name__ == "__main__":
+    test_tracked_worker_thread_is_sampled()
+    test_only_authorized_requests_that_opt_in_are_profiled()
+    test_store_keeps_most_recent_profiles()
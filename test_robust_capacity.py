@@ -0,0 +1,38 @@
+# ABOUTME: Tests for robust and chance-constrained member capacity
+# ABOUTME: Verifies the orderings between nominal, sampled and worst-case counts and agreement with the planner's LP
+
+import numpy as np
+import pytest
+
+import planner
+from robust_capacity import (can_accommodate_robustly, per_member_demand, robust_capacity,
+                             sample_multipliers)
+
+def test_mean_rates_match_planner_demand():
+    """Multipliers of one reproduce the planner's average-member demand"""
+    demand = per_member_demand(np.ones((1, len(planner.PERSONAS), 2)))[0]
+    expected = planner.demand_per_member()
+    assert demand.tolist() == pytest.approx([expected[key] for key in planner.DEMAND_CONSTRAINTS])
+
+def test_uncertainty_lowers_capacity_in_order():
+    """Planning for busy months admits fewer members, and the box worst case is the most conservative"""
+    result = robust_capacity(spread=0.2, scenarios=300)
+    assert result['nominal_members'] == int(planner.max_member_capacity(planner.demand_per_member()))
+    assert result['box_members'] <= result['robust_members'] <= result['chance_members'] <= result['nominal_members']
+    assert result['box_members'] < result['nominal_members']
+
+    fits, share = can_accommodate_robustly(result['chance_members'], spread=0.2, scenarios=300)
+    assert fits and share >= 0.95
+    assert not can_accommodate_robustly(result['chance_members'] + 1, spread=0.2, scenarios=300)[0]
+
+def test_multipliers_stay_within_spread():
+    """Sampled visit rates never leave the +/-spread box"""
+    multipliers = sample_multipliers(1000, spread={'families': 0.3})
+    families = list(planner.PERSONAS).index('families')
+    assert multipliers[:, families].min() >= 0.7 and multipliers[:, families].max() <= 1.3
+    assert np.delete(multipliers, families, axis=1).tolist() == np.ones((1000, len(planner.PERSONAS) - 1, 2)).tolist()
+
+if __name__ == "__main__":
+    test_mean_rates_match_planner_demand()
+    test_uncertainty_lowers_capacity_in_order()
+    test_multipliers_stay_within_spread()
@@ -0,0 +1,75 @@
+# ABOUTME: Tests for streaming roster ingestion and persona aggregation
+# ABOUTME: Compares the streaming parser against the in-memory one and the shape of the persona profile
+
+import csv
+import io
+import math
+
+import planner
+from process_members import clean_members, extract_member_info
+from persona_clustering import PersonaClusterer
+from roster_ingest import PersonaAggregator, iter_csv_members, parse_member_lines
+
+ROSTER_TEXT = """Messages
+Name: Ada (she/her)
+City: Oakland
+How often you want to play: weekly
+Name: Ben
+Fave game (today): Catan
+How often do you want to play: daily
+—
+Thread started
+
+Name: Cy
+Looking to play: anything
+"""
+
+def test_streaming_parser_matches_text_parser():
+    """Parsing line by line yields the same members as parsing the whole text"""
+    streamed = list(parse_member_lines(io.StringIO(ROSTER_TEXT)))
+    assert streamed == extract_member_info(ROSTER_TEXT)
+    assert [m['Name'] for m in streamed] == ['Ada (she/her)', 'Ben', 'Cy']
+    assert streamed[0]['Visits per month'] == 4
+    assert streamed[1]['Visits per month'] == 30
+    assert 'Visits per month' not in streamed[2]
+
+def test_profile_replaces_planner_inputs(tmp_path):
+    """A roster CSV streams into a distribution and visit rates shaped like the planner's"""
+    path = tmp_path / 'roster.csv'
+    fieldnames = ['Name', 'How often you want to play', 'Visits per month']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        # The stale stored visit count is ignored in favour of the raw answer
+        writer.writerow({'Name': 'A', 'How often you want to play': 'once a month', 'Visits per month': 99})
+        writer.writerow({'Name': 'B', 'How often you want to play': 'weekly', 'Visits per month': 4})
+        writer.writerow({'Name': 'C', 'How often you want to play': '', 'Visits per month': 0})
+
+    profile = PersonaAggregator().add_all(iter_csv_members(str(path))).profile()
+
+    assert profile['member_count'] == 2
+    assert profile['unclassified'] == 1
+    assert set(profile['distribution']) == set(planner.PERSONA_DISTRIBUTION)
+    assert math.isclose(sum(profile['distribution'].values()), 1.0, abs_tol=0.01)
+    assert profile['counts']['casual'] == 1
+    casual = profile['personas']['casual']
+    assert math.isclose(casual['reserved_visits'] + casual['event_visits'], 1.0, abs_tol=0.01)
+
+def test_aggregator_uses_the_clustering_rules():
+    """One member at a time and whole batches assign the same personas"""
+    members = [
+        {'Visits per month': 4, 'Looking to play': 'anything'},
+        {'Visits per month': 4, 'Looking to play': 'games with my kids'},
+        {'Visits per month': 1, 'Fav game today': 'Brass, heavy euros'},
+        {'Visits per month': 1.5}
+    ]
+    aggregator = PersonaAggregator()
+    assert [aggregator.add(member) for member in members] == ['hobbyists', 'families', 'hobbyists', 'casual']
+    assert aggregator.profile() == PersonaClusterer().add_batch(members).profile()
+    # Streaming in small chunks classifies the same way
+    assert PersonaAggregator().add_all(members, chunk_size=3).profile() == aggregator.profile()
+
+def test_clean_members_accepts_a_stream():
+    """The CSV cleaning step works directly on the streaming parser's output"""
+    cleaned = clean_members(parse_member_lines(io.StringIO(ROSTER_TEXT)))
+    assert cleaned[0]['Name'] == 'Ada'
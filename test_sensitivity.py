@@ -0,0 +1,59 @@
+# ABOUTME: Test suite for sensitivity.py finite-difference what-if analysis
+# ABOUTME: Checks the vectorized model against the scalar planner and revenue code paths
+
+import math
+
+import planner
+import revenue_planner
+from sensitivity import SensitivityModel, analyze_sensitivity
+
+def test_vectorized_model_matches_scalar_paths():
+    """The base row should reproduce compute_demands and RevenuePlanner per member"""
+    model = SensitivityModel()
+    params = model.unpack(model.base[None, :])
+
+    M = 1000  # Divisible by every share, so compute_demands' int() truncation doesn't matter
+    demands = planner.compute_demands(M)
+    per_member = model.demand_per_member(params)[0]
+    for k, demand_key in enumerate(planner.DEMAND_CONSTRAINTS):
+        assert math.isclose(per_member[k] * M, demands[demand_key], abs_tol=1e-9), demand_key
+
+    revenue = revenue_planner.RevenuePlanner().calculate_monthly_revenue()
+    expected = revenue['total_revenue'] / revenue['max_capacity']
+    assert math.isclose(model.revenue_per_member(params)[0], expected, rel_tol=1e-9)
+
+def test_sensitivity_ranking_and_cache():
+    """Every parameter is ranked by swing, and a repeat call needs no new solves"""
+    first = analyze_sensitivity(metric='revenue')
+    swings = [abs(e['revenue']['high'] - e['revenue']['low']) for e in first['parameters']]
+    assert swings == sorted(swings, reverse=True)
+    assert len(first['parameters']) == len(SensitivityModel().labels)
+
+    # Prices don't change demand, so they can't move capacity
+    for entry in first['parameters']:
+        if entry['parameter'].startswith('plan_prices.'):
+            assert entry['capacity']['derivative'] == 0
+
+    second = analyze_sensitivity(metric='capacity', top=5)
+    assert second['solver_calls'] == 0
+    assert len(second['parameters']) == 5
+
+def test_cached_capacity_follows_planning_month():
+    """Cached solves from one planning month aren't reused for a month with different capacity"""
+    try:
+        planner.use_planning_month(2026, 8)
+        august = analyze_sensitivity(metric='capacity')['base']['max_members']
+        planner.use_planning_month(2026, 2)
+        february = analyze_sensitivity(metric='capacity')['base']['max_members']
+        model = SensitivityModel()
+        per_member = model.demand_per_member(model.unpack(model.base[None, :]))[0]
+        expected = planner.max_member_capacity(dict(zip(planner.DEMAND_CONSTRAINTS, per_member)))
+    finally:
+        planner.use_planning_month()
+    assert february < august
+    assert math.isclose(february, expected, rel_tol=1e-6)
+
+if __name__ == "__main__":
+    test_vectorized_model_matches_scalar_paths()
+    test_sensitivity_ranking_and_cache()
+    test_cached_capacity_follows_planning_month()
@@ -0,0 +1,41 @@
+# ABOUTME: Tests for the month-of-operations discrete-event simulator
+# ABOUTME: Validates block schedule size, table setup conflicts and the report's accounting
+
+import datetime
+
+import planner
+from allocator import Allocator
+from simulator import simulate_month
+
+def test_block_schedule_matches_capacity_constants():
+    """The simulated month has as many blocks as the capacity model assumes"""
+    schedule = planner.monthly_block_schedule()
+    assert len(schedule) == planner.TIME_BLOCKS_PER_MONTH
+    assert all(datetime.date.fromisoformat(block['date']).strftime('%A') == block['weekday'] for block in schedule)
+    assert [block['weekend'] for block in schedule] == [block['weekday'] in ('Saturday', 'Sunday') for block in schedule]
+
+def test_split_table_cannot_seat_full_party():
+    """Once a 4-top is split for a pair, a party of four no longer fits it"""
+    allocator = Allocator({'4_top': 1}, blocks=1)
+    assert allocator.assign(0, 2) is not None
+    assert allocator.assign(0, 4) is None
+    assert allocator.assign(0, 2) is not None  # The other half of the split
+    assert allocator.assign(0, 2) is None
+
+def test_report_accounting():
+    """Every generated request is either accepted or rejected, and load raises rejections"""
+    light = simulate_month(100, seed=1)
+    heavy = simulate_month(2000, seed=1)
+    for results in (light, heavy):
+        blocks = results['blocks']
+        assert len(blocks) == planner.TIME_BLOCKS_PER_MONTH
+        requests = sum(b['reservations'] + b['reservations_rejected'] + b['walk_ins'] for b in blocks)
+        assert requests + len(blocks) == results['events']
+        assert all(0 <= b['utilization'] <= 100 for b in blocks)
+    assert heavy['summary']['booking_rejection_rate'] > light['summary']['booking_rejection_rate']
+    assert simulate_month(100, seed=1)['summary'] == light['summary']
+
+if __name__ == "__main__":
+    test_block_schedule_matches_capacity_constants()
+    test_split_table_cannot_seat_full_party()
+    test_report_accounting()
@@ -0,0 +1,50 @@
+# ABOUTME: Tests for single-flight request coalescing
+# ABOUTME: Verifies that concurrent callers share one computation and that finished keys are computed afresh
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_computation():
+    """Callers arriving while a key is in flight get the same result without recomputing"""
+    flight = SingleFlight()
+    executor = ThreadPoolExecutor(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def solve(members):
+        calls.append(members)
+        release.wait()
+        return {'members': members}
+
+    futures = [flight.submit(('planner', 1), executor.submit, solve, 300) for _ in range(5)]
+    other = flight.submit(('planner', 2), executor.submit, solve, 400)
+    release.set()
+
+    assert all(future.result(5) == {'members': 300} for future in futures)
+    assert other.result(5) == {'members': 400}
+    assert sorted(calls) == [300, 400]
+    assert flight.stats() == {'in_flight': 0, 'started': 2, 'shared': 4}
+
+    # Finished keys are not cached
+    flight.submit(('planner', 1), executor.submit, solve, 300).result(5)
+    assert len(calls) == 3
+    executor.shutdown()
+
+def test_failed_start_is_not_recorded():
+    """If starting the work fails, the error reaches that caller and the key stays free"""
+    flight = SingleFlight()
+
+    def busy():
+        raise RuntimeError("pool full")
+
+    with pytest.raises(RuntimeError):
+        flight.submit('key', busy)
+    assert flight.stats()['in_flight'] == 0
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_computation()
+    test_failed_start_is_not_recorded()
@@ -0,0 +1,87 @@
+# ABOUTME: Tests for the bounded solver pool and per-thread output capture
+# ABOUTME: Confirms that overflow is rejected while queued work completes, and that captures don't mix
+
+import threading
+
+import pytest
+
+from solver_pool import PoolBusy, SharedLock, SolverPool, capture_output
+
+def test_pool_rejects_work_beyond_workers_and_queue():
+    """With one worker and one queue slot, a third concurrent job is turned away"""
+    pool = SolverPool(workers=1, queue=1)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    waiting = pool.submit(lambda: 'queued')
+    with pytest.raises(PoolBusy):
+        pool.submit(lambda: 'rejected')
+    assert pool.stats()['rejected'] == 1
+
+    release.set()
+    assert running.result(5) is True
+    assert waiting.result(5) == 'queued'
+    assert pool.run(lambda x: x * 2, 21) == 42  # Room again once the burst drains
+    assert pool.stats()['completed'] == 3
+    pool.shutdown()
+
+def test_concurrent_captures_stay_separate():
+    """Each thread's capture only sees what that thread printed"""
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def report(name):
+        for i in range(50):
+            print(f"{name} line {i}")
+            if i == 0:
+                barrier.wait()
+
+    def worker(name):
+        results[name] = capture_output(report, name)
+
+    threads = [threading.Thread(target=worker, args=(f"t{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, output in results.items():
+        lines = output.splitlines()
+        assert len(lines) == 50
+        assert all(line.startswith(f"{name} ") for line in lines)
+
+def test_exclusive_waits_for_shared_holders():
+    """An exclusive holder waits for running shared holders, and later shared ones wait for it"""
+    lock = SharedLock()
+    events = []
+    holding = threading.Event()
+    release = threading.Event()
+
+    def reader(name, hold=None):
+        with lock.shared():
+            events.append(name)
+            if hold:
+                holding.set()
+                release.wait(5)
+
+    def writer():
+        with lock.exclusive():
+            events.append('exclusive')
+
+    first = threading.Thread(target=reader, args=('first', True))
+    first.start()
+    holding.wait(5)
+    swap = threading.Thread(target=writer)
+    swap.start()
+    while not lock._waiting:
+        pass
+    late = threading.Thread(target=reader, args=('late',))
+    late.start()
+    release.set()
+    for thread in (first, swap, late):
+        thread.join(5)
+    assert events == ['first', 'exclusive', 'late']
+
+if __name__ == "__main__":
+    test_pool_rejects_work_beyond_workers_and_queue()
+    test_concurrent_captures_stay_separate()
+    test_exclusive_waits_for_shared_holders()
@@ -0,0 +1,55 @@
+# ABOUTME: Test suite for the batched plan-value kernel
+# ABOUTME: Verifies the usage caps, the family-plan member rule, batching and agreement with ValueCalculator
+
+import numpy as np
+import pytest
+
+import planner
+import value_kernel
+from value_calculator import ValueCalculator
+
+def test_components_apply_caps_and_member_rule():
+    """Guest passes and checkouts are capped at use, and 3+ additional members are valued at 75%"""
+    # visits, price per visit, guests, checkouts
+    traits = np.array([[4, 10, 1, 2]])
+    # guest passes, retail discount, checkouts, additional members, mixed access
+    features = np.array([[3, 0.1, 1, 1, 0],
+                         [0, 0.0, 5, 3, 1]])
+    components = value_kernel.value_components(traits, features, game_checkout_value=5, event_value=12)
+    assert components.shape == (len(value_kernel.COMPONENTS), 2, 1)
+
+    first = value_kernel.breakdown(components[:, 0, 0])
+    assert first['guest_value'] == pytest.approx(1 * 10 * 0.75)
+    assert first['retail_discount'] == pytest.approx(4)
+    assert first['game_value'] == pytest.approx(5)
+    assert first['additional_member_value'] == pytest.approx(40 * 0.5)
+    assert first['event_value'] == 0
+    assert first['total_value'] == pytest.approx(40 + 7.5 + 4 + 5 + 20)
+
+    family = value_kernel.breakdown(components[:, 1, 0])
+    assert family['game_value'] == pytest.approx(10)
+    assert family['additional_member_value'] == pytest.approx(3 * 40 * 0.75)
+    assert family['event_value'] == 12
+
+def test_batched_traits_match_one_at_a_time():
+    """A batch of trait matrices gives the same values as evaluating each on its own"""
+    _, traits = value_kernel.persona_traits()
+    _, features, _ = value_kernel.plan_features()
+    batch = traits[None] * np.array([0.5, 1.0, 2.0])[:, None, None]
+    batched = value_kernel.value_components(batch, features)
+    for i, row in enumerate(batch):
+        np.testing.assert_allclose(batched[:, i], value_kernel.value_components(row, features))
+
+def test_value_table_matches_value_ratios():
+    """The table's ratios are ValueCalculator's per-pair value ratios"""
+    calculator = ValueCalculator()
+    table = calculator.value_table()
+    for i, plan_type in enumerate(table['plans']):
+        for j, persona_type in enumerate(table['personas']):
+            assert table['ratios'][i, j] == pytest.approx(calculator.calculate_value_ratio(persona_type, plan_type))
+    assert table['personas'] == list(planner.PERSONAS)
+
+if __name__ == "__main__":
+    test_components_apply_caps_and_member_rule()
+    test_batched_traits_match_one_at_a_time()
+    test_value_table_matches_value_ratios()
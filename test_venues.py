@@ -0,0 +1,53 @@
+# ABOUTME: Tests for multi-venue capacity planning and member routing
+# ABOUTME: Validates the default venue against the planner's constants and opening hours, and the routing LP's use of capacity
+
+import math
+
+import planner
+from operating_calendar import DEFAULT_HOURS, OperatingCalendar
+from venues import Venue, plan_venues, venue_capacities
+
+def test_default_venue_matches_planner():
+    """The planner's single venue has the planner's block schedule and capacity"""
+    venue = Venue.from_planner()
+    assert venue.blocks_per_month() == planner.TIME_BLOCKS_PER_MONTH
+    assert venue.capacity() == planner.monthly_capacity()
+
+def test_venue_hours_default_to_the_planner_week():
+    """A venue without hours keeps the planner's week; Saturday and Sunday can differ"""
+    venue = Venue('east', {'4_top': 8})
+    assert venue.hours == DEFAULT_HOURS
+    assert venue.operating.block_count(2026, 8) == OperatingCalendar().block_count(2026, 8)
+
+    sunday_closed = Venue.from_dict({'name': 'west', 'tables': {'2_top': 2}, 'hours': {'Sunday': None}})
+    assert sunday_closed.hours['Saturday'] == (9, 23) and sunday_closed.hours['Sunday'] is None
+    assert Venue.from_dict(sunday_closed.to_dict()).hours == sunday_closed.hours
+
+def test_routing_fills_home_venue_first():
+    """Members use their own region's venue, overflow to others, and the rest go unserved"""
+    planner.use_planning_month(2026, 8)  # Capacities depend on the month; pin one rather than today's
+    try:
+        venues = [
+            Venue('east', {'4_top': 8, '8_top': 3, '6_top': 2, '2_top': 2}),
+            Venue('west', {'4_top': 4, '2_top': 2})
+        ]
+        capacities = venue_capacities(venues, workers=1)
+        result = plan_venues(venues, {'east': 500, 'west': 10}, workers=1)
+    finally:
+        planner.use_planning_month()
+
+    assert result['routing']['west'] == {'west': 10}
+    assert math.isclose(result['venues']['east']['members'], capacities['east'], rel_tol=1e-6)
+    assert math.isclose(result['venues']['west']['members'], capacities['west'], rel_tol=1e-6)
+    assert math.isclose(result['unserved'], 510 - capacities['east'] - capacities['west'], rel_tol=1e-6)
+
+def test_parallel_matches_serial():
+    """Solving venue subproblems on a process pool gives the same capacities"""
+    venues = [Venue(f"v{i}", {'4_top': 2 + i, '2_top': 1}) for i in range(8)]
+    assert venue_capacities(venues, workers=2) == venue_capacities(venues, workers=1)
+
+if __name__ == "__main__":
+    test_default_venue_matches_planner()
+    test_venue_hours_default_to_the_planner_week()
+    test_routing_fills_home_venue_first()
+    test_parallel_matches_serial()
@@ -2,76 +2,42 @@
 # ABOUTME: Determines value ratios based on usage patterns, features, and pricing
 
 import planner
+import value_kernel
 
 class ValueCalculator:
     def __init__(self):
-        # Get personas from planner for value calculation
-        self.personas = {}
-        for persona_type, data in planner.PERSONAS.items():
-            self.personas[persona_type] = {
-                "visits_per_month": data['reserved_visits'] + data['event_visits'],
-                "price_per_visit": data['price'],
-                "guests_per_month": data['guests_per_month'],
-                "game_checkouts": data['game_checkouts']
-            }
+        # Persona traits as of creation, as a matrix for the value kernel
+        self.persona_types, self.traits = value_kernel.persona_traits(planner.PERSONAS)
+        self.rows = {persona_type: i for i, persona_type in enumerate(self.persona_types)}
+        self.personas = {
+            persona_type: dict(zip(value_kernel.TRAITS, self.traits[i]))
+            for persona_type, i in self.rows.items()
+        }
+
+    def value_table(self, plan_types=None):
+        """Value, value components and value ratio of every plan for every persona, in one kernel pass.
+
+        Returns value_kernel.value_table's layout: plans x personas arrays
+        plus the components x plans x personas breakdown.
+        """
+        return value_kernel.value_table(plan_types, self.persona_types, self.traits)
+
+    def value_breakdown(self, plan_features, persona_type):
+        """Each value component of a plan for a persona, plus the total"""
+        row = self.rows[persona_type]
+        return value_kernel.breakdown(value_kernel.value_components(
+            self.traits[row:row + 1], value_kernel.feature_matrix([plan_features])
+        )[:, 0, 0])
 
     def calculate_persona_value(self, plan_features, persona_type, debug_output=None):
         """Calculate the value of a plan for a specific persona."""
-        traits = self.personas[persona_type]
-        
-        # 1. Base value from visits
-        # Their value per visit * number of visits they plan to make
-        visit_value = traits["visits_per_month"] * traits["price_per_visit"]
-        
-        # 2. Value from guest passes
-        # They value guest passes at 75% of their own visit value (25% discount)
-        guest_pass_value = traits["price_per_visit"] * 0.75
-        # Only count guest passes up to their monthly guest count
-        guest_value = min(plan_features["guest_passes"], traits["guests_per_month"]) * guest_pass_value
-        
-        # 3. Value from retail discounts
-        # Assume they spend about their visit value on retail per month
-        monthly_retail_spend = traits["visits_per_month"] * traits["price_per_visit"]
-        retail_discount_value = monthly_retail_spend * plan_features["retail_discount"]
-        
-        # 4. Value from game checkouts (up to their monthly checkout count)
-        game_value = min(plan_features["game_checkouts"], traits["game_checkouts"]) * planner.GAME_CHECKOUT_VALUE
-        
-        # 5. Value from additional members
-        # For family plan, value additional members at 75% instead of 50%
-        member_discount = 0.75 if plan_features.get("additional_members", 0) >= 3 else 0.5
-        additional_member_value = (
-            plan_features["additional_members"] * 
-            (traits["visits_per_month"] * traits["price_per_visit"]) * 
-            member_discount
-        )
-        
-        # 6. Value from event access
-        event_value = (getattr(planner, 'EVENT_VALUE', None) or planner.MIXED_VALUE) if plan_features["mixed_access"] else 0
-        
+        breakdown = self.value_breakdown(plan_features, persona_type)
+
         # Store debug output if requested
         if debug_output is not None and persona_type == 'families':
-            debug_output.append({
-                "visit_value": visit_value,
-                "guest_value": guest_value,
-                "retail_discount": retail_discount_value,
-                "game_value": game_value,
-                "additional_member_value": additional_member_value,
-                "event_value": event_value,
-                "total_value": visit_value + guest_value + retail_discount_value + game_value + additional_member_value + event_value
-            })
-        
-        # Total monthly value is sum of all components
-        monthly_value = (
-            visit_value +              # Value from their own visits
-            guest_value +              # Value from guest passes
-            retail_discount_value +    # Value from retail discounts
-            game_value +               # Value from game checkouts
-            additional_member_value +  # Value from additional members
-            event_value                # Value from event access
-        )
-        
-        return monthly_value
+            debug_output.append(breakdown)
+
+        return breakdown['total_value']
 
     def calculate_value_ratio(self, persona_type, plan_type):
         """Calculate value ratio for a persona-plan pair."""
@@ -0,0 +1,90 @@
+# ABOUTME: Batched NumPy kernel for the perceived value of every plan to every persona
+# ABOUTME: One pass over a persona-trait matrix and a plan-feature matrix gives each value component, the totals and the value ratios
+
+import numpy as np
+
+import planner
+
+# Columns of the persona-trait matrix
+TRAITS = ['visits_per_month', 'price_per_visit', 'guests_per_month', 'game_checkouts']
+# Columns of the plan-feature matrix
+FEATURES = ['guest_passes', 'retail_discount', 'game_checkouts', 'additional_members', 'mixed_access']
+# First axis of the value tensor, summing to a plan's monthly value
+COMPONENTS = ['visit_value', 'guest_value', 'retail_discount', 'game_value', 'additional_member_value', 'event_value']
+
+GUEST_PASS_VALUE_SHARE = 0.75     # A guest pass is worth 75% of the member's own visit
+MEMBER_VALUE_SHARE = 0.5          # Each additional member is worth half the member's visit value...
+FAMILY_MEMBER_VALUE_SHARE = 0.75  # ...or 75% on a family plan
+FAMILY_PLAN_MEMBERS = 3           # Additional members that make a plan a family plan
+
+def persona_traits(personas=None):
+    """(persona names, personas x TRAITS matrix) from planner-style persona definitions"""
+    personas = personas or planner.PERSONAS
+    return list(personas), np.array([
+        [p['reserved_visits'] + p['event_visits'], p['price'], p['guests_per_month'], p['game_checkouts']]
+        for p in personas.values()
+    ], dtype=float)
+
+def feature_matrix(features):
+    """plans x FEATURES matrix from a list of plan feature dicts"""
+    return np.array([[float(f.get(name, 0)) for name in FEATURES] for f in features])
+
+def plan_features(plan_types=None):
+    """(plan names, plans x FEATURES matrix, prices) for catalog plans"""
+    plan_types = plan_types or planner.get_plan_types()
+    plans = [planner.calculate_plan_value(plan_type) for plan_type in plan_types]
+    return list(plan_types), feature_matrix([p['features'] for p in plans]), np.array([p['price'] for p in plans], dtype=float)
+
+def value_components(traits, features, game_checkout_value=None, event_value=None):
+    """Each value component for every plan and persona, shaped (COMPONENTS, ..., plans, personas).
+
+    traits is (..., personas, TRAITS) and features (..., plans, FEATURES);
+    their leading axes broadcast, so a batch of perturbed traits (as in
+    the sensitivity analysis) runs against the same plans in one call.
+    Components come first so that summing them over axis 0 adds whole
+    arrays. Guest passes and game checkouts only count up to what the
+    persona uses each month.
+    """
+    game_checkout_value = planner.GAME_CHECKOUT_VALUE if game_checkout_value is None else game_checkout_value
+    event_value = planner.MIXED_VALUE if event_value is None else event_value
+    traits = np.asarray(traits, dtype=float)[..., None, :, :]
+    features = np.asarray(features, dtype=float)[..., :, None, :]
+    t = {name: traits[..., i] for i, name in enumerate(TRAITS)}
+    f = {name: features[..., i] for i, name in enumerate(FEATURES)}
+
+    own_value = t['visits_per_month'] * t['price_per_visit']
+    member_share = np.where(f['additional_members'] >= FAMILY_PLAN_MEMBERS, FAMILY_MEMBER_VALUE_SHARE, MEMBER_VALUE_SHARE)
+    components = np.empty((len(COMPONENTS),) + np.broadcast_shapes(traits.shape[:-1], features.shape[:-1]))
+    components[0] = own_value
+    components[1] = np.minimum(f['guest_passes'], t['guests_per_month']) * (t['price_per_visit'] * GUEST_PASS_VALUE_SHARE)
+    components[2] = own_value * f['retail_discount']  # Retail spend is about the member's visit value
+    components[3] = np.minimum(f['game_checkouts'], t['game_checkouts']) * game_checkout_value
+    components[4] = own_value * (f['additional_members'] * member_share)
+    components[5] = np.where(f['mixed_access'] > 0, event_value, 0.0)
+    return components
+
+def breakdown(components):
+    """{component: value} plus total_value for one plan and persona's component vector"""
+    values = {name: float(value) for name, value in zip(COMPONENTS, components)}
+    values['total_value'] = float(np.sum(components))
+    return values
+
+def value_table(plan_types=None, persona_types=None, traits=None):
+    """Value of every catalog plan to every persona, with its breakdown and value ratio.
+
+    traits defaults to the planner's current personas. components is
+    COMPONENTS x plans x personas; value and ratios are plans x personas.
+    """
+    if traits is None:
+        persona_types, traits = persona_traits()
+    plan_types, features, prices = plan_features(plan_types)
+    components = value_components(traits, features)
+    value = components.sum(axis=0)
+    return {
+        'plans': plan_types,
+        'personas': list(persona_types),
+        'prices': prices,
+        'components': components,
+        'value': value,
+        'ratios': value / prices[:, None]
+    }
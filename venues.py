@@ -0,0 +1,229 @@
+# ABOUTME: Multi-location capacity planning: venue table inventories, hours and cross-venue member routing
+# ABOUTME: Solves per-venue capacity LPs in parallel on a process pool, then a master LP assigns members to venues
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import planner
+from operating_calendar import DEFAULT_HOURS, WEEKDAYS, WEEKEND, OperatingCalendar
+
+TABLE_TYPES = ['4_top', '8_top', '6_top', '2_top']
+
+# Master routing costs, per member per month
+CROSS_VENUE_COST = 1    # Default cost of sending a member to a venue outside their region
+UNSERVED_PENALTY = 100  # Cost of a member no venue can seat; far above any routing cost
+
+# Each subproblem solves in milliseconds, so a handful is faster inline than on a pool
+PARALLEL_MIN_JOBS = 8
+
+class Venue:
+    """One location: its table inventory, operating hours and resulting block schedule.
+
+    Opening hours default to the planner's (operating_calendar.DEFAULT_HOURS).
+    hours sets any day's (open, close), or None for closed; weekday_hours
+    and weekend_hours set Monday-Friday or Saturday and Sunday at once.
+    Hours and exceptions (closures and special hours, as in
+    OperatingCalendar) give the venue's calendar; a calendar passed in as
+    operating supplies both instead.
+    """
+
+    def __init__(self, name, tables, weekday_hours=None, weekend_hours=None, region=None,
+                 exceptions=None, operating=None, hours=None):
+        self.name = name
+        self.tables = {table_type: tables.get(table_type, 0) for table_type in TABLE_TYPES}
+        week = dict(DEFAULT_HOURS)
+        for day in WEEKDAYS:
+            grouped = weekend_hours if day in WEEKEND else weekday_hours
+            if grouped is not None:
+                week[day] = grouped
+        week.update(hours or {})
+        self.region = region or name
+        if operating is not None:
+            week, exceptions = operating.hours, operating.exceptions
+        self.hours = {day: tuple(week[day]) if week.get(day) else None for day in WEEKDAYS}
+        self.exceptions = dict(exceptions or {})
+        self.operating = operating or OperatingCalendar(self.hours, self.exceptions)
+
+    @classmethod
+    def from_planner(cls, name='main'):
+        """The single venue described by the planner's table constants and operating calendar"""
+        return cls(name, {
+            '4_top': planner.NUM_4_TOP,
+            '8_top': planner.NUM_8_TOP,
+            '6_top': planner.NUM_6_TOP,
+            '2_top': planner.NUM_2_TOP
+        }, operating=planner.PLANNING_CALENDAR)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'],
+            data['tables'],
+            weekday_hours=data.get('weekday_hours'),
+            weekend_hours=data.get('weekend_hours'),
+            region=data.get('region'),
+            exceptions=data.get('exceptions'),
+            hours=data.get('hours')
+        )
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'tables': dict(self.tables),
+            'hours': {day: list(hours) if hours else None for day, hours in self.hours.items()},
+            'region': self.region,
+            'exceptions': dict(self.exceptions)
+        }
+
+    def blocks_per_month(self):
+        """Exact 3-hour blocks the venue is open in the planner's planning month"""
+        return self.operating.block_count(*planner.PLANNING_MONTH)
+
+    def capacity(self):
+        """Monthly block capacity for each table type"""
+        blocks = self.blocks_per_month()
+        return {table_type: count * blocks for table_type, count in self.tables.items()}
+
+def load_venues(config=None):
+    """Venues listed under 'venues' in config.json, or the planner's single venue"""
+    if config is None:
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            config = {}
+    venues = config.get('venues')
+    if not venues:
+        return [Venue.from_planner()]
+    return [Venue.from_dict(venue) for venue in venues]
+
+def _venue_capacity(args):
+    """Process pool task: member capacity of one venue's table inventory"""
+    per_member_demand, capacity = args
+    return planner.max_member_capacity(per_member_demand, capacity)
+
+def _venue_duals(args):
+    """Process pool task: table utilization and shadow prices of one venue at its assigned load"""
+    per_member_demand, capacity, members = args
+    demands = {key: value * members for key, value in per_member_demand.items()}
+    return planner.solve_capacity_duals(demands, capacity)
+
+def _map(task, jobs, workers):
+    """Run tasks on a process pool, or inline when there are too few to be worth it"""
+    if workers == 1 or len(jobs) < PARALLEL_MIN_JOBS:
+        return [task(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, jobs))
+
+def venue_capacities(venues, per_member_demand=None, workers=None):
+    """Member capacity of every venue, solving each distinct table inventory once in parallel"""
+    per_member_demand = per_member_demand or planner.demand_per_member()
+
+    # Venues with the same inventory and hours share a subproblem
+    distinct = {}
+    for venue in venues:
+        key = tuple(sorted(venue.capacity().items()))
+        distinct.setdefault(key, venue.capacity())
+    keys = list(distinct)
+    results = _map(_venue_capacity, [(per_member_demand, distinct[key]) for key in keys], workers)
+    by_key = dict(zip(keys, results))
+
+    return {venue.name: by_key[tuple(sorted(venue.capacity().items()))] for venue in venues}
+
+def route_members(venues, members_by_region, capacities, travel_costs=None):
+    """Master LP: assign each region's members to venues within their capacity.
+
+    travel_costs[region][venue] is the monthly cost of routing one member;
+    a venue in the member's own region costs nothing and any other costs
+    CROSS_VENUE_COST unless given. Members that fit nowhere are unserved.
+    """
+    import pulp
+
+    travel_costs = travel_costs or {}
+
+    def cost(region, venue):
+        if region in travel_costs and venue.name in travel_costs[region]:
+            return travel_costs[region][venue.name]
+        return 0 if venue.region == region else CROSS_VENUE_COST
+
+    model = pulp.LpProblem("Venue_Routing", pulp.LpMinimize)
+    regions = list(members_by_region)
+    route = {
+        (r, v.name): pulp.LpVariable(f"route_{i}_{j}", 0)
+        for i, r in enumerate(regions) for j, v in enumerate(venues)
+    }
+    unserved = {r: pulp.LpVariable(f"unserved_{i}", 0) for i, r in enumerate(regions)}
+
+    model += (pulp.lpSum(cost(r, v) * route[r, v.name] for r in regions for v in venues) +
+              pulp.lpSum(UNSERVED_PENALTY * unserved[r] for r in regions))
+
+    for i, r in enumerate(regions):
+        model += (pulp.lpSum(route[r, v.name] for v in venues) + unserved[r] == members_by_region[r],
+                  f"region_{i}_members")
+    for j, v in enumerate(venues):
+        if capacities[v.name] is not None:  # None: no demand, so no limit
+            model += pulp.lpSum(route[r, v.name] for r in regions) <= capacities[v.name], f"venue_{j}_capacity"
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False))
+
+    return {
+        'status': pulp.LpStatus[model.status],
+        'routing': {
+            r: {v.name: route[r, v.name].value() or 0 for v in venues if (route[r, v.name].value() or 0) > 1e-9}
+            for r in regions
+        },
+        'unserved': {r: unserved[r].value() or 0 for r in regions},
+        'load': {v.name: sum(route[r, v.name].value() or 0 for r in regions) for v in venues}
+    }
+
+def plan_venues(venues, members_by_region, travel_costs=None, per_member_demand=None, workers=None):
+    """Distribute members across venues.
+
+    Demand per member is the same everywhere, so each venue's capacity is a
+    single LP on its own table inventory. Those subproblems run in parallel,
+    the master routing LP assigns members, and a final parallel pass reports
+    each venue's table utilization at its assigned load.
+    """
+    per_member_demand = per_member_demand or planner.demand_per_member()
+    capacities = venue_capacities(venues, per_member_demand, workers)
+    routing = route_members(venues, members_by_region, capacities, travel_costs)
+
+    duals = _map(_venue_duals, [
+        (per_member_demand, venue.capacity(), routing['load'][venue.name]) for venue in venues
+    ], workers)
+
+    venue_results = {}
+    for venue, venue_duals in zip(venues, duals):
+        load = routing['load'][venue.name]
+        capacity = capacities[venue.name]
+        venue_results[venue.name] = {
+            'region': venue.region,
+            'blocks_per_month': venue.blocks_per_month(),
+            'capacity': capacity,
+            'members': load,
+            'member_utilization': load / capacity * 100 if capacity else 0,
+            'table_utilization': {
+                table_type: data['utilization'] for table_type, data in venue_duals['capacity'].items()
+            }
+        }
+
+    total_capacity = None if None in capacities.values() else sum(capacities.values())
+    return {
+        'status': routing['status'],
+        'total_members': sum(members_by_region.values()),
+        'total_capacity': total_capacity,
+        'unserved': sum(routing['unserved'].values()),
+        'venues': venue_results,
+        'routing': routing['routing']
+    }
+
+if __name__ == "__main__":
+    venues = load_venues()
+    total = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    # Without regional data, members are spread evenly over the venues' regions
+    regions = sorted({venue.region for venue in venues})
+    members_by_region = {region: total / len(regions) for region in regions}
+    print(json.dumps(plan_venues(venues, members_by_region), indent=2))